@@ -0,0 +1,91 @@
+"""Cost of each transcript hash suite (hyperion/hashsuite.py).
+
+Times raw throughput for a few message sizes, the per-ciphertext weight
+hash of a decryption proof (auditor.weight, one per ciphertext, component
+and teller) and, with --tally VOTERS, a whole election per suite through
+run_hyperion, reporting setup to tally and mixing + decryption time.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import Timer
+import auditor
+import hashsuite
+import jacobian
+from jacobian import JacobianPoint
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = (64, 1024, 64 * 1024)
+
+
+def throughput(suite, size, total):
+    data = os.urandom(size)
+    rounds = max(1, total // size)
+    with Timer() as t:
+        for _ in range(rounds):
+            hashsuite.digest(data, suite)
+    return rounds * size / t.elapsed / 1e6
+
+
+def tally(suite, voters):
+    sys.path.insert(0, PROJECT_ROOT)
+    from client.hyperion_runner import run_hyperion
+
+    with Timer() as t:
+        result = run_hyperion(voters=voters, project_root=PROJECT_ROOT,
+                              hash_suite=suite)
+    timings = result["timings"]
+    mixing = timings.get("Tallying (Mixing)", 0.0)
+    decryption = timings.get("Tallying (Decryption)", 0.0)
+    return t.elapsed, mixing + decryption
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("ciphertexts", type=int, nargs="?", default=2000)
+    parser.add_argument("--megabytes", type=int, default=64,
+                        help="data hashed per throughput measurement")
+    parser.add_argument("--tally", type=int, metavar="VOTERS",
+                        help="also run an election of VOTERS per suite")
+    args = parser.parse_args()
+
+    g = JacobianPoint.generator()
+    alphas = jacobian.serialize_points(
+        [g * random.randrange(1, int(jacobian.N)) for _ in range(50)]
+    )
+    rows = [[i, alpha] for i, alpha in enumerate(alphas)]
+    n = args.ciphertexts
+
+    header = "".join(f"{f'{size} B (MB/s)':>16}" for size in SIZES)
+    print(f"{'suite':<12}{header}{'weight (us)':>14}")
+    for suite in hashsuite.available_suites():
+        rates = [
+            throughput(suite, size, args.megabytes * 1024 * 1024)
+            for size in SIZES
+        ]
+        with Timer() as weights:
+            seed = auditor.weight_seed(alphas[0], alphas, rows, suite)
+            for i in range(n):
+                auditor.weight(seed, i, suite)
+        print(f"{suite:<12}"
+              + "".join(f"{rate:>16.1f}" for rate in rates)
+              + f"{weights.elapsed / n * 1e6:>14.1f}")
+
+    if not args.tally:
+        return
+    if not os.path.exists(os.path.join(PROJECT_ROOT, "hyperion", "main.py")):
+        print("\nhyperion/main.py not found; skipping the election runs")
+        return
+    print(f"\n{args.tally} voters")
+    print(f"{'suite':<12}{'run (s)':>10}{'tally (s)':>12}")
+    for suite in hashsuite.available_suites():
+        elapsed, tally_time = tally(suite, args.tally)
+        print(f"{suite:<12}{elapsed:>10.2f}{tally_time:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""EccPoint arithmetic against the Jacobian-coordinate engine.
+
+Times the loops the engine replaces: the prod(alpha^t)^r accumulation of
+mp_partial_decrypt, summing partial decryptions in verify_decryption_proof
+(EccPoint in-place addition) and the raise-h encryption
+(g^r, Q^r + ptk^r_i), and serializing points one by one against
+jacobian.serialize_points.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Crypto.PublicKey import ECC
+
+from common import CURVE_NAME, Timer
+import jacobian
+from jacobian import JacobianPoint
+
+
+def random_scalar():
+    return random.randrange(1, int(jacobian.N))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("terms", type=int, nargs="?", default=100)
+    args = parser.parse_args()
+    n = args.terms
+
+    g = ECC.EccPoint(int(jacobian.GX), int(jacobian.GY), CURVE_NAME)
+    points = [g * random_scalar() for _ in range(n)]
+    serialized = [{"x": int(p.x), "y": int(p.y), "curve": CURVE_NAME}
+                  for p in points]
+    scalars = [random_scalar() for _ in range(n)]
+    r = random_scalar()
+    rows = []
+
+    with Timer() as ecc:
+        acc = ECC.EccPoint(0, 0, CURVE_NAME)
+        for point, t in zip(serialized, scalars):
+            acc = acc + ECC.EccPoint(point["x"], point["y"], CURVE_NAME) * t
+        expected = acc * r
+    with Timer() as jac:
+        result = jacobian.linear_combination(
+            [JacobianPoint.from_dict(point) for point in serialized],
+            [t * r for t in scalars],
+        ).to_ecc()
+    assert result == expected
+    rows.append(("prod alpha^t", ecc, jac))
+
+    with Timer() as ecc:
+        acc = ECC.EccPoint(0, 0, CURVE_NAME)
+        for point in points:
+            acc = acc + point
+    # Already-built EccPoints: in-place addition beats converting them
+    with Timer() as in_place:
+        total = ECC.EccPoint(0, 0, CURVE_NAME)
+        for point in points:
+            total += point
+    assert total == acc
+    rows.append(("sum (in place)", ecc, in_place))
+
+    Q, ptk = points[0], points[1]
+    base = jacobian.fixed_base(JacobianPoint.generator())
+    table = jacobian.fixed_base(Q)
+    ptk_jac = JacobianPoint.from_ecc(ptk)
+    with Timer() as ecc:
+        for k in scalars:
+            g * k
+            Q * k + ptk * k
+    with Timer() as jac:
+        for k in scalars:
+            base.mul(k).to_ecc()
+            c2 = table.mul(k)
+            c2 += ptk_jac * k
+            c2.to_ecc()
+    rows.append(("raise-h encrypt", ecc, jac))
+
+    # g^r_i of raise-h: serialized point by point from EccPoints, or kept
+    # in Jacobian coordinates and normalized with a single inversion
+    g_r = [base.mul(k) for k in scalars]
+    g_r_ecc = [point.to_ecc() for point in g_r]
+    with Timer() as ecc:
+        expected = [{"x": int(p.x), "y": int(p.y), "curve": CURVE_NAME}
+                    for p in g_r_ecc]
+    with Timer() as jac:
+        serialized = jacobian.serialize_points(g_r)
+    assert serialized == expected
+    rows.append(("serialize", ecc, jac))
+
+    print(f"{'loop':<18}{'EccPoint (ms)':>15}{'Jacobian (ms)':>15}"
+          f"{'speedup':>9}")
+    for name, ecc, jac in rows:
+        print(f"{name:<18}{ecc.elapsed * 1e3:>15.2f}{jac.elapsed * 1e3:>15.2f}"
+              f"{ecc.elapsed / jac.elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
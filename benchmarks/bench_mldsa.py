@@ -0,0 +1,65 @@
+"""ML-DSA signing and verification throughput per implementation.
+
+Times key generation, signing and verification for every installed
+implementation (liboqs, pqcrypto, dilithium-py) and parameter set, and
+reports key and signature sizes. Needs no Hyperion checkout.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import Timer
+from client.pqc_primitives import (
+    IMPLEMENTATIONS,
+    PARAMETER_SETS,
+    available_implementations,
+    load_scheme,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--parameter-sets", nargs="+", default=list(PARAMETER_SETS)
+    )
+    parser.add_argument(
+        "--implementations", nargs="+", default=list(IMPLEMENTATIONS)
+    )
+    args = parser.parse_args()
+
+    message = b"hyperion ballot hash " * 4
+    print(f"{'implementation':>14} {'set':>9} | {'keygen/s':>9} "
+          f"{'sign/s':>9} {'verify/s':>9} | {'pk':>5} {'sk':>5} {'sig':>5}")
+    for parameter_set in args.parameter_sets:
+        installed = available_implementations(parameter_set)
+        for implementation in args.implementations:
+            if implementation not in installed:
+                print(f"{implementation:>14} {parameter_set:>9} | not installed")
+                continue
+            scheme = load_scheme(parameter_set, implementation)
+            with Timer() as t:
+                keys = [scheme.keygen() for _ in range(args.repeat)]
+            keygen = t.elapsed
+            public_key, secret_key = keys[0]
+            with Timer() as t:
+                signatures = [
+                    scheme.sign(secret_key, message) for _ in range(args.repeat)
+                ]
+            sign = t.elapsed
+            with Timer() as t:
+                for signature in signatures:
+                    assert scheme.verify(public_key, message, signature)
+            verify = t.elapsed
+
+            n = args.repeat
+            print(f"{implementation:>14} {parameter_set:>9} | "
+                  f"{n / keygen:>9.1f} {n / sign:>9.1f} {n / verify:>9.1f} | "
+                  f"{len(public_key):>5} {len(secret_key):>5} "
+                  f"{len(signatures[0]):>5}")
+
+
+if __name__ == "__main__":
+    main()
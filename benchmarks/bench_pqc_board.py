@@ -0,0 +1,80 @@
+"""Bulletin board size and serialization time for PQC ballots.
+
+Compares pickling ballots that carry raw ML-DSA keys and signatures with
+the pack_board layout (key table plus fixed-stride signatures) and with
+boards that refer to an already published key registry. Also checks that
+every signature still verifies after unpacking. Needs no Hyperion checkout.
+"""
+import argparse
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import Timer
+from client.pqc_primitives import (
+    MLDSA44,
+    MLDSA65,
+    MLDSA87,
+    KeyRegistry,
+    pack_board,
+    unpack_board,
+)
+
+SCHEMES = {"44": MLDSA44, "65": MLDSA65, "87": MLDSA87}
+
+
+def measure(name, encode, decode, repeat):
+    with Timer() as t:
+        for _ in range(repeat):
+            data = encode()
+    encode_time = t.elapsed / repeat
+    with Timer() as t:
+        for _ in range(repeat):
+            decode(data)
+    decode_time = t.elapsed / repeat
+    print(f"{name:>22} | {len(data):>10} {encode_time * 1000:>9.2f} "
+          f"{decode_time * 1000:>9.2f}")
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("voters", type=int, nargs="?", default=100)
+    parser.add_argument("--level", choices=sorted(SCHEMES), default="44")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    dsa = SCHEMES[args.level]()
+    keys = [dsa.keygen() for _ in range(args.voters)]
+    ballots = [
+        {"spk": verification_key, "sig": dsa.sign(signing_key, i)}
+        for i, (signing_key, verification_key) in enumerate(keys)
+    ]
+    raw = [
+        {"spk": ballot["spk"].public_key, "sig": ballot["sig"]}
+        for ballot in ballots
+    ]
+    roll = KeyRegistry()
+    for ballot in ballots:
+        roll.add(ballot["spk"].public_key)
+
+    print(f"{args.voters} ballots, ML-DSA-{args.level}")
+    print(f"{'layout':>22} | {'bytes':>10} {'enc ms':>9} {'dec ms':>9}")
+    measure("pickle (raw keys)", lambda: pickle.dumps(raw), pickle.loads,
+            args.repeat)
+    packed = measure("pack_board", lambda: pack_board(ballots), unpack_board,
+                     args.repeat)
+    measure("pack_board (registry)", lambda: pack_board(ballots, roll),
+            lambda data: unpack_board(data, roll), args.repeat)
+
+    with Timer() as t:
+        ok = all(dsa.verify(key, signature, i)
+                 for i, (key, signature) in enumerate(unpack_board(packed)))
+    assert ok
+    print(f"verified {args.voters} unpacked signatures in {t.elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
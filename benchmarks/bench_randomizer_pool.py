@@ -0,0 +1,62 @@
+"""Online EC-ElGamal encryption cost with and without a randomizer pool.
+
+Times the offline pool fill and the per-ballot encryption of a vote under
+the election key with ElGamalEncryption, the fixed-base table and the
+precomputed (r, rG, rQ) pool.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import Timer, make_curve, make_tellers, use_fork
+import precompute
+from primitives import ElGamalEncryption
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("ballots", type=int, nargs="?", default=200)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    use_fork()
+    curve = make_curve()
+    pub_key, _ = make_tellers(curve, 3, 2)
+    Q = pub_key.Q
+    ege = ElGamalEncryption(curve)
+    message = curve.raise_p(1)
+    n = args.ballots
+
+    with Timer() as plain:
+        for _ in range(n):
+            ege.encrypt(Q, message)
+
+    with Timer() as table_build:
+        table = precompute.FixedBaseTable(Q)
+    precompute.register_table(table)
+    with Timer() as tabled:
+        for _ in range(n):
+            precompute.encrypt(curve, Q, message)
+    precompute.clear_tables()
+
+    pool = precompute.RandomizerPool(Q)
+    with Timer() as fill:
+        pool.fill(n, args.processes or precompute.workers.available_cpus())
+    precompute.register_pool(pool)
+    with Timer() as pooled:
+        for _ in range(n):
+            precompute.encrypt(curve, Q, message)
+    precompute.clear_pools()
+
+    print(f"{'mode':<16}{'offline (s)':>12}{'per ballot (ms)':>17}")
+    print(f"{'ElGamal':<16}{0.0:>12.3f}{plain.elapsed / n * 1e3:>17.3f}")
+    print(f"{'fixed-base':<16}{table_build.elapsed:>12.3f}"
+          f"{tabled.elapsed / n * 1e3:>17.3f}")
+    print(f"{'pool':<16}{fill.elapsed:>12.3f}"
+          f"{pooled.elapsed / n * 1e3:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
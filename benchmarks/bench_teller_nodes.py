@@ -0,0 +1,92 @@
+"""Teller-node mode vs. in-process tellers on one machine.
+
+Measures raise-h and partial decryption with every teller in the current
+process and with one TellerNode process per teller, and reports the bytes
+exchanged and the time not spent computing on the nodes.
+"""
+import argparse
+import os
+import queue
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import threshold_crypto as tc
+
+from common import Timer, make_ballots, make_curve, make_tellers, use_fork
+from teller_node import TellerCoordinator
+
+
+def tagged_ciphertexts(ballots):
+    """[index, ev, ev] records in the layout mp_partial_decrypt expects."""
+    records = []
+    for index, ballot in enumerate(ballots):
+        ev = [
+            tc.data._ecc_point_to_serializable(ballot["ev"][0]),
+            tc.data._ecc_point_to_serializable(ballot["ev"][1]),
+        ]
+        records.append([index, ev, ev])
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("voters", type=int, nargs="?", default=200)
+    parser.add_argument("tellers", type=int, nargs="?", default=3)
+    parser.add_argument("threshold", type=int, nargs="?", default=2)
+    parser.add_argument("--shard-size", type=int, default=64)
+    parser.add_argument(
+        "--socket", action="store_true", help="use TCP on 127.0.0.1 instead of pipes"
+    )
+    args = parser.parse_args()
+
+    use_fork()
+    curve = make_curve()
+    pub_key, tellers = make_tellers(curve, args.tellers, args.threshold)
+    ballots = make_ballots(curve, pub_key, args.voters)
+    ciphertexts = tagged_ciphertexts(ballots)
+
+    # The same batched calls, in the same shards, as the nodes make
+    with Timer() as local_raise:
+        for teller in tellers:
+            for i in range(0, len(ballots), args.shard_size):
+                teller.raise_h_entries(ballots[i : i + args.shard_size])
+    with Timer() as local_pd:
+        for teller in tellers:
+            for i in range(0, len(ciphertexts), args.shard_size):
+                q1, q2, q3 = (
+                    queue.SimpleQueue(),
+                    queue.SimpleQueue(),
+                    queue.SimpleQueue(),
+                )
+                teller.mp_partial_decrypt(
+                    ciphertexts[i : i + args.shard_size], q1, q2, q3
+                )
+
+    addresses = None
+    if args.socket:
+        addresses = [("127.0.0.1", 0)] * len(tellers)
+    with TellerCoordinator(tellers, args.shard_size, addresses) as coordinator:
+        with Timer() as node_raise:
+            coordinator.raise_h([[i, b] for i, b in enumerate(ballots)])
+        with Timer() as node_pd:
+            coordinator.partial_decrypt(ciphertexts)
+        stats = coordinator.stats()
+
+    print(
+        f"voters={args.voters} tellers={args.tellers} "
+        f"shard_size={args.shard_size} transport={'tcp' if args.socket else 'pipe'}"
+    )
+    print(f"{'phase':<20}{'in-process (s)':>16}{'nodes (s)':>12}")
+    print(f"{'raise-h':<20}{local_raise.elapsed:>16.3f}{node_raise.elapsed:>12.3f}")
+    print(f"{'partial decryption':<20}{local_pd.elapsed:>16.3f}{node_pd.elapsed:>12.3f}")
+    print()
+    print(f"{'node':<6}{'sent (B)':>12}{'recv (B)':>12}{'codec (s)':>11}"
+          f"{'compute (s)':>13}{'overhead (s)':>14}")
+    for i, s in enumerate(stats):
+        print(f"{i:<6}{s['bytes_sent']:>12}{s['bytes_received']:>12}"
+              f"{s['codec_time']:>11.3f}{s['compute_time']:>13.3f}{s['overhead']:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
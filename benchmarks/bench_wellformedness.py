@@ -0,0 +1,68 @@
+"""OR-proof vs. binary-decomposition range proof for ballot well-formedness.
+
+For each max vote value, times proving and verifying both proofs and
+reports their size in EC points.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import Timer, make_curve, make_tellers
+from primitives import ChaumPedersenProof, ElGamalEncryption
+from range_proof import BinaryRangeProof, or_proof_points, range_proof_points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--max-votes", type=int, nargs="+", default=[2, 4, 8, 16, 32, 64, 100]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    curve = make_curve()
+    pub_key, _ = make_tellers(curve, 3, 2)
+    Q = pub_key.Q
+    ege = ElGamalEncryption(curve)
+    chmp = ChaumPedersenProof(curve)
+    brp = BinaryRangeProof(curve)
+
+    print(f"{'max_votes':>9} | {'OR pts':>6} {'prove':>8} {'verify':>8} | "
+          f"{'range pts':>9} {'prove':>8} {'verify':>8}")
+    for vote_max in args.max_votes:
+        or_prove = or_verify = rp_prove = rp_verify = 0.0
+        for i in range(args.repeat):
+            vote = random.randrange(0, vote_max)
+            c1, c2, r = ege.encrypt(Q, curve.raise_p(vote))
+            ciphertext = {"c1": c1, "c2": c2}
+
+            with Timer() as t:
+                proof = chmp.prove_or_n(ciphertext, r, Q, vote_max, vote, i)
+            or_prove += t.elapsed
+            with Timer() as t:
+                ok = chmp.verify_or_n(
+                    ciphertext, Q, proof[0], proof[1], proof[2], proof[3], i
+                )
+            or_verify += t.elapsed
+            assert ok
+
+            with Timer() as t:
+                proof = brp.prove(ciphertext, r, Q, vote_max, vote, i)
+            rp_prove += t.elapsed
+            with Timer() as t:
+                ok = brp.verify(ciphertext, Q, proof, vote_max, i)
+            rp_verify += t.elapsed
+            assert ok
+
+        n = args.repeat
+        print(f"{vote_max:>9} | {or_proof_points(vote_max):>6} "
+              f"{or_prove / n:>8.4f} {or_verify / n:>8.4f} | "
+              f"{range_proof_points(vote_max):>9} "
+              f"{rp_prove / n:>8.4f} {rp_verify / n:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Shared election setup for the benchmark scripts.
+
+Run the benchmarks from the project root with Hyperion on the path, e.g.
+
+    PYTHONPATH=hyperion:. python benchmarks/bench_teller_nodes.py
+
+Hyperion's curve wrapper is created from HYPERION_CURVE ("module:callable",
+default "primitives:Curve"), called with the curve name.
+"""
+import importlib
+import multiprocessing
+import os
+import time
+
+CURVE_NAME = "P-256"
+
+
+def make_curve():
+    spec = os.environ.get("HYPERION_CURVE", "primitives:Curve")
+    module_name, _, attr = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory(CURVE_NAME)
+
+
+def make_tellers(curve, tellers, threshold):
+    import threshold_crypto as tc
+    from parties import Teller
+
+    pub_key, key_shares = Teller.generate_threshold_keys(
+        threshold, tellers, tc.CurveParameters()
+    )
+    return pub_key, [Teller(curve, share, pub_key) for share in key_shares]
+
+
+def make_ballots(curve, pub_key, voters, max_votes=2):
+    """Cast voters ballots through the normal Voter flow."""
+    from parties import Voter
+
+    ballots = []
+    for i in range(voters):
+        voter = Voter(curve, i, 0, max_votes)
+        voter.choose_vote_value()
+        voter.generate_dsa_keys()
+        voter.generate_trapdoor_keypair()
+        voter.generate_pok_trapdoor_keypair()
+        voter.encrypt_vote(pub_key)
+        voter.generate_wellformedness_proof(pub_key)
+        ballots.append(voter.sign_ballot())
+    return ballots
+
+
+def use_fork():
+    try:
+        multiprocessing.set_start_method("fork")
+    except RuntimeError:
+        pass
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
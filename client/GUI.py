@@ -1,26 +1,96 @@
 import sys
 import os
 import re
+import time
+import threading
+
+_T0 = time.perf_counter()
+
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QTabWidget, QHBoxLayout,
     QPushButton, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QTextEdit,
     QSpinBox, QFormLayout, QGroupBox, QMessageBox, QProgressDialog, QScrollArea,
-    QSplitter, QFrame, QCheckBox
+    QSplitter, QFrame, QCheckBox, QLineEdit, QComboBox, QFileDialog
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, QUrl, pyqtSignal
 from PyQt5.QtGui import QPixmap, QFont
 
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from .receipts import ReceiptIndex
 
-from .hyperion_runner import run_hyperion as hyperion_run
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 LAST_BB = None
+LAST_BB_INDEX = None
+
+_RUNNER = {}
+_RUNNER_THREAD = None
+
+
+def _import_runner():
+    try:
+        from .hyperion_runner import (run_hyperion, default_checkpoint_dir,
+                                      default_profile_dir)
+        from .warm_worker import WarmWorker, WorkerError
+        from .result_cache import ResultCache
+        from . import setup_cache
+    except Exception as e:
+        # Kept and raised by runner_module on the thread that needs it
+        _RUNNER["import_error"] = e
+        return
+    _RUNNER["run"] = run_hyperion
+    _RUNNER["result_cache"] = ResultCache(os.path.join(PROJECT_ROOT, ".cache", "results"))
+    _RUNNER["worker_error"] = WorkerError
+    _RUNNER["checkpoint_dir"] = default_checkpoint_dir
+    _RUNNER["profile_dir"] = default_profile_dir
+    _RUNNER["setup_cache"] = setup_cache
+    # Not started yet: WarmWorker.run starts the process on the first run,
+    # so opening the GUI without running an election spawns nothing
+    _RUNNER["warm_worker"] = WarmWorker(PROJECT_ROOT)
+
+
+def stop_runner():
+    """
+    Stop the warm worker, if a run started it.
+    """
+    if _RUNNER_THREAD is not None:
+        _RUNNER_THREAD.join()
+    worker = _RUNNER.get("warm_worker")
+    if worker is not None:
+        worker.close()
+
+
+def preload_runner():
+    """
+    Import the Hyperion runner stack on a background thread.
+    """
+    global _RUNNER_THREAD
+    if _RUNNER_THREAD is None:
+        _RUNNER_THREAD = threading.Thread(target=_import_runner, daemon=True)
+        _RUNNER_THREAD.start()
+
+
+def runner_module(name="run"):
+    """
+    Return a runner component, waiting for the background import if needed.
+    Raises the error of a failed import.
+    """
+    preload_runner()
+    _RUNNER_THREAD.join()
+    if "import_error" in _RUNNER:
+        raise _RUNNER["import_error"]
+    return _RUNNER[name]
+
 
 class HyperionWorker(QThread):
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     
-    def __init__(self, voters, tellers, threshold, max_votes, use_pqc, project_root):
+    def __init__(self, voters, tellers, threshold, max_votes, use_pqc, project_root,
+                 setup_cache=None, wfn_proof="or_n", verify_views=False,
+                 checkpoint_dir=None, replay_from=None, signature=None,
+                 worker_timeout=None, randomizer_pool=0, seed=None,
+                 incremental_batch=0, memory_profile=False, profile_dir=None,
+                 hash_suite="sha256"):
         super().__init__()
         self.voters = voters
         self.tellers = tellers
@@ -28,26 +98,73 @@ class HyperionWorker(QThread):
         self.max_votes = max_votes
         self.use_pqc = use_pqc
         self.project_root = project_root
-        self.old_cwd = os.getcwd()
+        self.setup_cache = setup_cache
+        self.wfn_proof = wfn_proof
+        self.verify_views = verify_views
+        self.checkpoint_dir = checkpoint_dir
+        self.replay_from = replay_from
+        self.signature = signature
+        self.worker_timeout = worker_timeout
+        self.randomizer_pool = randomizer_pool
+        self.seed = seed
+        self.incremental_batch = incremental_batch
+        self.memory_profile = memory_profile
+        self.profile_dir = profile_dir
+        self.hash_suite = hash_suite
     
     def run(self):
         try:
-            os.chdir(self.project_root)
-            result = hyperion_run(
-                voters=self.voters,
-                tellers=self.tellers,
-                threshold=self.threshold,
-                max_votes=self.max_votes,
-                use_pqc=self.use_pqc
-            )
-            os.chdir(self.old_cwd)
-            self.finished.emit({
-                "tally": result["bulletin_board"],
-                "timings": result["timings"],
-            })
+            worker = runner_module("warm_worker")
+            worker_error = runner_module("worker_error")
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        try:
+            result = self._run(worker)
+        except (worker_error, OSError):
+            # The warm worker could not start or died; fall back to a
+            # fresh interpreter
+            try:
+                result = self._run(None)
+            except Exception as e:
+                self.error.emit(str(e))
+                return
         except Exception as e:
-            os.chdir(self.old_cwd)
             self.error.emit(str(e))
+            return
+        self.finished.emit({
+            "tally": result["bulletin_board"],
+            "timings": result["timings"],
+            "cached": result.get("cached", False),
+            "memory": result.get("memory", {}),
+            "profile": result.get("profile", {}),
+        })
+
+    def _run(self, worker):
+        hyperion_run = runner_module("run")
+        return hyperion_run(
+            voters=self.voters,
+            tellers=self.tellers,
+            threshold=self.threshold,
+            max_votes=self.max_votes,
+            use_pqc=self.use_pqc,
+            setup_cache=self.setup_cache,
+            project_root=self.project_root,
+            wfn_proof=self.wfn_proof,
+            verify_views=self.verify_views,
+            checkpoint_dir=self.checkpoint_dir,
+            replay_from=self.replay_from,
+            signature=self.signature,
+            worker=worker,
+            worker_timeout=self.worker_timeout,
+            randomizer_pool=self.randomizer_pool,
+            seed=self.seed,
+            incremental_batch=self.incremental_batch,
+            memory_profile=self.memory_profile,
+            profile_dir=self.profile_dir,
+            hash_suite=self.hash_suite,
+            result_cache=runner_module("result_cache")
+        )
 
 
 def format_vote_display(vote_str):
@@ -73,6 +190,40 @@ def format_vote_display(vote_str):
     return vote_str
 
 
+# Memory accounting phase (hyperion_files/checkpoint.py) of each timing column
+MEMORY_PHASES = {
+    "Setup": "setup",
+    "Voting (avg.)": "voting",
+    "Tallying (Mixing)": "mixing",
+    "Tallying (Decryption)": "decryption",
+    "Notification": "notification",
+    "Verification (avg.)": "verification",
+    "Coercion Mitigation": "coercion",
+    "Individual Views": "coercion",
+}
+
+
+def memory_item(phase):
+    """
+    Stats table cell of one phase's memory report: the total peak RSS, with
+    the split and the largest Python allocations as its tooltip.
+    """
+    item = QTableWidgetItem(f"{phase['total']:.1f}")
+    lines = [
+        f"Main process: {phase['parent']:.1f} MB",
+        f"Largest worker: {phase['workers']:.1f} MB",
+        f"Python allocations (peak): {phase['python']:.1f} MB",
+    ]
+    if phase["top"]:
+        lines.append("")
+        lines.append("Largest allocation sites:")
+        for entry in phase["top"]:
+            lines.append(f"  {entry['location']}  {entry['size']:.2f} MB "
+                         f"({entry['blocks']} blocks)")
+    item.setToolTip("\n".join(lines))
+    return item
+
+
 def get_bb_direct():
     """
     Get bulletin board from local storage.
@@ -95,12 +246,38 @@ class GUIApp(QWidget):
         self.tab_tally.setLayout(self.build_tally_tab())
         self.tabs.addTab(self.tab_tally, "Hyperion Protocol")
 
+        # Built on first show, see _ensure_bb_tab
         self.tab_bb = QWidget()
-        self.tab_bb.setLayout(self.build_bb_tab())
+        self.tab_bb_built = False
         self.tabs.addTab(self.tab_bb, "Bulletin Board")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
         layout.addWidget(self.tabs)
         self.setLayout(layout)
+
+    def _on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.tab_bb:
+            self._ensure_bb_tab()
+
+    def _ensure_bb_tab(self):
+        if self.tab_bb_built:
+            return
+        self.tab_bb_built = True
+        self.tab_bb.setLayout(self.build_bb_tab())
+        if LAST_BB:
+            self.do_show_bb()
+        # Let the tab paint before decoding the diagram and the HTML
+        QTimer.singleShot(0, self._load_bb_assets)
+
+    def _load_bb_assets(self):
+        diagram_path = os.path.join(PROJECT_ROOT, "diagrams", "seq2_update.png")
+        if os.path.exists(diagram_path):
+            pixmap = QPixmap(diagram_path)
+            scaled_pixmap = pixmap.scaledToWidth(350, Qt.SmoothTransformation)
+            self.seq_diagram.setPixmap(scaled_pixmap)
+        else:
+            self.seq_diagram.setText("(Sequence diagram not found)")
+        self.explanation_text.setHtml(self._get_protocol_explanation())
     
     def build_tally_tab(self):
         layout = QVBoxLayout()
@@ -139,12 +316,131 @@ class GUIApp(QWidget):
         self.spin_max_votes.setMaximum(100)
         self.spin_max_votes.setValue(2)
         settings_layout.addRow("Max Vote Value:", self.spin_max_votes)
+
+        self.combo_wfn_proof = QComboBox()
+        self.combo_wfn_proof.addItem("OR-proof (one branch per value)", "or_n")
+        self.combo_wfn_proof.addItem("Range proof (binary decomposition)", "range")
+        self.combo_wfn_proof.addItem("Auto (smaller proof)", "auto")
+        self.combo_wfn_proof.setToolTip(
+            "Well-formedness proof attached to each ballot.\n\n"
+            "The OR-proof grows linearly with the max vote value,\n"
+            "the range proof logarithmically."
+        )
+        settings_layout.addRow("Well-formedness Proof:", self.combo_wfn_proof)
+
+        self.combo_hash = QComboBox()
+        self.combo_hash.addItem("SHA-256", "sha256")
+        self.combo_hash.addItem("SHA3-256", "sha3-256")
+        self.combo_hash.addItem("SHAKE-256", "shake-256")
+        self.combo_hash.addItem("BLAKE2b", "blake2b")
+        self.combo_hash.setToolTip(
+            "Hash function of the election transcript: ballot signatures,\n"
+            "decryption-proof challenges and ML-DSA key digests.\n\n"
+            "See benchmarks/bench_hash.py for the cost of each."
+        )
+        settings_layout.addRow("Hash:", self.combo_hash)
         
         self.chk_pqc = QCheckBox("Enable Post-Quantum Cryptography (ML-DSA)")
         self.chk_pqc.setToolTip(
             "When enabled, replaces ECDSA signatures with ML-DSA.\n\n"
         )
         settings_layout.addRow("", self.chk_pqc)
+
+        self.combo_signature = QComboBox()
+        for level in ("44", "65", "87"):
+            self.combo_signature.addItem(f"ML-DSA-{level}", f"ml-dsa-{level}")
+        self.combo_signature.setCurrentIndex(1)
+        self.combo_signature.setEnabled(False)
+        self.combo_signature.setToolTip(
+            "ML-DSA parameter set used in PQC mode\n"
+            "(NIST security categories 2, 3 and 5)."
+        )
+        self.chk_pqc.toggled.connect(self.combo_signature.setEnabled)
+        settings_layout.addRow("ML-DSA Parameter Set:", self.combo_signature)
+
+        self.chk_setup_cache = QCheckBox("Reuse cached election setup")
+        self.chk_setup_cache.setToolTip(
+            "Loads threshold keys and precomputed tables from .cache/ when a\n"
+            "valid setup for the same tellers and threshold exists, and\n"
+            "saves a new one otherwise."
+        )
+        settings_layout.addRow("", self.chk_setup_cache)
+
+        self.chk_randomizer_pool = QCheckBox("Precompute encryption randomizers")
+        self.chk_randomizer_pool.setToolTip(
+            "Computes (r, rG, rQ) for every voting and raise-h encryption\n"
+            "on all cores during Setup, so each online encryption is a\n"
+            "single point addition."
+        )
+        settings_layout.addRow("", self.chk_randomizer_pool)
+
+        self.chk_incremental = QCheckBox("Tally ballots while voting is open")
+        self.chk_incremental.setToolTip(
+            "Tellers validate ballots and run raise-h on them in batches\n"
+            "while voting goes on, so after voting closes only the last\n"
+            "batch, mixing and decryption remain."
+        )
+        settings_layout.addRow("", self.chk_incremental)
+
+        self.chk_memory_profile = QCheckBox("Account memory per phase")
+        self.chk_memory_profile.setToolTip(
+            "Adds the peak RSS of every phase (main process and workers) to\n"
+            "the statistics table; hover a value for the largest Python\n"
+            "allocations. Tracing allocations slows the run down."
+        )
+        settings_layout.addRow("", self.chk_memory_profile)
+
+        self.chk_profile = QCheckBox("Profile the run")
+        self.chk_profile.setToolTip(
+            "Samples the stacks of the run and all its worker processes and\n"
+            "writes a flamegraph per phase to .cache/profiles/ (collapsed\n"
+            "stacks and a speedscope file); a link appears after the run."
+        )
+        settings_layout.addRow("", self.chk_profile)
+
+        self.chk_verify_views = QCheckBox("Verify individual views")
+        self.chk_verify_views.setToolTip(
+            "Checks every individual view with one batched check\n"
+            "(adds verification time to the 'Individual Views' column)."
+        )
+        settings_layout.addRow("", self.chk_verify_views)
+
+        self.combo_checkpoints = QComboBox()
+        self.combo_checkpoints.addItem("Off", None)
+        self.combo_checkpoints.addItem("Record all phases", "record")
+        for phase in ("voting", "mixing", "decryption", "notification",
+                      "verification", "coercion"):
+            self.combo_checkpoints.addItem(f"Rerun from {phase.capitalize()}", phase)
+        self.combo_checkpoints.setToolTip(
+            "Saves every phase's inputs and outputs to .cache/checkpoints/.\n\n"
+            "Replay loads the phases before the chosen one from the last\n"
+            "recorded run with the same settings and only runs the rest."
+        )
+        settings_layout.addRow("Phase Checkpoints:", self.combo_checkpoints)
+
+        self.spin_worker_timeout = QSpinBox()
+        self.spin_worker_timeout.setRange(0, 3600)
+        self.spin_worker_timeout.setValue(0)
+        self.spin_worker_timeout.setSuffix(" s")
+        self.spin_worker_timeout.setSpecialValueText("No limit")
+        self.spin_worker_timeout.setToolTip(
+            "Longest time one chunk of a teller's parallel work may take.\n\n"
+            "A worker that exceeds it or crashes is restarted and its chunk\n"
+            "retried; the run fails after three attempts instead of hanging."
+        )
+        settings_layout.addRow("Worker Timeout:", self.spin_worker_timeout)
+
+        self.spin_seed = QSpinBox()
+        self.spin_seed.setRange(-1, 2**31 - 1)
+        self.spin_seed.setValue(-1)
+        self.spin_seed.setSpecialValueText("Random")
+        self.spin_seed.setToolTip(
+            "Seeds all randomness of the run, so the same settings and seed\n"
+            "give the same bulletin board. Seeded results are cached in\n"
+            ".cache/results/ and repeated runs are answered from there.\n\n"
+            "For testing only: a seeded election is not secure."
+        )
+        settings_layout.addRow("Seed:", self.spin_seed)
         
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
@@ -184,6 +480,12 @@ class GUIApp(QWidget):
         self.table_stats.hide()
         layout.addWidget(self.table_stats)
 
+        self.profile_label = QLabel()
+        self.profile_label.setTextFormat(Qt.RichText)
+        self.profile_label.setOpenExternalLinks(True)
+        self.profile_label.hide()
+        layout.addWidget(self.profile_label)
+
         return layout
 
     def build_bb_tab(self):
@@ -215,13 +517,7 @@ class GUIApp(QWidget):
         
         self.seq_diagram = QLabel()
         self.seq_diagram.setAlignment(Qt.AlignCenter)
-        diagram_path = os.path.join(PROJECT_ROOT, "diagrams", "seq2_update.png")
-        if os.path.exists(diagram_path):
-            pixmap = QPixmap(diagram_path)
-            scaled_pixmap = pixmap.scaledToWidth(350, Qt.SmoothTransformation)
-            self.seq_diagram.setPixmap(scaled_pixmap)
-        else:
-            self.seq_diagram.setText("(Sequence diagram not found)")
+        self.seq_diagram.setText("Loading diagram...")
         
         scroll_diagram = QScrollArea()
         scroll_diagram.setWidget(self.seq_diagram)
@@ -242,7 +538,6 @@ class GUIApp(QWidget):
         self.explanation_text = QTextEdit()
         self.explanation_text.setReadOnly(True)
         self.explanation_text.setMinimumHeight(200)
-        self.explanation_text.setHtml(self._get_protocol_explanation())
         explanation_layout.addWidget(self.explanation_text)
         
         content_layout.addWidget(explanation_frame, 1)
@@ -268,7 +563,30 @@ class GUIApp(QWidget):
         )
         btn_refresh.setMaximumWidth(120)
         results_header.addWidget(btn_refresh)
+
+        btn_export = QPushButton("Export...")
+        btn_export.clicked.connect(self.do_export_bb)
+        btn_export.setToolTip(
+            "Writes the bulletin board in columnar form (Arrow/Parquet with\n"
+            "pyarrow, otherwise raw memory-mappable column files)."
+        )
+        btn_export.setMaximumWidth(120)
+        results_header.addWidget(btn_export)
         results_header.addStretch()
+
+        self.receipt_input = QLineEdit()
+        self.receipt_input.setPlaceholderText("Commitment (Base64) to verify")
+        self.receipt_input.setMinimumWidth(280)
+        self.receipt_input.returnPressed.connect(self.do_verify_receipt)
+        results_header.addWidget(self.receipt_input)
+
+        btn_verify = QPushButton("Verify Receipt")
+        btn_verify.clicked.connect(self.do_verify_receipt)
+        btn_verify.setToolTip(
+            "Looks up a voter's commitment g^(r·x) on the bulletin board\n"
+            "using a hash index (constant time per receipt)."
+        )
+        results_header.addWidget(btn_verify)
         
         bottom_layout.addLayout(results_header)
         
@@ -389,7 +707,7 @@ class GUIApp(QWidget):
             <tr><td>Zero-Knowledge Proofs</td><td>NIZK + Chaum-Pedersen + Fiat-Shamir</td><td><span class="pqc">Lattice-based Sigma protocols + FS-with-aborts / zk-STARKs</span></td></tr>
             <tr><td>Threshold Decryption</td><td>EC-ElGamal threshold</td><td><span class="pqc">Threshold ML-KEM (research)</span></td></tr>
             <tr><td>Mixnet Shuffle</td><td>ElGamal-compatible (Terelius-Wikström)</td><td><span class="pqc">Ring-LWE shuffle (research)</span></td></tr>
-            <tr><td>Hash Functions</td><td>SHA-256</td><td><span class="pqc">SHA-3 / SHAKE-256</span></td></tr>
+            <tr><td>Hash Functions</td><td>SHA-256</td><td><span class="pqc">SHA3-256 / SHAKE-256 / BLAKE2b</span> (Hash setting)</td></tr>
         </table>
         
         <h3>Understanding the Output</h3>
@@ -413,7 +731,44 @@ class GUIApp(QWidget):
                               f"Threshold ({threshold}) cannot be greater than number of tellers ({tellers})")
             return
 
-        mode_text = "PQC Mode (ML-DSA-65)" if use_pqc else "Classical Mode (ECDSA)"
+        signature = self.combo_signature.currentData() if use_pqc else None
+        if use_pqc:
+            mode_text = f"PQC Mode ({self.combo_signature.currentText()})"
+        else:
+            mode_text = "Classical Mode (ECDSA)"
+
+        setup_cache = None
+        if self.chk_setup_cache.isChecked():
+            cache = runner_module("setup_cache")
+            setup_cache = cache.default_cache_path(PROJECT_ROOT, tellers, threshold)
+            info = cache.setup_info(setup_cache)
+            if info and info["threshold"] == threshold and info["tellers"] == tellers:
+                mode_text += f"\nCached setup {info['hash'][:12]}"
+
+        seed = self.spin_seed.value() if self.spin_seed.value() >= 0 else None
+        if seed is not None:
+            mode_text += f"\nSeed {seed}"
+        if self.combo_hash.currentData() != "sha256":
+            mode_text += f"\n{self.combo_hash.currentText()} transcript hash"
+
+        checkpoint_dir = None
+        replay_from = self.combo_checkpoints.currentData()
+        if replay_from:
+            checkpoint_dir = runner_module("checkpoint_dir")(
+                PROJECT_ROOT, voters, tellers, threshold, max_votes
+            )
+            if replay_from == "record":
+                replay_from = None
+            else:
+                mode_text += f"\nReplaying phases before {replay_from}"
+
+        profile_dir = None
+        if self.chk_profile.isChecked():
+            profile_dir = runner_module("profile_dir")(
+                PROJECT_ROOT, voters, tellers, threshold, max_votes
+            )
+            mode_text += "\nProfiling"
+
         self.progress = QProgressDialog(f"Running Hyperion Protocol...\n{mode_text}", None, 0, 0, self)
         self.progress.setWindowTitle("Please Wait")
         self.progress.setWindowModality(Qt.WindowModal)
@@ -422,14 +777,33 @@ class GUIApp(QWidget):
         self.progress.setMinimumDuration(0)
         self.progress.show()
         
-        self.worker = HyperionWorker(voters, tellers, threshold, max_votes, use_pqc, PROJECT_ROOT)
+        self.worker = HyperionWorker(voters, tellers, threshold, max_votes, use_pqc, PROJECT_ROOT,
+                                     setup_cache=setup_cache,
+                                     wfn_proof=self.combo_wfn_proof.currentData(),
+                                     verify_views=self.chk_verify_views.isChecked(),
+                                     checkpoint_dir=checkpoint_dir,
+                                     replay_from=replay_from,
+                                     signature=signature,
+                                     worker_timeout=self.spin_worker_timeout.value() or None,
+                                     randomizer_pool=2 * voters if self.chk_randomizer_pool.isChecked() else 0,
+                                     seed=seed,
+                                     incremental_batch=32 if self.chk_incremental.isChecked() else 0,
+                                     memory_profile=self.chk_memory_profile.isChecked(),
+                                     profile_dir=profile_dir,
+                                     hash_suite=self.combo_hash.currentData())
         self.worker.finished.connect(self._on_hyperion_finished)
+        self.worker.error.connect(self._on_hyperion_error)
         self.worker.start()
     
+    def _on_hyperion_error(self, message):
+        self.progress.close()
+        QMessageBox.critical(self, "Hyperion Failed", message)
+
     def _on_hyperion_finished(self, res):
-        global LAST_BB
+        global LAST_BB, LAST_BB_INDEX
         self.progress.close()
         LAST_BB = res.get("tally", [])
+        LAST_BB_INDEX = ReceiptIndex(LAST_BB)
         
         # Populate tally table
         tally_rows = res.get("tally", [])
@@ -442,15 +816,16 @@ class GUIApp(QWidget):
             self.table_tally.setItem(row_idx, 1, vote_item)
             self.table_tally.setItem(row_idx, 2, QTableWidgetItem(row.get("commitment", "")))
 
-        # Populate Bulletin Board
-        self.table_bb.setRowCount(len(tally_rows))
-        for row_idx, row in enumerate(tally_rows):
-            self.table_bb.setItem(row_idx, 0, QTableWidgetItem(str(row_idx + 1)))
-            vote_str = format_vote_display(row.get("vote", ""))
-            vote_item = QTableWidgetItem(vote_str)
-            self.table_bb.setRowHeight(row_idx, 80)
-            self.table_bb.setItem(row_idx, 1, vote_item)
-            self.table_bb.setItem(row_idx, 2, QTableWidgetItem(row.get("commitment", "")))
+        # Populate Bulletin Board (filled from LAST_BB when first shown)
+        if self.tab_bb_built:
+            self.table_bb.setRowCount(len(tally_rows))
+            for row_idx, row in enumerate(tally_rows):
+                self.table_bb.setItem(row_idx, 0, QTableWidgetItem(str(row_idx + 1)))
+                vote_str = format_vote_display(row.get("vote", ""))
+                vote_item = QTableWidgetItem(vote_str)
+                self.table_bb.setRowHeight(row_idx, 80)
+                self.table_bb.setItem(row_idx, 1, vote_item)
+                self.table_bb.setItem(row_idx, 2, QTableWidgetItem(row.get("commitment", "")))
 
         # Populate Timing Statistics table
         timings = res.get("timings", {})
@@ -465,11 +840,16 @@ class GUIApp(QWidget):
                 ("Coercion Mitigation", "Coercion Mitigation"),
                 ("Individual Views", "Individual Views"),
             ]
+            memory = res.get("memory", {})
             
             available_phases = [(key, name) for key, name in timing_phases if key in timings]
             
             if available_phases:
                 self.table_stats.setColumnCount(len(available_phases))
+                rows = 2 if memory else 1
+                self.table_stats.clearContents()
+                self.table_stats.setRowCount(rows)
+                self.table_stats.setVerticalHeaderLabels(["Time (seconds)", "Peak RSS (MB)"][:rows])
                 self.table_stats.setHorizontalHeaderLabels([name for _, name in available_phases])
                 
                 for col_idx in range(len(available_phases)):
@@ -483,10 +863,19 @@ class GUIApp(QWidget):
                         formatted_value = str(value)
                     
                     self.table_stats.setItem(0, col_idx, QTableWidgetItem(formatted_value))
+
+                    phase = memory.get(MEMORY_PHASES.get(key))
+                    if phase:
+                        self.table_stats.setItem(1, col_idx, memory_item(phase))
+
+                for row in range(rows):
+                    self.table_stats.setRowHeight(row, 30)
+                self.table_stats.setFixedHeight(30 + 30 * rows)
                 
-                self.table_stats.setRowHeight(0, 30)
-                self.table_stats.setFixedHeight(60) 
-                
+                if res.get("cached"):
+                    self.stats_label.setText("Performance Statistics (seconds, cached run)")
+                else:
+                    self.stats_label.setText("Performance Statistics (seconds)")
                 self.stats_label.show()
                 self.table_stats.show()
             else:
@@ -496,6 +885,22 @@ class GUIApp(QWidget):
             self.stats_label.hide()
             self.table_stats.hide()
 
+        profile = res.get("profile", {})
+        if profile.get("speedscope"):
+            speedscope = profile["speedscope"]
+            folder = os.path.dirname(speedscope)
+            self.profile_label.setText(
+                f'Profile: <a href="{QUrl.fromLocalFile(folder).toString()}">'
+                f'{folder}</a> &mdash; open <a href="'
+                f'{QUrl.fromLocalFile(speedscope).toString()}">'
+                f'{os.path.basename(speedscope)}</a> in '
+                f'<a href="https://www.speedscope.app">speedscope</a>, or '
+                f'render a &lt;phase&gt;.folded file with flamegraph.pl'
+            )
+            self.profile_label.show()
+        else:
+            self.profile_label.hide()
+
     def do_show_bb(self):
         res = get_bb_direct()
         
@@ -513,9 +918,81 @@ class GUIApp(QWidget):
             self.table_bb.setItem(row_idx, 1, vote_item)
             self.table_bb.setItem(row_idx, 2, QTableWidgetItem(row.get("commitment", "")))
 
+    def do_verify_receipt(self):
+        commitment = self.receipt_input.text().strip()
+        if not commitment:
+            return
+        if LAST_BB_INDEX is None:
+            QMessageBox.warning(self, "No Data", "No bulletin board available. Run Hyperion first.")
+            return
+
+        row = LAST_BB_INDEX.lookup(commitment)
+        if row is None:
+            QMessageBox.warning(self, "Receipt Not Found",
+                                "This commitment does not appear on the bulletin board.")
+            return
+
+        if self.table_bb.rowCount() != len(LAST_BB):
+            self.do_show_bb()
+        self.table_bb.selectRow(row)
+        self.table_bb.scrollToItem(self.table_bb.item(row, 0))
+        QMessageBox.information(self, "Receipt Verified",
+                                f"Commitment found on the bulletin board (row {row + 1}).")
+
+    def do_export_bb(self):
+        if not LAST_BB:
+            QMessageBox.warning(self, "No Data", "No bulletin board available. Run Hyperion first.")
+            return
+
+        from . import board_export
+
+        file_format = board_export.default_format()
+        if file_format == "columns":
+            path = QFileDialog.getExistingDirectory(self, "Export Bulletin Board To")
+        else:
+            path, selected = QFileDialog.getSaveFileName(
+                self, "Export Bulletin Board", "bulletin_board.arrow",
+                "Arrow IPC (*.arrow);;Parquet (*.parquet)"
+            )
+            if path.endswith(".parquet") or selected.startswith("Parquet"):
+                file_format = "parquet"
+        if not path:
+            return
+
+        try:
+            rows = board_export.export_board(
+                LAST_BB, path, file_format, max_votes=self.spin_max_votes.value()
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+            return
+        QMessageBox.information(self, "Export Complete",
+                                f"Wrote {rows} rows ({file_format}) to {path}.")
+
+
+def report_startup(app, t_app, t_window):
+    """
+    Print startup timings (--startup-time) and quit.
+    """
+    t_paint = time.perf_counter()
+    print(f"[STARTUP] imports:     {(t_app - _T0) * 1000:8.1f} ms")
+    print(f"[STARTUP] window:      {(t_window - t_app) * 1000:8.1f} ms")
+    print(f"[STARTUP] first paint: {(t_paint - t_window) * 1000:8.1f} ms")
+    print(f"[STARTUP] total:       {(t_paint - _T0) * 1000:8.1f} ms")
+    app.quit()
+
 
 if __name__ == "__main__":
+    measure_startup = "--startup-time" in sys.argv
+    if measure_startup:
+        sys.argv.remove("--startup-time")
     app = QApplication(sys.argv)
+    t_app = time.perf_counter()
+    preload_runner()
+    app.aboutToQuit.connect(stop_runner)
     win = GUIApp()
     win.show()
+    if measure_startup:
+        t_window = time.perf_counter()
+        QTimer.singleShot(0, lambda: report_startup(app, t_app, t_window))
     sys.exit(app.exec_())
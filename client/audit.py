@@ -0,0 +1,63 @@
+"""
+Third-party audit of a finished election's decryption proofs.
+
+    python -m client.audit CHECKPOINT_DIR [--processes N] [--json PATH]
+                           [--hash NAME]
+
+Checks every teller's partial-decryption proofs recorded in a checkpoint
+directory (run_hyperion(..., checkpoint_dir=...)) with hyperion/auditor.py
+and prints a pass/fail report. The proofs are checked with the election's
+hash suite: --hash, or else the one published at setup; proofs made with
+another fail. The exit status is 0 only if every proof holds.
+"""
+import argparse
+import json
+import os
+import sys
+
+from .hyperion_entry import setup_paths
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="audit")
+    parser.add_argument("checkpoint_dir")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--timeout", type=float)
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--hash", dest="hash_suite")
+    parser.add_argument("--project-root")
+    return parser.parse_args(argv)
+
+
+def audit_election(checkpoint_dir, processes=None, timeout=None,
+                   project_root=None, hash_suite=None):
+    """
+    AuditReport of the decryption proofs recorded in checkpoint_dir, under
+    hash_suite (default: the suite published at setup).
+    """
+    setup_paths(os.path.abspath(project_root or os.getcwd()))
+    import auditor
+    return auditor.audit_directory(checkpoint_dir, processes, timeout,
+                                   hash_suite)
+
+
+def main(argv):
+    options = parse_args(argv)
+    setup_paths(os.path.abspath(options.project_root or os.getcwd()))
+    import auditor
+    try:
+        report = audit_election(options.checkpoint_dir, options.processes,
+                                options.timeout, options.project_root,
+                                options.hash_suite)
+    except auditor.AuditError as e:
+        print(f"[AUDIT] {e}")
+        return 2
+    print(report.summary())
+    if options.json_path:
+        with open(options.json_path, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,225 @@
+import json
+import mmap
+import os
+import re
+import struct
+
+from .receipts import commitment_key
+
+COORD_BYTES = 32
+DEFAULT_BATCH_SIZE = 65536
+NO_VOTE = -1
+
+FORMATS = ("arrow", "parquet", "columns")
+
+_X_RE = re.compile(r"'x':\s*(\d+)")
+_Y_RE = re.compile(r"'y':\s*(\d+)")
+
+# Raw column layout of the "columns" format: name -> struct code per row
+_FIXED_COLUMNS = {
+    "voter_index": "q",
+    "vote": "i",
+}
+_DTYPES = {
+    "voter_index": "<i8",
+    "x": f"S{COORD_BYTES}",
+    "y": f"S{COORD_BYTES}",
+    "commitment": "u1",
+    "commitment_offsets": "<i8",
+    "vote": "<i4",
+}
+
+
+def parse_point(vote_str):
+    """(x, y) from a "{'x': ..., 'y': ..., 'curve': ...}" string, or None."""
+    if isinstance(vote_str, dict):
+        return int(vote_str["x"]), int(vote_str["y"])
+    x_match = _X_RE.search(vote_str or "")
+    y_match = _Y_RE.search(vote_str or "")
+    if not (x_match and y_match):
+        return None
+    return int(x_match.group(1)), int(y_match.group(1))
+
+
+def vote_table(max_votes):
+    """Map (x, y) of v*G to v for v in [0, max_votes)."""
+    from Crypto.PublicKey import ECC
+
+    curve = ECC._curves["P-256"]
+    generator = ECC.EccPoint(curve.Gx, curve.Gy, "P-256")
+    table = {(0, 0): 0}
+    acc = ECC.EccPoint(0, 0, "P-256")
+    for v in range(1, max_votes):
+        acc += generator
+        table[(int(acc.x), int(acc.y))] = v
+    return table
+
+
+def iter_batches(rows, batch_size=DEFAULT_BATCH_SIZE, max_votes=None, start=0):
+    """Convert board rows into column batches of at most batch_size rows.
+
+    Each batch is a dict of lists: voter_index, x and y (32-byte big-endian),
+    commitment (raw bytes) and vote (decoded value, NO_VOTE if unknown or
+    max_votes is not given).
+    """
+    table = vote_table(max_votes) if max_votes else {}
+    batch = _empty_batch()
+    index = start
+    for row in rows:
+        point = parse_point(row.get("vote", ""))
+        x, y = point if point else (0, 0)
+        batch["voter_index"].append(index)
+        batch["x"].append(x.to_bytes(COORD_BYTES, "big"))
+        batch["y"].append(y.to_bytes(COORD_BYTES, "big"))
+        batch["commitment"].append(commitment_key(row.get("commitment", "")))
+        batch["vote"].append(table.get(point, NO_VOTE) if point else NO_VOTE)
+        index = index + 1
+        if len(batch["voter_index"]) >= batch_size:
+            yield batch
+            batch = _empty_batch()
+    if batch["voter_index"]:
+        yield batch
+
+
+def _empty_batch():
+    return {"voter_index": [], "x": [], "y": [], "commitment": [], "vote": []}
+
+
+def _arrow_schema(pa):
+    return pa.schema(
+        [
+            ("voter_index", pa.int64()),
+            ("x", pa.binary(COORD_BYTES)),
+            ("y", pa.binary(COORD_BYTES)),
+            ("commitment", pa.binary()),
+            ("vote", pa.int32()),
+        ]
+    )
+
+
+def _write_arrow(batches, path, file_format):
+    import pyarrow as pa
+
+    schema = _arrow_schema(pa)
+    rows = 0
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(path, schema)
+        write = writer.write_batch
+    else:
+        sink = pa.OSFile(path, "wb")
+        writer = pa.ipc.new_file(sink, schema)
+        write = writer.write_batch
+    try:
+        for batch in batches:
+            write(pa.record_batch(batch, schema=schema))
+            rows = rows + len(batch["voter_index"])
+    finally:
+        writer.close()
+        if file_format != "parquet":
+            sink.close()
+    return rows
+
+
+def _write_columns(batches, path):
+    """Raw little-endian column files plus schema.json; see load_columns."""
+    os.makedirs(path, exist_ok=True)
+    files = {
+        name: open(os.path.join(path, f"{name}.bin"), "wb")
+        for name in ("voter_index", "x", "y", "commitment", "vote")
+    }
+    offsets = open(os.path.join(path, "commitment_offsets.bin"), "wb")
+    rows = 0
+    offset = 0
+    try:
+        offsets.write(struct.pack("<q", 0))
+        for batch in batches:
+            n = len(batch["voter_index"])
+            for name, code in _FIXED_COLUMNS.items():
+                files[name].write(struct.pack(f"<{n}{code}", *batch[name]))
+            files["x"].write(b"".join(batch["x"]))
+            files["y"].write(b"".join(batch["y"]))
+            ends = []
+            for commitment in batch["commitment"]:
+                offset = offset + len(commitment)
+                ends.append(offset)
+            files["commitment"].write(b"".join(batch["commitment"]))
+            offsets.write(struct.pack(f"<{n}q", *ends))
+            rows = rows + n
+    finally:
+        for f in files.values():
+            f.close()
+        offsets.close()
+    schema = {"rows": rows, "columns": _DTYPES}
+    with open(os.path.join(path, "schema.json"), "w") as f:
+        json.dump(schema, f, indent=2)
+    return rows
+
+
+def default_format():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "columns"
+    return "arrow"
+
+
+def export_board(rows, path, file_format=None, batch_size=DEFAULT_BATCH_SIZE,
+                 max_votes=None):
+    """
+    Write bulletin board rows (as returned by parse_bulletin_board) to path
+    in columnar form, streaming batch_size rows at a time.
+
+    file_format is "arrow" (IPC file, memory-mappable), "parquet" (both need
+    pyarrow) or "columns" (a directory of raw column files, no dependencies).
+    Returns the number of rows written.
+    """
+    file_format = file_format or default_format()
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {file_format}")
+    batches = iter_batches(rows, batch_size, max_votes)
+    if file_format == "columns":
+        return _write_columns(batches, path)
+    return _write_arrow(batches, path, file_format)
+
+
+def load_columns(path):
+    """
+    Memory-map a "columns" export. Returns a dict of column name to NumPy
+    array (or a memoryview of the raw bytes without NumPy); commitment is the raw data buffer,
+    sliced by "commitment_offsets" (rows + 1 int64 boundaries).
+    """
+    with open(os.path.join(path, "schema.json")) as f:
+        schema = json.load(f)
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    columns = {}
+    for name, dtype in schema["columns"].items():
+        file_path = os.path.join(path, f"{name}.bin")
+        if os.path.getsize(file_path) == 0:
+            # mmap cannot map empty files
+            columns[name] = np.empty(0, dtype) if np else memoryview(b"")
+        elif np is not None:
+            columns[name] = np.memmap(file_path, mode="r", dtype=dtype)
+        else:
+            with open(file_path, "rb") as f:
+                columns[name] = memoryview(
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                )
+    if np is not None and len(columns["voter_index"]) != schema["rows"]:
+        raise ValueError(f"{path}: expected {schema['rows']} rows")
+    return columns
+
+
+def commitment_at(columns, row):
+    """Commitment bytes of one row of a load_columns result."""
+    offsets = columns["commitment_offsets"]
+    if isinstance(offsets, memoryview):
+        start, end = struct.unpack_from("<2q", offsets, row * 8)
+    else:
+        start, end = int(offsets[row]), int(offsets[row + 1])
+    return bytes(columns["commitment"][start:end])
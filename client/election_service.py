@@ -0,0 +1,255 @@
+import asyncio
+import itertools
+import os
+import signal
+
+from . import signature_backends
+from .hyperion_runner import (ENTRY_COMMAND, build_command, build_result,
+                              child_env)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class ElectionConfig:
+    """Parameters and execution context of a single Hyperion run.
+
+    project_root is the child's working directory and env holds environment
+    overrides, so jobs never depend on (or change) the service's own cwd.
+    """
+
+    def __init__(self, voters=50, tellers=3, threshold=2, max_votes=2,
+                 use_pqc=False, setup_cache=None, project_root=None, env=None,
+                 wfn_proof="or_n", verify_views=False, checkpoint_dir=None,
+                 replay_from=None, signature=None, worker_timeout=None,
+                 randomizer_pool=0, seed=None, incremental_batch=0,
+                 memory_profile=False, profile_dir=None, hash_suite="sha256"):
+        self.voters = voters
+        self.tellers = tellers
+        self.threshold = threshold
+        self.max_votes = max_votes
+        self.use_pqc = use_pqc
+        self.setup_cache = setup_cache
+        self.project_root = os.path.abspath(project_root or os.getcwd())
+        self.env = dict(env or {})
+        self.wfn_proof = wfn_proof
+        self.verify_views = verify_views
+        self.checkpoint_dir = checkpoint_dir
+        self.replay_from = replay_from
+        self.signature = signature_backends.resolve(signature, use_pqc)
+        self.use_pqc = signature_backends.is_pqc(self.signature)
+        self.worker_timeout = worker_timeout
+        self.randomizer_pool = randomizer_pool
+        self.seed = seed
+        self.incremental_batch = incremental_batch
+        self.memory_profile = memory_profile
+        self.profile_dir = profile_dir
+        self.hash_suite = hash_suite
+
+    def command(self):
+        return build_command(
+            self.voters, self.tellers, self.threshold, self.max_votes,
+            self.use_pqc, setup_cache=self.setup_cache,
+            project_root=self.project_root, wfn_proof=self.wfn_proof,
+            verify_views=self.verify_views,
+            checkpoint_dir=self.checkpoint_dir, replay_from=self.replay_from,
+            signature=self.signature, worker_timeout=self.worker_timeout,
+            randomizer_pool=self.randomizer_pool, seed=self.seed,
+            incremental_batch=self.incremental_batch,
+            memory_profile=self.memory_profile,
+            profile_dir=self.profile_dir,
+            hash_suite=self.hash_suite,
+        )
+
+    def cache_config(self):
+        """What identifies this run's result; as in run_hyperion."""
+        return {"args": self.command()[len(ENTRY_COMMAND):], "env": self.env,
+                "seed": self.seed}
+
+    def __repr__(self):
+        return (
+            f"ElectionConfig(voters={self.voters}, tellers={self.tellers}, "
+            f"threshold={self.threshold}, max_votes={self.max_votes}, "
+            f"signature={self.signature!r})"
+        )
+
+
+class ElectionJob:
+    """Handle for a submitted election; await wait() for its result."""
+
+    def __init__(self, job_id, config):
+        self.id = job_id
+        self.config = config
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.returncode = None
+        self._task = None
+        self._process = None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    async def wait(self):
+        """Wait for the job and return its result dict.
+
+        Raises asyncio.CancelledError if the job was cancelled and
+        RuntimeError if the child process failed.
+        """
+        try:
+            await asyncio.shield(self._task)
+        except asyncio.CancelledError:
+            if self.state != CANCELLED:
+                raise
+        if self.state == CANCELLED:
+            raise asyncio.CancelledError(f"job {self.id} cancelled")
+        if self.state == FAILED:
+            raise RuntimeError(f"job {self.id} failed: {self.error}")
+        return self.result
+
+    def cancel(self):
+        """Cancel the job; a running child and its workers are killed."""
+        if self.finished or self._task is None:
+            return False
+        self._task.cancel()
+        return True
+
+    def __repr__(self):
+        return f"ElectionJob(id={self.id}, state={self.state}, {self.config!r})"
+
+
+class ElectionService:
+    """Runs Hyperion elections as concurrent child processes.
+
+    At most max_concurrent children run at once; further jobs wait in
+    submission order. Must be used from within a running event loop.
+    With a result_cache, seeded configurations that were run before are
+    answered from it without starting a child.
+    """
+
+    def __init__(self, max_concurrent=None, result_cache=None):
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.result_cache = result_cache
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._semaphore = None
+        self._completed = None
+        self._pending = 0
+
+    def submit(self, config):
+        """Queue config for execution and return its ElectionJob."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._completed = asyncio.Queue()
+        job = ElectionJob(next(self._ids), config)
+        job._task = asyncio.ensure_future(self._run(job))
+        job._task.add_done_callback(lambda task: self._on_done(job, task))
+        self.jobs[job.id] = job
+        self._pending = self._pending + 1
+        return job
+
+    def submit_many(self, configs):
+        return [self.submit(config) for config in configs]
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        return job.cancel() if job is not None else False
+
+    async def results(self):
+        """Yield jobs in completion order until every submitted job is done."""
+        while self._pending:
+            job = await self._completed.get()
+            self._pending = self._pending - 1
+            yield job
+
+    async def run_all(self, configs):
+        """Run configs concurrently and return their jobs in input order."""
+        jobs = self.submit_many(configs)
+        await asyncio.gather(*(job._task for job in jobs),
+                             return_exceptions=True)
+        return jobs
+
+    async def shutdown(self):
+        """Cancel every unfinished job and wait for the children to exit."""
+        tasks = [job._task for job in self.jobs.values() if not job.finished]
+        for job in self.jobs.values():
+            job.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job):
+        try:
+            async with self._semaphore:
+                job.state = RUNNING
+                await self._execute(job)
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+            await self._kill(job)
+        except Exception as e:
+            job.state = FAILED
+            job.error = f"{type(e).__name__}: {e}"
+
+    def _on_done(self, job, task):
+        # A job cancelled before it started never enters _run
+        if task.cancelled():
+            job.state = CANCELLED
+        self._completed.put_nowait(job)
+
+    async def _execute(self, job):
+        config = job.config
+        key = None
+        if self.result_cache is not None and config.seed is not None:
+            key = self.result_cache.key(config.cache_config(),
+                                        config.project_root)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                job.result = dict(cached, cached=True)
+                job.returncode = 0
+                job.state = DONE
+                return
+        job._process = await asyncio.create_subprocess_exec(
+            *config.command(),
+            cwd=config.project_root,
+            env=child_env(config.env),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            # Own process group, so cancel() also reaches forked workers
+            start_new_session=True,
+        )
+        stdout, stderr = await job._process.communicate()
+        job.returncode = job._process.returncode
+        job.result = build_result(
+            stdout.decode("UTF-8", "replace"),
+            stderr.decode("UTF-8", "replace"),
+            config.use_pqc,
+            config.setup_cache,
+            config.signature,
+        )
+        job.result["seed"] = config.seed
+        if job.returncode != 0:
+            job.state = FAILED
+            job.error = f"exit status {job.returncode}"
+        else:
+            job.state = DONE
+            if key is not None and job.result["bulletin_board"]:
+                self.result_cache.put(key, job.result)
+
+    async def _kill(self, job):
+        process = job._process
+        if process is None or process.returncode is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+async def run_elections(configs, max_concurrent=None, result_cache=None):
+    """Convenience wrapper: run configs and return their result dicts."""
+    service = ElectionService(max_concurrent, result_cache)
+    jobs = await service.run_all(configs)
+    return [job.result for job in jobs]
@@ -0,0 +1,265 @@
+"""
+Entry point of the Hyperion child process.
+
+    python -m client.hyperion_entry VOTERS TELLERS THRESHOLD [-maxv N] ...
+
+Applies the run configuration (signature backend, setup cache, checkpoints,
+protocol settings) and then runs hyperion/main.py. main.py is loaded with
+SourceFileLoader.get_code, so its bytecode is cached in __pycache__ like an
+imported module instead of being recompiled on every run.
+
+With --serve the process becomes a warm worker: it imports Hyperion and the
+signature backends once, then forks a fresh child for every run request read
+from stdin (one JSON object per line). Configuration and the request's
+environment are applied in the child, so runs with different settings do
+not affect each other and none of them pays for a cold start. Replies go to
+a pipe of their own (the file descriptor after the project root), never to
+stdout, so output printed while modules are imported cannot corrupt them.
+
+    python -m client.hyperion_entry --serve PROJECT_ROOT CHANNEL_FD
+"""
+import argparse
+import builtins
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import traceback
+import types
+from importlib.machinery import SourceFileLoader
+
+from . import signature_backends
+
+MAIN_PATH = os.path.join("hyperion", "main.py")
+
+_MAIN_CODE = {}
+
+# Reports of this run (checkpoint summary, memory, profiles), called by
+# run() when the run ends. The installers register no exit handlers, so a
+# run forked from the warm worker, which leaves with os._exit, reports
+# exactly like a run in a process of its own.
+_REPORTS = []
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="hyperion_entry")
+    parser.add_argument("voters", type=int)
+    parser.add_argument("tellers", type=int)
+    parser.add_argument("threshold", type=int)
+    parser.add_argument("-maxv", dest="max_votes", type=int, default=2)
+    parser.add_argument("--signature", default=signature_backends.DEFAULT,
+                        choices=signature_backends.available_backends())
+    parser.add_argument("--setup-cache")
+    parser.add_argument("--wfn-proof", default="or_n")
+    parser.add_argument("--verify-views", action="store_true")
+    parser.add_argument("--checkpoint-dir")
+    parser.add_argument("--replay-from")
+    parser.add_argument("--worker-timeout", type=float)
+    parser.add_argument("--randomizer-pool", type=int, default=0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--incremental-batch", type=int, default=0)
+    parser.add_argument("--memory-profile", action="store_true")
+    parser.add_argument("--profile-dir")
+    parser.add_argument("--hash", dest="hash_suite", default="sha256")
+    parser.add_argument("--project-root")
+    return parser.parse_args(argv)
+
+
+def setup_paths(project_root):
+    for path in (project_root, os.path.join(project_root, "hyperion")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def main_code(project_root):
+    """
+    Code object of hyperion/main.py, read from its cached bytecode when the
+    source has not changed.
+    """
+    path = os.path.join(project_root, MAIN_PATH)
+    if path not in _MAIN_CODE:
+        _MAIN_CODE[path] = SourceFileLoader("__main__", path).get_code("__main__")
+    return _MAIN_CODE[path]
+
+
+def configure(options):
+    """
+    Apply the run options to the Hyperion modules of this process.
+    """
+    if options.seed is not None:
+        # First, so key generation below is seeded as well
+        from determinism import install_seed
+        install_seed(options.seed)
+
+    # Before any keys are registered or ballots signed
+    from hashsuite import install_suite
+    install_suite(options.hash_suite)
+
+    backend = signature_backends.install_backend(options.signature)
+    if signature_backends.is_pqc(options.signature):
+        # Key digests are the points ballot signatures hash
+        from .pqc_primitives import KEY_REGISTRY
+        KEY_REGISTRY.set_suite(options.hash_suite)
+        scheme = getattr(backend(None), "scheme", None)
+        implementation = f" ({scheme.name})" if hasattr(scheme, "name") else ""
+        print(f"[PQC] {options.signature.upper()}{implementation} enabled - replacing ECDSA signatures")
+        print()
+
+    if options.setup_cache:
+        from client.setup_cache import install_setup_cache
+        install_setup_cache(options.setup_cache)
+
+    if options.randomizer_pool:
+        from precompute import install_randomizer_pool
+        install_randomizer_pool(options.randomizer_pool)
+
+    if options.incremental_batch:
+        from incremental import install_incremental_tally
+        install_incremental_tally(options.incremental_batch)
+
+    if options.checkpoint_dir:
+        from checkpoint import install_checkpoints
+        store = install_checkpoints(options.checkpoint_dir, options.replay_from)
+        _REPORTS.append(lambda: print(store.summary()))
+
+    if options.memory_profile:
+        from memory import install_memory_accounting
+        _REPORTS.append(install_memory_accounting().finish)
+
+    if options.profile_dir:
+        from profiler import install_profiler
+        _REPORTS.append(install_profiler(options.profile_dir).finish)
+
+    import parties
+    parties.VOTE_MAX = options.max_votes
+    if options.wfn_proof != "or_n":
+        parties.WELLFORMEDNESS_PROOF = options.wfn_proof
+    if options.verify_views:
+        parties.VERIFY_INDIVIDUAL_VIEWS = True
+    if options.worker_timeout:
+        parties.WORKER_TIMEOUT = options.worker_timeout
+
+
+def run_main(options):
+    """
+    Run hyperion/main.py as __main__ with the given options.
+    """
+    code = main_code(options.project_root)
+    # A real __main__ module, so functions defined in main.py can be
+    # pickled by reference and found again in forked workers.
+    module = types.ModuleType("__main__")
+    module.__dict__.update({"__file__": MAIN_PATH, "__builtins__": builtins})
+    sys.modules["__main__"] = module
+    sys.argv = [MAIN_PATH, str(options.voters), str(options.tellers),
+                str(options.threshold), "-maxv", str(options.max_votes)]
+    exec(code, module.__dict__)
+
+
+def run(argv):
+    options = parse_args(argv)
+    options.project_root = os.path.abspath(options.project_root or os.getcwd())
+    setup_paths(options.project_root)
+    try:
+        multiprocessing.set_start_method("fork")
+    except RuntimeError:
+        pass
+
+    try:
+        configure(options)
+        run_main(options)
+    except Exception as e:
+        if not signature_backends.is_pqc(options.signature):
+            raise
+        print(f"[PQC ERROR] {type(e).__name__}: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        _report()
+
+
+def _preload(project_root):
+    setup_paths(project_root)
+    signature_backends.preload()
+    try:
+        import primitives  # noqa: F401
+        import parties  # noqa: F401
+        main_code(project_root)
+    except (ImportError, OSError):
+        # Reported by the first run instead
+        pass
+
+
+def _report():
+    """Call the reports of this run, last installed first."""
+    while _REPORTS:
+        try:
+            _REPORTS.pop()()
+        except Exception:
+            traceback.print_exc()
+
+
+def _run_forked(argv, env=None, channel=None):
+    """
+    Run argv in a forked child with env added to its environment; returns
+    (returncode, stdout, stderr).
+    """
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                if channel is not None:
+                    # Only the worker itself replies
+                    os.close(channel.fileno())
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os.dup2(out.fileno(), 1)
+                os.dup2(err.fileno(), 2)
+                os.environ.update(env or {})
+                run(argv)
+                code = 0
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if not isinstance(e.code, (int, type(None))):
+                    print(e.code, file=sys.stderr)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        out.seek(0)
+        err.seek(0)
+        return (os.waitstatus_to_exitcode(status),
+                out.read().decode("UTF-8", "replace"),
+                err.read().decode("UTF-8", "replace"))
+
+
+def serve(project_root, channel_fd):
+    """
+    Answer run requests ({"argv": [...], "env": {...}}) from stdin, one per
+    line, with {"returncode", "stdout", "stderr"} on channel_fd until EOF.
+    """
+    channel = os.fdopen(channel_fd, "w")
+    _preload(project_root)
+    channel.write(json.dumps({"ready": True}) + "\n")
+    channel.flush()
+    for line in sys.stdin:
+        if not line.strip():
+            break
+        request = json.loads(line)
+        returncode, stdout, stderr = _run_forked(
+            request["argv"], request.get("env"), channel
+        )
+        channel.write(json.dumps({"returncode": returncode, "stdout": stdout,
+                                  "stderr": stderr}) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--serve"]:
+        serve(os.path.abspath(sys.argv[2]), int(sys.argv[3]))
+    else:
+        run(sys.argv[1:])
@@ -1,80 +1,229 @@
+import os
 import subprocess
 import re
 
-def run_hyperion(voters=50, tellers=3, threshold=2, max_votes=2, use_pqc=False):
+from . import signature_backends
+from .result_cache import cached_run
+
+ENTRY_COMMAND = ["python3", "-m", "client.hyperion_entry"]
+WFN_PROOF_MODES = ("or_n", "range", "auto")
+# Transcript hash suites, as in hyperion_files/hashsuite.py
+HASH_SUITES = ("sha256", "sha3-256", "shake-256", "blake2b")
+# Protocol phases in order, as in hyperion_files/checkpoint.py
+CHECKPOINT_PHASES = ("setup", "voting", "mixing", "decryption",
+                     "notification", "verification", "coercion")
+
+def default_checkpoint_dir(project_root, voters, tellers, threshold, max_votes):
     """
-    Sets multiprocessing to 'fork' mode for Linux compatibility.
-    
-    Args:
-        voters: Number of voters
-        tellers: Number of tellers
-        threshold: Threshold for decryption (K of N)
-        max_votes: Maximum vote value
-        use_pqc: If True, use post-quantum ML-DSA signatures instead of ECDSA
+    Checkpoint directory for an election configuration under .cache/.
     """
-    if use_pqc:
-        # Run via PQC wrapper which patches Hyperion to use ML-DSA
-        wrapper_code = f"""
-import sys
-import os
-import traceback
-import multiprocessing
-
-try:
-    multiprocessing.set_start_method('fork')
-except RuntimeError:
-    pass
-
-# Setup paths - add project root and hyperion to path
-project_root = os.getcwd()
-sys.path.insert(0, os.path.join(project_root, 'hyperion'))
-sys.path.insert(0, project_root)
-
-try:
-    # Import and patch primitives with PQC
-    from client.pqc_primitives import MLDSA
-    
-    import primitives
-    primitives.DSA = MLDSA
-    print("[PQC] ML-DSA enabled - replacing ECDSA signatures")
-    print()
-    
-    # Run Hyperion
-    sys.argv = ['hyperion/main.py', '{voters}', '{tellers}', '{threshold}', '-maxv', '{max_votes}']
-    exec(compile(open('hyperion/main.py').read(), 'hyperion/main.py', 'exec'))
-except Exception as e:
-    print(f"[PQC ERROR] {{type(e).__name__}}: {{e}}")
-    traceback.print_exc()
-    sys.exit(1)
-"""
-    else:
-        # Standard mode - run Hyperion with fork method set
-        wrapper_code = f"""
-import sys
-import multiprocessing
-multiprocessing.set_start_method('fork')
-sys.argv = ['hyperion/main.py', '{voters}', '{tellers}', '{threshold}', '-maxv', '{max_votes}']
-exec(compile(open('hyperion/main.py').read(), 'hyperion/main.py', 'exec'))
-"""
-    
-    cmd = ["python3", "-c", wrapper_code]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-
-    output = proc.stdout
-    stderr = proc.stderr
+    name = f"v{voters}_t{tellers}_k{threshold}_m{max_votes}"
+    return os.path.join(project_root, ".cache", "checkpoints", name)
+
+def default_profile_dir(project_root, voters, tellers, threshold, max_votes):
+    """
+    Profile directory for an election configuration under .cache/.
+    """
+    name = f"v{voters}_t{tellers}_k{threshold}_m{max_votes}"
+    return os.path.join(project_root, ".cache", "profiles", name)
+
+def entry_args(voters=50, tellers=3, threshold=2, max_votes=2, signature="ecdsa",
+               setup_cache=None, project_root=None, wfn_proof="or_n",
+               verify_views=False, checkpoint_dir=None, replay_from=None,
+               worker_timeout=None, randomizer_pool=0, seed=None,
+               incremental_batch=0, memory_profile=False, profile_dir=None,
+               hash_suite="sha256"):
+    """
+    Arguments of client.hyperion_entry for one run.
+    """
+    if wfn_proof not in WFN_PROOF_MODES:
+        raise ValueError(f"Unknown well-formedness proof mode: {wfn_proof}")
+    if hash_suite not in HASH_SUITES:
+        raise ValueError(f"Unknown hash suite: {hash_suite}")
+    if replay_from is not None:
+        if replay_from not in CHECKPOINT_PHASES:
+            raise ValueError(f"Unknown phase: {replay_from}")
+        if not checkpoint_dir:
+            raise ValueError("replay_from requires checkpoint_dir")
+
+    args = [str(voters), str(tellers), str(threshold), "-maxv", str(max_votes),
+            "--signature", signature, "--wfn-proof", wfn_proof]
+    if project_root:
+        args += ["--project-root", os.path.abspath(project_root)]
+    if setup_cache:
+        args += ["--setup-cache", setup_cache]
+    if verify_views:
+        args.append("--verify-views")
+    if checkpoint_dir:
+        args += ["--checkpoint-dir", os.path.abspath(checkpoint_dir)]
+    if replay_from:
+        args += ["--replay-from", replay_from]
+    if worker_timeout:
+        args += ["--worker-timeout", str(worker_timeout)]
+    if randomizer_pool:
+        args += ["--randomizer-pool", str(randomizer_pool)]
+    if seed is not None:
+        args += ["--seed", str(seed)]
+    if incremental_batch:
+        args += ["--incremental-batch", str(incremental_batch)]
+    if memory_profile:
+        args.append("--memory-profile")
+    if profile_dir:
+        args += ["--profile-dir", os.path.abspath(profile_dir)]
+    if hash_suite != HASH_SUITES[0]:
+        args += ["--hash", hash_suite]
+    return args
+
+def build_command(voters=50, tellers=3, threshold=2, max_votes=2, use_pqc=False,
+                  setup_cache=None, project_root=None, wfn_proof="or_n",
+                  verify_views=False, checkpoint_dir=None, replay_from=None,
+                  signature=None, worker_timeout=None, randomizer_pool=0,
+                  seed=None, incremental_batch=0, memory_profile=False,
+                  profile_dir=None, hash_suite="sha256"):
+    """
+    Build the argv of the Hyperion child process.
+
+    The child is started with project_root as its working directory, so
+    'hyperion/main.py' and the client package resolve there without touching
+    the caller's cwd. The run itself is set up by client.hyperion_entry.
+    """
+    project_root = os.path.abspath(project_root or os.getcwd())
+    signature = signature_backends.resolve(signature, use_pqc)
+    return ENTRY_COMMAND + entry_args(
+        voters, tellers, threshold, max_votes, signature,
+        setup_cache=setup_cache, project_root=project_root,
+        wfn_proof=wfn_proof, verify_views=verify_views,
+        checkpoint_dir=checkpoint_dir, replay_from=replay_from,
+        worker_timeout=worker_timeout, randomizer_pool=randomizer_pool,
+        seed=seed, incremental_batch=incremental_batch,
+        memory_profile=memory_profile, profile_dir=profile_dir,
+        hash_suite=hash_suite,
+    )
+
+def build_result(stdout, stderr, use_pqc=False, setup_cache=None, signature=None):
+    """
+    Parse the child's output into the result dict returned by run_hyperion.
+    """
+    output = stdout
     
     if stderr:
         output = output + "\n[STDERR]\n" + stderr
     
     timings = parse_timings(output)
     bb = parse_bulletin_board(output)
+    checkpoint = re.search(r"^\[CHECKPOINT\] .*$", output, re.MULTILINE)
+    memory = parse_memory(output)
+    profile = parse_profile(output)
     return {
         "raw_output": output,
         "timings": timings,
         "bulletin_board": bb,
         "pqc_enabled": use_pqc,
+        "signature": signature or signature_backends.resolve(None, use_pqc),
+        "setup_cache": setup_cache,
+        "checkpoint": checkpoint.group(0) if checkpoint else None,
+        "memory": memory,
+        "profile": profile,
     }
 
+def run_hyperion(voters=50, tellers=3, threshold=2, max_votes=2, use_pqc=False,
+                 setup_cache=None, project_root=None, env=None, wfn_proof="or_n",
+                 verify_views=False, checkpoint_dir=None, replay_from=None,
+                 signature=None, worker=None, worker_timeout=None,
+                 randomizer_pool=0, seed=None, result_cache=None,
+                 incremental_batch=0, memory_profile=False, profile_dir=None,
+                 hash_suite="sha256"):
+    """
+    Sets multiprocessing to 'fork' mode for Linux compatibility.
+    
+    Args:
+        voters: Number of voters
+        tellers: Number of tellers
+        threshold: Threshold for decryption (K of N)
+        max_votes: Maximum vote value
+        use_pqc: If True, use post-quantum ML-DSA signatures instead of ECDSA
+            (ML-DSA-65 unless signature is given)
+        setup_cache: Optional path of an election setup artifact; threshold
+            keys are loaded from it when valid and written to it otherwise
+        project_root: Directory containing hyperion/ and client/; used as the
+            child's working directory (defaults to the current directory)
+        env: Optional environment overrides for the child process (with
+            worker, for the run forked from it; see WarmWorker)
+        wfn_proof: Well-formedness proof: "or_n" (OR-proof over every vote
+            value), "range" (binary decomposition) or "auto" (smaller of both)
+        verify_views: If True, check every individual view's exponentiation
+            mix with one batched random-linear-combination check
+        checkpoint_dir: Optional directory in which the inputs and outputs of
+            every phase are checkpointed
+        replay_from: Optional phase name; earlier phases are loaded from
+            checkpoint_dir instead of being run
+        signature: Signature backend name ("ecdsa", "ml-dsa-44",
+            "ml-dsa-65", "ml-dsa-87" or one registered in
+            client.signature_backends)
+        worker: Optional WarmWorker to run in instead of a new interpreter
+        worker_timeout: Optional seconds one chunk of a teller's parallel
+            work may take before its worker is killed and the chunk retried
+        randomizer_pool: Number of ElGamal randomizers (r, rG, rQ) to
+            precompute for the election key during setup; voting and
+            raise-h encryptions draw from the pool
+        seed: Optional integer; makes the run deterministic (all parties and
+            worker processes draw from streams derived from it). Seeded runs
+            are not secure and only meant for testing and comparison.
+        result_cache: Optional client.result_cache.ResultCache; seeded runs
+            with a configuration already in it are answered from the cache
+            (result["cached"] is True)
+        incremental_batch: If non-zero, tellers validate and run raise-h on
+            ballots in batches of this size while voting is still open,
+            leaving only the last batch, mixing and decryption for the tally
+        memory_profile: If True, account memory per phase: the peak RSS of
+            the main process and its workers and the largest Python
+            allocation sites end up in result["memory"] (see parse_memory).
+            tracemalloc slows the run down, so timings are not comparable.
+        profile_dir: Optional directory; the run and all its worker
+            processes are sampled by a profiler and the stacks written there
+            per phase as collapsed stacks (<phase>.folded) and as a
+            speedscope file (see parse_profile for result["profile"])
+        hash_suite: Hash function of the transcript (ballot signatures,
+            decryption proofs, ML-DSA key digests): "sha256", "sha3-256",
+            "shake-256" or "blake2b"
+    """
+    project_root = os.path.abspath(project_root or os.getcwd())
+    signature = signature_backends.resolve(signature, use_pqc)
+    use_pqc = signature_backends.is_pqc(signature)
+    args = entry_args(voters, tellers, threshold, max_votes, signature,
+                      setup_cache=setup_cache, project_root=project_root,
+                      wfn_proof=wfn_proof, verify_views=verify_views,
+                      checkpoint_dir=checkpoint_dir, replay_from=replay_from,
+                      worker_timeout=worker_timeout,
+                      randomizer_pool=randomizer_pool, seed=seed,
+                      incremental_batch=incremental_batch,
+                      memory_profile=memory_profile,
+                      profile_dir=profile_dir, hash_suite=hash_suite)
+
+    def run():
+        if worker is not None:
+            stdout, stderr = worker.run(args, env)
+        else:
+            proc = subprocess.run(ENTRY_COMMAND + args, capture_output=True, text=True,
+                                  cwd=project_root, env=child_env(env))
+            stdout, stderr = proc.stdout, proc.stderr
+        result = build_result(stdout, stderr, use_pqc, setup_cache, signature)
+        result["seed"] = seed
+        return result
+
+    config = {"args": args, "env": env or {}, "seed": seed}
+    return cached_run(result_cache, config, project_root, run)
+
+def child_env(overrides=None):
+    """
+    Environment for the child process, or None to inherit unchanged.
+    """
+    if not overrides:
+        return None
+    env = dict(os.environ)
+    env.update({k: str(v) for k, v in overrides.items()})
+    return env
+
 def parse_timings(text):
     """
     Extract timing table from Texttable output.
@@ -150,6 +299,64 @@ def parse_timings(text):
     
     return timings
 
+MEMORY_LINE = re.compile(
+    r"^\[MEMORY\] (\w+): parent ([0-9.]+) MB, workers ([0-9.]+) MB, "
+    r"total ([0-9.]+) MB, python ([0-9.]+) MB$", re.MULTILINE)
+MEMORY_TOP_LINE = re.compile(
+    r"^\[MEMORY\] (\w+) top: (.+) ([0-9.]+) MB \(([0-9]+) blocks\)$",
+    re.MULTILINE)
+
+def parse_memory(text):
+    """
+    Per-phase memory report of a memory_profile run, in MB:
+    {phase: {"parent", "workers", "total", "python", "top"}}, with "top" the
+    largest allocation sites as {"location", "size", "blocks"} dicts.
+    Empty if the run was not profiled.
+    """
+    memory = {}
+    for match in MEMORY_LINE.finditer(text):
+        parent, workers, total, python = (float(v) for v in match.groups()[1:])
+        memory[match.group(1)] = {
+            "parent": parent,
+            "workers": workers,
+            "total": total,
+            "python": python,
+            "top": [],
+        }
+    for match in MEMORY_TOP_LINE.finditer(text):
+        phase = memory.get(match.group(1))
+        if phase is not None:
+            phase["top"].append({
+                "location": match.group(2),
+                "size": float(match.group(3)),
+                "blocks": int(match.group(4)),
+            })
+    return memory
+
+PROFILE_LINE = re.compile(
+    r"^\[PROFILE\] (\w+): ([0-9]+) samples from ([0-9]+) processes -> (.+)$",
+    re.MULTILINE)
+PROFILE_SPEEDSCOPE_LINE = re.compile(r"^\[PROFILE\] speedscope: (.+)$",
+                                     re.MULTILINE)
+
+def parse_profile(text):
+    """
+    Files of a profiled run: {"speedscope": path, "phases": {phase:
+    {"samples", "processes", "folded"}}}. Empty if the run was not profiled.
+    """
+    phases = {}
+    for match in PROFILE_LINE.finditer(text):
+        phases[match.group(1)] = {
+            "samples": int(match.group(2)),
+            "processes": int(match.group(3)),
+            "folded": match.group(4),
+        }
+    speedscope = PROFILE_SPEEDSCOPE_LINE.search(text)
+    if not phases and not speedscope:
+        return {}
+    return {"speedscope": speedscope.group(1) if speedscope else None,
+            "phases": phases}
+
 def parse_bulletin_board(text):
     """
     Parse the ASCII Texttable printed by Hyperion main.py.
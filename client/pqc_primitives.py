@@ -1,32 +1,167 @@
 import hashlib
-from dilithium_py.ml_dsa import ML_DSA_65
+import importlib
+import importlib.util
+import os
+import struct
+
+PARAMETER_SETS = ("ML_DSA_44", "ML_DSA_65", "ML_DSA_87")
+
+# Preferred first; HYPERION_MLDSA_BACKEND forces one
+IMPLEMENTATIONS = ("oqs", "pqcrypto", "dilithium_py")
+
+
+class _DilithiumPy:
+    """Pure-Python reference implementation (dilithium-py)."""
+
+    name = "dilithium_py"
+
+    def __init__(self, parameter_set):
+        from dilithium_py import ml_dsa
+        self.scheme = getattr(ml_dsa, parameter_set)
+
+    def keygen(self):
+        return self.scheme.keygen()
+
+    def sign(self, secret_key, message):
+        return self.scheme.sign(secret_key, message)
+
+    def verify(self, public_key, message, signature):
+        return self.scheme.verify(public_key, message, signature)
+
+
+class _OQS:
+    """liboqs through its Python binding (liboqs-python)."""
+
+    name = "oqs"
+
+    def __init__(self, parameter_set):
+        import oqs
+        self.oqs = oqs
+        self.algorithm = parameter_set.replace("_", "-")
+        if self.algorithm not in oqs.get_enabled_sig_mechanisms():
+            raise ImportError(f"liboqs without {self.algorithm}")
+
+    def keygen(self):
+        with self.oqs.Signature(self.algorithm) as signer:
+            public_key = signer.generate_keypair()
+            return public_key, signer.export_secret_key()
+
+    def sign(self, secret_key, message):
+        with self.oqs.Signature(self.algorithm, secret_key) as signer:
+            return signer.sign(message)
+
+    def verify(self, public_key, message, signature):
+        with self.oqs.Signature(self.algorithm) as verifier:
+            return verifier.verify(message, signature, public_key)
+
+
+class _PQCrypto:
+    """PQClean C code through the pqcrypto package."""
+
+    name = "pqcrypto"
+
+    def __init__(self, parameter_set):
+        self.scheme = importlib.import_module(
+            f"pqcrypto.sign.{parameter_set.lower()}"
+        )
+
+    def keygen(self):
+        return self.scheme.generate_keypair()
+
+    def sign(self, secret_key, message):
+        return self.scheme.sign(secret_key, message)
+
+    def verify(self, public_key, message, signature):
+        try:
+            return bool(self.scheme.verify(public_key, message, signature))
+        except Exception:
+            return False
+
+
+_IMPLEMENTATION_CLASSES = {
+    "oqs": (_OQS, "oqs"),
+    "pqcrypto": (_PQCrypto, "pqcrypto"),
+    "dilithium_py": (_DilithiumPy, "dilithium_py"),
+}
+
+_SCHEMES = {}
+
+
+def load_scheme(parameter_set, implementation):
+    """
+    ML-DSA parameter_set from the given implementation; raises ImportError
+    if it is not installed.
+    """
+    key = (parameter_set, implementation)
+    if key not in _SCHEMES:
+        cls, module = _IMPLEMENTATION_CLASSES[implementation]
+        # find_spec avoids paying for a failing import on every probe
+        if importlib.util.find_spec(module) is None:
+            raise ImportError(f"{module} is not installed")
+        _SCHEMES[key] = cls(parameter_set)
+    return _SCHEMES[key]
+
+
+def available_implementations(parameter_set="ML_DSA_65"):
+    found = []
+    for implementation in IMPLEMENTATIONS:
+        try:
+            load_scheme(parameter_set, implementation)
+        except (ImportError, AttributeError):
+            continue
+        found.append(implementation)
+    return found
+
+
+def detect_scheme(parameter_set):
+    """
+    The fastest installed implementation of parameter_set.
+    """
+    forced = os.environ.get("HYPERION_MLDSA_BACKEND")
+    if forced:
+        return load_scheme(parameter_set, forced)
+    errors = []
+    for implementation in IMPLEMENTATIONS:
+        try:
+            return load_scheme(parameter_set, implementation)
+        except (ImportError, AttributeError) as e:
+            errors.append(f"{implementation}: {e}")
+    raise ImportError(f"No ML-DSA implementation for {parameter_set} ({'; '.join(errors)})")
+
 
 class MLDSA:
-    """ML-DSA-65 Digital Signature Algorithm
-    This is a replacement for the DSA class in Hyperion.
+    """ML-DSA Digital Signature Algorithm, a replacement for the DSA class
+    in Hyperion.
+    Base class of MLDSA44, MLDSA65 and MLDSA87, which only set
+    PARAMETER_SET (ML-DSA-65 here, so MLDSA65 is this class). The backend
+    is pluggable: detect_scheme picks the fastest installed implementation
+    of the parameter set, or the one HYPERION_MLDSA_BACKEND names.
     """
+
+    PARAMETER_SET = "ML_DSA_65"
     
     def __init__(self, curve=None):
         self.curve = curve  # Kept ONLY for API compatibility
+        self.scheme = detect_scheme(self.PARAMETER_SET)
     
     def keygen(self):
-        """Generates an ML-DSA-65 keypair."""
-        public_key, secret_key = ML_DSA_65.keygen()
+        """Generates an ML-DSA keypair."""
+        public_key, secret_key = self.scheme.keygen()
         signing_key = MLDSASigningKey(secret_key, public_key)
         verification_key = MLDSAVerificationKey(public_key)
         return signing_key, verification_key
     
     def sign(self, signing_key, message):
-        """Signs a message using ML-DSA-65."""
+        """Signs a message using ML-DSA."""
         message_bytes = self._to_bytes(message)
-        signature = ML_DSA_65.sign(signing_key.secret_key, message_bytes)
+        signature = self.scheme.sign(signing_key.secret_key, message_bytes)
         return signature
     
     def verify(self, verification_key, signature, message):
-        """Verifies an ML-DSA-65 signature. Returns 1 if valid, 0 otherwise."""
+        """Verifies an ML-DSA signature. Returns 1 if valid, 0 otherwise."""
         message_bytes = self._to_bytes(message)
         try:
-            is_valid = ML_DSA_65.verify(verification_key.public_key, message_bytes, signature)
+            is_valid = self.scheme.verify(verification_key.public_key, message_bytes, signature)
             return 1 if is_valid else 0
         except Exception as e:
             print(f"[PQC] Verification error: {e}")
@@ -43,6 +178,21 @@ class MLDSA:
         return message
 
 
+class MLDSA44(MLDSA):
+    """ML-DSA-44 (NIST security category 2)."""
+
+    PARAMETER_SET = "ML_DSA_44"
+
+
+MLDSA65 = MLDSA
+
+
+class MLDSA87(MLDSA):
+    """ML-DSA-87 (NIST security category 5)."""
+
+    PARAMETER_SET = "ML_DSA_87"
+
+
 class MLDSASigningKey:
     """Wrapper for ML-DSA signing key (secret key + public key).
     This mimics the interface of PyCryptodome's ECC key objects.
@@ -51,32 +201,258 @@ class MLDSASigningKey:
     def __init__(self, secret_key, public_key):
         self.secret_key = secret_key
         self._public_key = public_key
+        self._verification_key = None
     
     def public_key(self):
-        return MLDSAVerificationKey(self._public_key)
+        if self._verification_key is None:
+            self._verification_key = MLDSAVerificationKey(self._public_key)
+        return self._verification_key
+
+    def __getstate__(self):
+        return {"secret_key": self.secret_key, "_public_key": self._public_key,
+                "_verification_key": None}
+
+
+# 32-byte key digests per transcript hash suite, as hashsuite.digest in
+# hyperion_files/hashsuite.py
+KEY_DIGESTS = {
+    "sha256": lambda data: hashlib.sha256(data).digest(),
+    "sha3-256": lambda data: hashlib.sha3_256(data).digest(),
+    "shake-256": lambda data: hashlib.shake_256(data).digest(32),
+    "blake2b": lambda data: hashlib.blake2b(data, digest_size=32).digest(),
+}
+DEFAULT_SUITE = "sha256"
+
+
+def key_digest(public_key, suite):
+    """
+    32-byte digest of a public key with the hash suite of the election.
+    """
+    if suite not in KEY_DIGESTS:
+        raise ValueError(f"Unknown hash suite: {suite}")
+    return KEY_DIGESTS[suite](public_key)
+
+
+class KeyRegistry:
+    """Deduplicated store of ML-DSA verification keys.
+
+    Every key is kept once, under its index and key_digest; verification
+    keys only hold their index. Keys that arrive again (e.g. unpickled from
+    a worker) map to the existing entry instead of a new copy. Digests use
+    the registry's hash suite, which must be the election's: they are the
+    points (_PointWrapper.xy) that ballot signatures hash.
+    """
+
+    MAGIC = b"MLKR"
+
+    def __init__(self, suite=DEFAULT_SUITE):
+        self.suite = suite
+        self.keys = []
+        self.digests = []
+        self.indices = {}
+
+    def set_suite(self, suite):
+        """Digest the keys with suite from now on (registered ones too)."""
+        digests = [key_digest(key, suite) for key in self.keys]
+        self.suite = suite
+        self.digests = digests
+        self.indices = {digest: i for i, digest in enumerate(digests)}
+
+    def add(self, public_key):
+        public_key = bytes(public_key)
+        digest = key_digest(public_key, self.suite)
+        index = self.indices.get(digest)
+        if index is None:
+            index = len(self.keys)
+            self.keys.append(public_key)
+            self.digests.append(digest)
+            self.indices[digest] = index
+        return index
+
+    def public_key(self, index):
+        return self.keys[index]
+
+    def digest(self, index):
+        return self.digests[index]
+
+    def lookup(self, digest):
+        """Index of the key with this digest, or None."""
+        return self.indices.get(digest)
+
+    def index(self, public_key):
+        """Index of a registered key; KeyError if it is not registered."""
+        index = self.lookup(key_digest(bytes(public_key), self.suite))
+        if index is None:
+            raise KeyError("Public key is not in the registry")
+        return index
+
+    def __len__(self):
+        return len(self.keys)
+
+    def to_bytes(self):
+        """MAGIC, count, key length and the keys back to back."""
+        return self.MAGIC + _pack_table(self.keys)
+
+    @classmethod
+    def from_bytes(cls, data, offset=0, suite=DEFAULT_SUITE):
+        """Registry from to_bytes output; returns (registry, end offset)."""
+        if data[offset:offset + 4] != cls.MAGIC:
+            raise ValueError("Not a key registry")
+        keys, offset = _unpack_table(data, offset + 4)
+        registry = cls(suite)
+        for key in keys:
+            registry.add(key)
+        return registry, offset
+
+
+KEY_REGISTRY = KeyRegistry()
+
+_TABLE_HEADER = struct.Struct(">II")
+_LENGTH = struct.Struct(">I")
+
+
+def _pack_table(items):
+    """Fixed-stride table if all items have one length, else length-prefixed."""
+    lengths = {len(item) for item in items}
+    if len(lengths) <= 1:
+        stride = lengths.pop() if lengths else 0
+        return _TABLE_HEADER.pack(len(items), stride) + b"".join(items)
+    return _TABLE_HEADER.pack(len(items), 0) + b"".join(
+        _LENGTH.pack(len(item)) + item for item in items
+    )
+
+
+def _unpack_table(data, offset):
+    count, stride = _TABLE_HEADER.unpack_from(data, offset)
+    offset += _TABLE_HEADER.size
+    items = []
+    for _ in range(count):
+        length = stride
+        if not stride:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+        items.append(bytes(data[offset:offset + length]))
+        offset += length
+    return items, offset
 
 
 class MLDSAVerificationKey:
-    """Wrapper for ML-DSA verification key (public key only)."""
+    """Wrapper for ML-DSA verification key (public key only).
+
+    The key bytes live in a KeyRegistry; this object holds the index.
+    """
     
-    def __init__(self, public_key):
-        self.public_key = public_key
+    def __init__(self, public_key, registry=None):
+        self.registry = registry or KEY_REGISTRY
+        self.index = self.registry.add(public_key)
+
+    @property
+    def public_key(self):
+        return self.registry.public_key(self.index)
+
+    @property
+    def digest(self):
+        return self.registry.digest(self.index)
     
     @property
     def pointQ(self):
-        return _PointWrapper(self.public_key)
+        return _PointWrapper(self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, MLDSAVerificationKey) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __reduce__(self):
+        # Registered again (deduplicated) wherever it is unpickled
+        return (MLDSAVerificationKey, (self.public_key,))
 
 
 class _PointWrapper:  
-    def __init__(self, public_key):
-        self._public_key = public_key
+    def __init__(self, digest):
+        self._digest = digest
     
     @property
     def xy(self):
-        h = hashlib.sha256(self._public_key).digest()
+        h = self._digest
         x = int.from_bytes(h[:16], 'big')
         y = int.from_bytes(h[16:], 'big')
         return (x, y)
 
 
-__all__ = ['MLDSA', 'MLDSASigningKey', 'MLDSAVerificationKey']
+BOARD_MAGIC = b"PQBB"
+BOARD_VERSION = 1
+
+
+_KEYS_INCLUDED = 1
+
+
+def pack_board(entries, registry=None):
+    """
+    Binary layout of the PQC part of a bulletin board.
+
+    entries are ballots (dicts with "spk" and "sig") or (key, signature)
+    pairs. Ballots refer to their key by a 4-byte index and signatures
+    (fixed length per parameter set) are stored back to back without
+    per-item framing. Without registry the distinct keys are stored once in
+    a key table; with a registry that readers already have (e.g. the
+    published voter roll), only the indices are stored, and a key missing
+    from it raises KeyError (the registry is not changed).
+    """
+    include_keys = registry is None
+    registry = KeyRegistry() if include_keys else registry
+    key_indices = []
+    signatures = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            key, signature = entry["spk"], entry["sig"]
+        else:
+            key, signature = entry
+        if isinstance(key, MLDSAVerificationKey):
+            key = key.public_key
+        if include_keys:
+            key_indices.append(registry.add(key))
+        else:
+            key_indices.append(registry.index(key))
+        signatures.append(bytes(signature))
+    return b"".join([
+        BOARD_MAGIC,
+        struct.pack(">BB", BOARD_VERSION, _KEYS_INCLUDED if include_keys else 0),
+        registry.to_bytes() if include_keys else b"",
+        struct.pack(f">I{len(key_indices)}I", len(key_indices), *key_indices),
+        _pack_table(signatures),
+    ])
+
+
+def unpack_board(data, registry=None):
+    """
+    (verification key, signature) pairs from pack_board output. Boards
+    packed against a registry need the same registry here. Keys are
+    returned as MLDSAVerificationKey objects in KEY_REGISTRY, so equal keys
+    share one copy.
+    """
+    data = memoryview(data)
+    if bytes(data[:4]) != BOARD_MAGIC or data[4] != BOARD_VERSION:
+        raise ValueError("Not a packed PQC board")
+    offset = 6
+    if data[5] & _KEYS_INCLUDED:
+        registry, offset = KeyRegistry.from_bytes(data, offset)
+    elif registry is None:
+        raise ValueError("Board refers to an external key registry")
+    (count,) = struct.unpack_from(">I", data, offset)
+    key_indices = struct.unpack_from(f">{count}I", data, offset + 4)
+    offset += 4 + 4 * count
+    signatures, offset = _unpack_table(data, offset)
+    keys = {}
+    pairs = []
+    for index, signature in zip(key_indices, signatures):
+        if index not in keys:
+            keys[index] = MLDSAVerificationKey(registry.public_key(index))
+        pairs.append((keys[index], signature))
+    return pairs
+
+
+__all__ = ['MLDSA', 'MLDSA44', 'MLDSA65', 'MLDSA87', 'MLDSASigningKey',
+           'MLDSAVerificationKey', 'KeyRegistry', 'KEY_REGISTRY', 'pack_board',
+           'unpack_board', 'detect_scheme', 'available_implementations']
@@ -0,0 +1,124 @@
+import ast
+import base64
+import binascii
+
+COORD_BYTES = 32
+POINT_BYTES = 2 * COORD_BYTES
+# SEC1 prefix of an uncompressed point (0x04 || x || y)
+_SEC1_UNCOMPRESSED = 0x04
+
+
+def commitment_key(commitment):
+    """Normalise a commitment to the bytes used as index key.
+
+    Accepts an EC point (anything with x/y), a serialized point dict
+    ({'x': ..., 'y': ..., 'curve': ...}), raw bytes or a base64 string as
+    shown in the GUI. Points map to 64 bytes (x || y, big-endian), and so do
+    bytes or base64 that hold a point as x || y, as an uncompressed SEC1
+    point or as the text of a serialized point dict; anything else is kept
+    as is and only matches the same bytes.
+    """
+    if isinstance(commitment, (bytes, bytearray, memoryview)):
+        return _point_bytes(bytes(commitment))
+    if isinstance(commitment, dict):
+        return _pack_xy(commitment["x"], commitment["y"])
+    if isinstance(commitment, str):
+        text = commitment.strip()
+        try:
+            return _point_bytes(base64.b64decode(text, validate=True))
+        except (binascii.Error, ValueError):
+            return _point_bytes(text.encode("UTF-8"))
+    if hasattr(commitment, "x") and hasattr(commitment, "y"):
+        return _pack_xy(commitment.x, commitment.y)
+    raise TypeError(f"Unsupported commitment type: {type(commitment).__name__}")
+
+
+def _point_bytes(data):
+    """x || y of the point data holds, or data itself."""
+    if len(data) == POINT_BYTES + 1 and data[0] == _SEC1_UNCOMPRESSED:
+        return data[1:]
+    if data[:1] == b"{":
+        try:
+            point = ast.literal_eval(data.decode("UTF-8"))
+            return _pack_xy(point["x"], point["y"])
+        except (ValueError, SyntaxError, TypeError, KeyError,
+                UnicodeDecodeError, OverflowError):
+            pass
+    return data
+
+
+def _pack_xy(x, y):
+    return int(x).to_bytes(COORD_BYTES, "big") + int(y).to_bytes(COORD_BYTES, "big")
+
+
+class ReceiptIndex:
+    """Hash index from commitment bytes to bulletin board row.
+
+    Rows can be added incrementally as the board grows; each lookup is a
+    single dict access instead of a scan over the board.
+    """
+
+    def __init__(self, board=None, column="commitment"):
+        self.column = column
+        self.rows = {}
+        self.duplicates = set()
+        # Commitments that are not points (see commitment_key)
+        self.opaque = 0
+        self.size = 0
+        if board:
+            self.add_rows(board)
+
+    def add(self, commitment, row):
+        key = commitment_key(commitment)
+        if len(key) != POINT_BYTES:
+            self.opaque = self.opaque + 1
+        if key in self.rows:
+            self.duplicates.add(key)
+        else:
+            self.rows[key] = row
+        self.size = self.size + 1
+
+    def add_rows(self, board, start=None):
+        """Index board entries; rows are numbered from start (default: size)."""
+        row = self.size if start is None else start
+        for entry in board:
+            commitment = entry[self.column] if isinstance(entry, dict) else entry
+            self.add(commitment, row)
+            row = row + 1
+
+    def lookup(self, commitment):
+        """Row of commitment on the board, or None."""
+        try:
+            key = commitment_key(commitment)
+        except (TypeError, KeyError):
+            return None
+        return self.rows.get(key)
+
+    def __contains__(self, commitment):
+        return self.lookup(commitment) is not None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def verify(self, voter):
+        """Verify one voter's receipt (requires voter.notify() to have run).
+
+        The commitment of generate_verification_comm is a point, so it can
+        only match board commitments that commitment_key reads as points.
+        A board holding any other commitment raises ValueError rather than
+        reporting every receipt as missing.
+        """
+        if self.opaque:
+            raise ValueError(
+                f"{self.opaque} board commitments are not encoded points; "
+                "voter receipts cannot be matched against them"
+            )
+        commitment = voter.generate_verification_comm()
+        key = commitment_key(commitment)
+        row = self.rows.get(key)
+        return {
+            "id": voter.id,
+            "row": row,
+            "verified": row is not None,
+            "ambiguous": row is not None and key in self.duplicates,
+        }
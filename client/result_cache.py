@@ -0,0 +1,147 @@
+"""
+Content-addressed cache of run_hyperion results.
+
+Only seeded runs are cached: their bulletin board and tally are a function
+of the configuration, the seed and the Hyperion sources, which together
+form the key. Results are stored as JSON files named by the key's SHA-256.
+"""
+import hashlib
+import json
+import os
+
+POLICIES = ("lru", "fifo", "none")
+
+_SOURCE_DIRS = ("hyperion", "client")
+
+
+def code_version(project_root):
+    """
+    Hash of the Hyperion and client sources, so results computed by other
+    code are never served.
+    """
+    h = hashlib.sha256()
+    for directory in _SOURCE_DIRS:
+        root = os.path.join(project_root, directory)
+        if not os.path.isdir(root):
+            continue
+        for name in sorted(os.listdir(root)):
+            if name.endswith(".py"):
+                h.update(name.encode("UTF-8"))
+                with open(os.path.join(root, name), "rb") as f:
+                    h.update(f.read())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Results of seeded runs in directory, keyed by configuration.
+
+    policy decides which entries go once there are more than max_entries
+    entries or more than max_bytes of them: "lru" removes the least
+    recently used, "fifo" the oldest, "none" never evicts.
+    """
+
+    def __init__(self, directory, max_entries=64, max_bytes=None, policy="lru"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._versions = {}
+
+    def key(self, config, project_root):
+        """
+        Cache key of a configuration dict (must contain "seed").
+        """
+        project_root = os.path.abspath(project_root)
+        if project_root not in self._versions:
+            self._versions[project_root] = code_version(project_root)
+        payload = dict(config, code=self._versions[project_root])
+        text = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode("UTF-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.policy == "lru":
+            # The file's mtime records its last use
+            os.utime(path)
+        return result
+
+    def put(self, key, result):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        """
+        (path, last used or created, size) of every entry, oldest first.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stamp = stat.st_mtime if self.policy == "lru" else stat.st_ctime
+            entries.append((path, stamp, stat.st_size))
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
+    def evict(self):
+        if self.policy == "none":
+            return
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        while entries and (
+            (self.max_entries is not None and len(entries) > self.max_entries)
+            or (self.max_bytes is not None and total > self.max_bytes)
+        ):
+            path, _, size = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
+
+
+def cached_run(cache, config, project_root, run):
+    """
+    run() through cache when config has a seed; the returned result has
+    "cached" set when it was served from the cache.
+    """
+    if cache is None or config.get("seed") is None:
+        return run()
+    key = cache.key(config, project_root)
+    result = cache.get(key)
+    if result is not None:
+        result["cached"] = True
+        return result
+    result = run()
+    # A failed run has no bulletin board; run it again next time
+    if result.get("bulletin_board"):
+        cache.put(key, result)
+    return dict(result, cached=False)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import tempfile
+
+FORMAT_VERSION = 1
+
+# The artifact holds every teller's secret key share: owner-only access
+FILE_MODE = 0o600
+DIR_MODE = 0o700
+
+
+class StaleSetupError(Exception):
+    """Raised when a cached election setup does not match the request."""
+
+
+def default_cache_path(project_root, tellers, threshold):
+    return os.path.join(
+        project_root, ".cache", f"setup_t{tellers}_k{threshold}.json"
+    )
+
+
+def content_hash(payload):
+    """SHA-256 over the canonical JSON form of the setup payload."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("UTF-8")).hexdigest()
+
+
+def save_setup(path, threshold, tellers, pub_key, key_shares, table=None):
+    """Write the threshold keys and fixed-base table to path.
+
+    The file contains the secret key shares of all tellers in plaintext, so
+    it is created readable by its owner only (FILE_MODE) and new cache
+    directories are owner-only as well. It is meant for test and benchmark
+    elections on one machine, never for a real election.
+    """
+    payload = {
+        "version": FORMAT_VERSION,
+        "threshold": threshold,
+        "tellers": tellers,
+        "public_key": pub_key.to_json(),
+        "key_shares": [share.to_json() for share in key_shares],
+        "table": table.to_serializable() if table is not None else None,
+    }
+    document = {"hash": content_hash(payload), "payload": payload}
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=DIR_MODE, exist_ok=True)
+    # A fresh, exclusively created name per writer, so concurrent saves of
+    # the same setup never write into one tmp file
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        os.fchmod(fd, FILE_MODE)
+        with os.fdopen(fd, "w") as f:
+            json.dump(document, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return document["hash"]
+
+
+def read_setup(path, threshold=None, tellers=None):
+    """Read and check a setup artifact without touching the crypto stack.
+
+    Returns the raw payload and its hash. Raises StaleSetupError when the
+    hash does not match the content or the parameters differ.
+    """
+    with open(path) as f:
+        document = json.load(f)
+    payload = document.get("payload")
+    if not isinstance(payload, dict):
+        raise StaleSetupError(f"{path}: missing payload")
+    digest = content_hash(payload)
+    if digest != document.get("hash"):
+        raise StaleSetupError(f"{path}: content hash mismatch")
+    if payload.get("version") != FORMAT_VERSION:
+        raise StaleSetupError(f"{path}: unsupported format version")
+    if threshold is not None and payload["threshold"] != threshold:
+        raise StaleSetupError(
+            f"{path}: threshold {payload['threshold']} != {threshold}"
+        )
+    if tellers is not None and payload["tellers"] != tellers:
+        raise StaleSetupError(
+            f"{path}: tellers {payload['tellers']} != {tellers}"
+        )
+    return payload, digest
+
+
+def setup_info(path):
+    """Summary of a cached setup for display, or None if it is unusable."""
+    try:
+        payload, digest = read_setup(path)
+    except (OSError, ValueError, KeyError, StaleSetupError):
+        return None
+    return {
+        "path": path,
+        "hash": digest,
+        "threshold": payload["threshold"],
+        "tellers": payload["tellers"],
+        "has_table": payload["table"] is not None,
+    }
+
+
+def load_setup(path, threshold, tellers):
+    """Load threshold keys (and the fixed-base table, if any) from path.
+
+    Must run where threshold_crypto and the Hyperion modules are importable.
+    """
+    import threshold_crypto as tc
+    from precompute import FixedBaseTable
+
+    payload, _ = read_setup(path, threshold, tellers)
+    pub_key = tc.PublicKey.from_json(payload["public_key"])
+    key_shares = [tc.KeyShare.from_json(s) for s in payload["key_shares"]]
+    table = None
+    if payload["table"] is not None:
+        table = FixedBaseTable.from_serializable(pub_key.Q, payload["table"])
+    return pub_key, key_shares, table
+
+
+def install_setup_cache(path, build_table=True):
+    """Wrap Teller.generate_threshold_keys to read/write the cache at path.
+
+    A missing or stale artifact falls back to fresh key generation and is
+    rewritten, so the next run reduces Setup to a file read.
+    """
+    import checkpoint
+    import precompute
+    from precompute import FixedBaseTable
+
+    def hook(step, generate):
+        def generate_threshold_keys(k, num_tellers, tc_key_params):
+            if os.path.exists(path):
+                try:
+                    pub_key, key_shares, table = load_setup(path, k, num_tellers)
+                    if table is not None:
+                        precompute.register_table(table)
+                    print(f"[SETUP] Loaded cached election setup from {path}")
+                    return pub_key, key_shares
+                except (StaleSetupError, ValueError, KeyError) as e:
+                    print(f"[SETUP] Ignoring stale setup cache: {e}")
+            pub_key, key_shares = generate(k, num_tellers, tc_key_params)
+            table = FixedBaseTable(pub_key.Q) if build_table else None
+            if table is not None:
+                precompute.register_table(table)
+            save_setup(path, k, num_tellers, pub_key, key_shares, table)
+            print(f"[SETUP] Saved election setup to {path}")
+            return pub_key, key_shares
+
+        return generate_threshold_keys
+
+    checkpoint.instrument(
+        [checkpoint.Step("setup", "Teller", "generate_threshold_keys")],
+        hook,
+        checkpoint.CACHE,
+    )
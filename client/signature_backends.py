@@ -0,0 +1,96 @@
+import importlib
+import sys
+
+ECDSA = "ecdsa"
+DEFAULT = ECDSA
+
+# name -> "module:attribute" of a DSA-compatible class, or None for
+# Hyperion's own ECDSA
+_BACKENDS = {}
+
+
+def register_backend(name, target):
+    """
+    Register a signature backend.
+
+    target is "module:ClassName" of a class with Hyperion's DSA interface
+    (constructed with the curve; keygen, sign, verify), or None to keep
+    Hyperion's ECDSA. The module is only imported when the backend is used.
+    """
+    _BACKENDS[name] = target
+
+
+register_backend(ECDSA, None)
+register_backend("ml-dsa-44", "client.pqc_primitives:MLDSA44")
+register_backend("ml-dsa-65", "client.pqc_primitives:MLDSA65")
+register_backend("ml-dsa-87", "client.pqc_primitives:MLDSA87")
+
+
+def available_backends():
+    return list(_BACKENDS)
+
+
+def is_pqc(name):
+    return _BACKENDS.get(name) is not None
+
+
+def resolve(signature=None, use_pqc=False):
+    """
+    Backend name for the run options; use_pqc without an explicit
+    signature selects ML-DSA-65.
+    """
+    name = signature or ("ml-dsa-65" if use_pqc else DEFAULT)
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown signature backend: {name}")
+    return name
+
+
+def load_backend(name):
+    """
+    The DSA class of backend name, or None for Hyperion's ECDSA.
+    """
+    target = _BACKENDS[name]
+    if target is None:
+        return None
+    module, attribute = target.split(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def preload():
+    """
+    Import every registered backend (and whatever implementation it picks
+    on construction), skipping those that are not installed.
+    """
+    for name in _BACKENDS:
+        try:
+            backend = load_backend(name)
+            if backend is not None:
+                backend(None)
+        except ImportError:
+            pass
+
+
+def install_backend(name):
+    """
+    Make backend name Hyperion's DSA.
+
+    primitives.DSA is replaced, and so is every module attribute already
+    bound to the previous DSA class (e.g. parties, which imports DSA from
+    primitives), so this also works after Hyperion has been imported.
+    Returns the installed class.
+    """
+    import primitives
+
+    if not hasattr(primitives, "_ECDSA"):
+        primitives._ECDSA = primitives.DSA
+    backend = load_backend(name) or primitives._ECDSA
+    current = primitives.DSA
+    if current is not backend:
+        for module in list(sys.modules.values()):
+            try:
+                bound = module.__dict__.get("DSA")
+            except AttributeError:
+                continue
+            if bound is current:
+                module.DSA = backend
+    return backend
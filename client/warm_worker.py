@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import threading
+
+from .hyperion_runner import child_env
+
+
+class WorkerError(Exception):
+    pass
+
+
+class WarmWorker:
+    """
+    A long-lived client.hyperion_entry --serve process.
+
+    The worker imports Hyperion and the signature backends once; every run
+    is a fork of it, so consecutive runs (also with different signature
+    backends or settings) skip interpreter start-up and module imports.
+    Pass it as run_hyperion(..., worker=worker).
+
+    env is the environment of the worker itself; variables read while
+    modules are imported must be set here. Per-run variables are added to
+    the environment of the forked child (run(args, env)). Replies come
+    through a pipe of their own, so the worker's stdout is never parsed.
+    """
+
+    def __init__(self, project_root=None, env=None):
+        self.project_root = os.path.abspath(project_root or os.getcwd())
+        self.env = env
+        self.proc = None
+        self.channel = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.alive():
+            return self
+        read_fd, write_fd = os.pipe()
+        try:
+            self.proc = subprocess.Popen(
+                ["python3", "-m", "client.hyperion_entry", "--serve",
+                 self.project_root, str(write_fd)],
+                stdin=subprocess.PIPE, text=True, pass_fds=(write_fd,),
+                cwd=self.project_root, env=child_env(self.env),
+            )
+        except BaseException:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        self.channel = os.fdopen(read_fd, "r")
+        self._read()
+        return self
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _read(self):
+        line = self.channel.readline()
+        if not line:
+            self.close()
+            raise WorkerError("warm worker exited")
+        return json.loads(line)
+
+    def run(self, args, env=None):
+        """
+        Run client.hyperion_entry with args and env added to the run's
+        environment; returns (stdout, stderr).
+        """
+        request = {
+            "argv": list(args),
+            "env": {k: str(v) for k, v in (env or {}).items()},
+        }
+        with self.lock:
+            self.start()
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+            reply = self._read()
+        return reply["stdout"], reply["stderr"]
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+        self.channel.close()
+        self.channel = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
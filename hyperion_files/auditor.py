@@ -0,0 +1,438 @@
+"""Universal-verifiability audit of partial-decryption proofs.
+
+Every mp_partial_decrypt call proves, for the ciphertexts of its chunk and
+each of the two ciphertext components, that the partial decryptions are
+pd_i = y * alpha_i for the teller's key share y with Y = y * G:
+
+    s = H(Y || alphas || pds), t_i = H(s || index_i)
+    A = sum(t_i * alpha_i), D = sum(t_i * pd_i)
+    p_1 = r * G, p_2 = r * A, u = H(p_1, p_2, G, Y, alphas, pds), w = r - u*y
+
+and is checked with w * G + u * Y == p_1 and w * A + u * D == p_2. The
+weights hash the partial decryptions, so they are fixed only after the
+prover has committed to every pd_i. Y is the key share published at setup
+(PUBLIC_FILE, written by the checkpoint of the key generation), never the
+one a proof names; likewise the hash suite is the election's (given to
+the auditor, or else the published one). The auditor reads the recorded
+calls from a checkpoint directory, decoding them strictly (no pickles or
+classes), and checks all statements on forked workers. A worker folds the
+equations of its whole chunk into one multi-scalar multiplication with
+random weights (jacobian.linear_combination); only if that sum is not the
+identity are the statements of the chunk checked one by one to find the
+failing ones.
+
+Points in the transcript are serialized dicts, so the weights and the
+challenge hash the same text for the prover and every verifier. A proof
+naming another hashsuite than the election's fails.
+"""
+import os
+import secrets
+import time
+
+import codec
+import hashsuite
+import jacobian
+import workers
+from jacobian import JacobianPoint
+
+PHASE = "decryption"
+STEP = "Teller.mp_partial_decrypt"
+
+# Bits of the random weights of a batched check
+BATCH_BITS = 128
+
+# Checkpoint records start with an HMAC tag (checkpoint.TAG_BYTES) that
+# only the machine that recorded them can check
+RECORD_TAG_BYTES = 32
+# Public election keys in a checkpoint directory (checkpoint.PUBLIC_FILE)
+PUBLIC_FILE = "public.bin"
+
+
+class AuditError(Exception):
+    pass
+
+
+def weight_seed(
+    public_key_share, alpha_terms, partial_decryptions, suite=None
+):
+    """s of one proof, over Y, every alpha and every [index, pd] row."""
+    return hashsuite.digest(
+        (
+            str(public_key_share)
+            + str(alpha_terms)
+            + str(partial_decryptions)
+        ).encode("UTF-8"),
+        suite,
+    )
+
+
+def weight(seed, index, suite=None):
+    """t_i of one ciphertext."""
+    return hashsuite.to_mpz(seed.hex() + str(index), suite) % jacobian.N
+
+
+def challenge(
+    p_1, p_2, public_key_share, alpha_terms, partial_decryptions, suite=None
+):
+    """Fiat-Shamir challenge u; all points serialized."""
+    return (
+        hashsuite.to_mpz(
+            str(p_1)
+            + str(p_2)
+            + str(jacobian.GX)
+            + str(jacobian.GY)
+            + str(public_key_share)
+            + str(alpha_terms)
+            + str(partial_decryptions),
+            suite,
+        )
+        % jacobian.N
+    )
+
+
+class Statement:
+    """One component of one partial-decryption proof.
+
+    public_key_share is the teller's published Y, alphas the serialized
+    first ciphertext points, rows the [index, serialized_pd] rows
+    mp_partial_decrypt put on its queue and suite the election's hashsuite
+    (default: installed). claimed_share and claimed_suite are the Y and
+    suite the proof itself names, if checked; a proof naming another key
+    or suite fails.
+    """
+
+    def __init__(
+        self,
+        teller,
+        component,
+        public_key_share,
+        alphas,
+        rows,
+        p_1,
+        p_2,
+        w,
+        suite=None,
+        claimed_share=None,
+        claimed_suite=None,
+    ):
+        self.teller = teller
+        self.component = component
+        self.public_key_share = public_key_share
+        self.alphas = alphas
+        self.rows = rows
+        self.p_1 = p_1
+        self.p_2 = p_2
+        self.w = w
+        self.suite = suite
+        self.claimed_share = claimed_share
+        self.claimed_suite = claimed_suite
+
+    @property
+    def indices(self):
+        return [row[0] for row in self.rows]
+
+    def equations(self):
+        """(points, scalars) of both verification equations, each of
+        which sums to the point at infinity for a valid proof."""
+        if len(self.alphas) != len(self.rows):
+            raise AuditError("alphas and partial decryptions differ")
+        if self.claimed_share is not None and _xy(
+            self.claimed_share
+        ) != _xy(self.public_key_share):
+            raise AuditError("proof names a key share that was not published")
+        if self.claimed_suite is not None and self.claimed_suite != (
+            self.suite or hashsuite.name()
+        ):
+            raise AuditError(
+                f"proof names hash suite {self.claimed_suite or 'none'}, "
+                "not the election's"
+            )
+        seed = weight_seed(
+            self.public_key_share, self.alphas, self.rows, self.suite
+        )
+        u = challenge(
+            self.p_1,
+            self.p_2,
+            self.public_key_share,
+            self.alphas,
+            self.rows,
+            self.suite,
+        )
+        w = self.w
+        first = (
+            [
+                JacobianPoint.generator(),
+                JacobianPoint.from_dict(self.public_key_share),
+                JacobianPoint.from_dict(self.p_1),
+            ],
+            [w, u, -1],
+        )
+        points = [JacobianPoint.from_dict(self.p_2)]
+        scalars = [-1]
+        for alpha, (index, pd) in zip(self.alphas, self.rows):
+            t = weight(seed, index, self.suite)
+            points.append(JacobianPoint.from_dict(alpha))
+            scalars.append(w * t)
+            points.append(_pd_point(pd))
+            scalars.append(u * t)
+        return [first, (points, scalars)]
+
+    def describe(self):
+        indices = self.indices
+        span = f"{min(indices)}..{max(indices)}" if indices else "-"
+        return (
+            f"teller {self.teller}, component {self.component}, "
+            f"{len(indices)} ciphertexts ({span})"
+        )
+
+
+def _xy(point):
+    return int(point["x"]), int(point["y"])
+
+
+def _pd_point(serialized_pd):
+    v_y = serialized_pd.get("v_y") if isinstance(serialized_pd, dict) else None
+    if isinstance(v_y, dict):
+        return JacobianPoint.from_dict(v_y)
+    from util import deserialize_pd
+
+    return JacobianPoint.from_ecc(deserialize_pd(serialized_pd).v_y)
+
+
+def verify_statement(statement):
+    try:
+        return all(
+            jacobian.linear_combination(points, scalars).is_identity()
+            for points, scalars in statement.equations()
+        )
+    except (AuditError, ValueError, KeyError, TypeError):
+        return False
+
+
+def verify_batch(statements):
+    """Whether all statements hold, with one multi-scalar multiplication.
+
+    Each equation is scaled by a random weight, so a false equation makes
+    the sum the identity only with probability 2^-BATCH_BITS. Terms on the
+    same point (G, a teller's Y) are merged.
+    """
+    merged = {}
+    points = []
+    scalars = []
+    try:
+        for statement in statements:
+            for equation_points, equation_scalars in statement.equations():
+                rho = secrets.randbits(BATCH_BITS) | 1
+                for point, k in zip(equation_points, equation_scalars):
+                    k = k * rho % jacobian.N
+                    key = (point.X, point.Y, point.Z)
+                    if key in merged:
+                        scalars[merged[key]] += k
+                        continue
+                    merged[key] = len(points)
+                    points.append(point)
+                    scalars.append(k)
+    except (AuditError, ValueError, KeyError, TypeError):
+        return False
+    return jacobian.linear_combination(points, scalars).is_identity()
+
+
+def _verify_chunk(statements):
+    if verify_batch(statements):
+        return [True] * len(statements)
+    return [verify_statement(statement) for statement in statements]
+
+
+def statements_from_record(record, key_shares, suite):
+    """Both Statements of a recorded mp_partial_decrypt call; key_shares
+    maps a teller (key share index) to its published Y, suite is the
+    election's hashsuite."""
+    party = record.get("party")
+    args = record.get("args")
+    if not args:
+        raise AuditError(
+            "record has no inputs; it was written by an older version"
+        )
+    ciphertexts = args[0]
+    rows_1, rows_2, proof = (
+        _decode(items[0]) for items in record["queues"]
+    )
+    if "tau_1" in proof or "tau_2" in proof:
+        raise AuditError(
+            "proof has the prover-chosen tau weights of the earlier format"
+        )
+    teller = party[1] if party else None
+    if teller not in key_shares:
+        raise AuditError(f"teller {teller} has no published key share")
+    return [
+        Statement(
+            teller,
+            component,
+            key_shares[teller],
+            [ciphertext[component][0] for ciphertext in ciphertexts],
+            rows,
+            proof[f"p_{component}_1"],
+            proof[f"p_{component}_2"],
+            proof[f"w_{component}"],
+            suite,
+            proof.get("public_key_share"),
+            # Fails a proof that names no suite as well
+            proof.get("hash", ""),
+        )
+        for component, rows in ((1, rows_1), (2, rows_2))
+    ]
+
+
+def _decode(data):
+    try:
+        return codec.decode(data, trusted=False)
+    except ValueError as e:
+        raise AuditError(f"unreadable record: {e}")
+
+
+def _read_record(path):
+    with open(path, "rb") as f:
+        return _decode(f.read()[RECORD_TAG_BYTES:])
+
+
+def load_public(directory):
+    """Published keys and hash suite of a checkpoint directory."""
+    path = os.path.join(directory, PUBLIC_FILE)
+    if not os.path.exists(path):
+        raise AuditError(
+            f"no published key shares in {directory}; the setup was not "
+            "recorded, or by an older version"
+        )
+    return _read_record(path)
+
+
+def election_suite(public, suite=None):
+    """The hashsuite to audit with: suite if given, else the published one;
+    both must agree."""
+    published = public.get("hash")
+    if suite is None:
+        suite = published
+    if suite is None:
+        raise AuditError("the election's hash suite is not published")
+    if suite not in hashsuite.SUITES:
+        raise AuditError(f"unknown hash suite {suite!r}")
+    if published is not None and published != suite:
+        raise AuditError(
+            f"the election was hashed with {published}, not {suite}"
+        )
+    return suite
+
+
+def load_statements(directory, suite=None):
+    """Statements of every mp_partial_decrypt call in a checkpoint
+    directory, under the election's hashsuite (see election_suite)."""
+    path = os.path.join(directory, PHASE)
+    if not os.path.isdir(path):
+        raise AuditError(f"no {PHASE} checkpoints in {directory}")
+    public = load_public(directory)
+    key_shares = {x: share for x, share in public["key_shares"]}
+    suite = election_suite(public, suite)
+    statements = []
+    for name in sorted(os.listdir(path)):
+        if not name.endswith(".bin"):
+            continue
+        record = _read_record(os.path.join(path, name))
+        if record.get("step") == STEP:
+            statements.extend(
+                statements_from_record(record, key_shares, suite)
+            )
+    return statements
+
+
+class AuditReport:
+    """Outcome of an audit: (statement, passed) for every statement."""
+
+    def __init__(self, results, elapsed=None):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def passed(self):
+        return bool(self.results) and all(ok for _, ok in self.results)
+
+    @property
+    def failures(self):
+        return [statement for statement, ok in self.results if not ok]
+
+    def tellers(self):
+        """teller -> [ciphertexts covered, proofs, failed proofs]."""
+        tellers = {}
+        for statement, ok in self.results:
+            entry = tellers.setdefault(statement.teller, [0, 0, 0])
+            if statement.component == 1:
+                entry[0] += len(statement.rows)
+            entry[1] += 1
+            entry[2] += 0 if ok else 1
+        return tellers
+
+    def summary(self):
+        lines = []
+        for teller, (covered, proofs, failed) in sorted(
+            self.tellers().items(), key=lambda item: str(item[0])
+        ):
+            lines.append(
+                f"[AUDIT] teller {teller}: {covered} ciphertexts, "
+                f"{proofs} proofs, {failed} failed"
+            )
+        for statement in self.failures:
+            lines.append(f"[AUDIT] FAILED {statement.describe()}")
+        verdict = "PASS" if self.passed else "FAIL"
+        timing = "" if self.elapsed is None else f" in {self.elapsed:.2f} s"
+        lines.append(
+            f"[AUDIT] {verdict}: {len(self.results)} proofs checked{timing}"
+        )
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "elapsed": self.elapsed,
+            "tellers": {
+                str(teller): {
+                    "ciphertexts": covered,
+                    "proofs": proofs,
+                    "failed": failed,
+                }
+                for teller, (covered, proofs, failed) in self.tellers().items()
+            },
+            "failures": [
+                {
+                    "teller": statement.teller,
+                    "component": statement.component,
+                    "indices": statement.indices,
+                }
+                for statement in self.failures
+            ],
+        }
+
+
+def audit(statements, processes=None, timeout=None):
+    """Check statements on all cores; returns an AuditReport."""
+    start = time.perf_counter()
+    runner = workers.ChunkRunner(
+        _verify_chunk, processes, timeout=timeout, label="audit"
+    )
+    partitioner = workers.Partitioner(statements, runner.processes)
+    chunks = []
+    outcome = {}
+    for index, results in runner.imap(_recording(partitioner, chunks)):
+        outcome[index] = results
+    results = []
+    for index, chunk in enumerate(chunks):
+        results.extend(zip(chunk, outcome[index]))
+    return AuditReport(results, time.perf_counter() - start)
+
+
+def _recording(chunks, seen):
+    for chunk in chunks:
+        seen.append(chunk)
+        yield chunk
+
+
+def audit_directory(directory, processes=None, timeout=None, suite=None):
+    return audit(load_statements(directory, suite), processes, timeout)
@@ -0,0 +1,483 @@
+"""Phase checkpoints and differential replay.
+
+install_checkpoints() wraps the Voter and Teller methods that make up each
+protocol phase. Every call is stored under
+<directory>/<phase>/<key>.bin, codec-encoded, where the key hashes the
+method, the party (voter id or key share index), the call's inputs and how
+often the same call was made before. A record holds the return value, the
+attributes the call set on its party, the items it put on result queues and
+any module globals it assigned.
+
+With replay_from set, calls in phases before that phase are answered from
+their records instead of being computed: because every earlier output is
+restored exactly, the inputs of the replayed phase (and its keys) match the
+recorded run and only that phase and the ones after it do any work. Calls
+without a record (e.g. a different election size) are computed and stored.
+Records are written from worker processes too, so the mp_* methods are
+covered when main.py runs them in a multiprocessing.Process.
+
+Decoding a record may unpickle and import classes, so every record starts
+with an HMAC-SHA256 tag under a key that never leaves this machine
+(KEY_PATH, created owner-only on first use). A record whose tag does not
+verify, e.g. one copied from another machine or edited, is never decoded:
+it counts as rejected and its call is computed again. Auditors, which only
+read records, skip the tag and decode strictly (codec.decode(...,
+trusted=False)).
+
+Key generation also writes the election's public keys (the public key and
+Y = y * G of every teller's key share) and its hash suite to
+<directory>/PUBLIC_FILE, so that an auditor checks decryption proofs
+against the key shares and the suite of the setup.
+"""
+import hashlib
+import hmac
+import os
+
+import codec
+import hashsuite
+import jacobian
+import parties
+
+PHASES = (
+    "setup",
+    "voting",
+    "mixing",
+    "decryption",
+    "notification",
+    "verification",
+    "coercion",
+)
+
+# Helpers parties construct from their curve; stored by name, rebuilt on
+# replay (they hold the curve and are not data).
+_CURVE_HELPERS = ("DSA", "ElGamalEncryption", "NIZK", "ChaumPedersenProof")
+_HELPER_MARK = "__curve_helper__"
+
+# HMAC key of the records; shared by all checkpoint directories of the user
+KEY_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "hyperion", "checkpoint.key"
+)
+KEY_BYTES = 32
+TAG_BYTES = hashlib.sha256().digest_size
+PUBLIC_FILE = "public.bin"
+
+
+class Step:
+    """A method that belongs to a phase.
+
+    key_args selects the arguments (after self) that identify the call,
+    queues the arguments that are result queues, static marks methods
+    called on the class without self and assigns names parties globals the
+    method sets. With keep_args the other arguments are stored in the
+    record as well (e.g. the ciphertexts an auditor checks proofs
+    against). publish turns the result of a computed call into the data
+    of PUBLIC_FILE.
+    """
+
+    def __init__(
+        self,
+        phase,
+        owner,
+        name,
+        key_args=None,
+        queues=(),
+        static=False,
+        assigns=(),
+        keep_args=False,
+        publish=None,
+    ):
+        self.phase = phase
+        self.owner = owner
+        self.name = name
+        self.key_args = key_args
+        self.queues = queues
+        self.static = static
+        self.assigns = assigns
+        self.keep_args = keep_args
+        self.publish = publish
+
+    @property
+    def label(self):
+        return f"{self.owner}.{self.name}"
+
+
+def _public_keys(result):
+    public_key, key_shares = result
+    points = jacobian.serialize_points(
+        [public_key.Q]
+        + [
+            jacobian.JacobianPoint.generator() * int(share.y)
+            for share in key_shares
+        ]
+    )
+    return {
+        "public_key": points[0],
+        "key_shares": [
+            [int(share.x), point]
+            for share, point in zip(key_shares, points[1:])
+        ],
+        "hash": hashsuite.name(),
+    }
+
+
+STEPS = [
+    Step(
+        "setup",
+        "Teller",
+        "generate_threshold_keys",
+        (0, 1),
+        static=True,
+        publish=_public_keys,
+    ),
+    Step("setup", "Voter", "generate_dsa_keys"),
+    Step("setup", "Voter", "generate_trapdoor_keypair"),
+    Step("setup", "Voter", "generate_pok_trapdoor_keypair"),
+    Step("voting", "Voter", "choose_vote_value"),
+    Step("voting", "Voter", "encrypt_vote"),
+    Step("voting", "Voter", "generate_wellformedness_proof"),
+    Step("voting", "Voter", "sign_ballot"),
+    Step("mixing", "Teller", "validate_ballot", (2,), static=True),
+    Step("mixing", "Teller", "mp_raise_h", (0,), queues=(1, 2, 3)),
+    Step("mixing", "Teller", "re_encryption_mix"),
+    Step("mixing", "Teller", "verify_re_enc_mix"),
+    Step(
+        "decryption",
+        "Teller",
+        "mp_partial_decrypt",
+        (0,),
+        queues=(1, 2, 3),
+        keep_args=True,
+    ),
+    Step(
+        "decryption",
+        "Teller",
+        "full_decrypt",
+        (0, 2, 3),
+        assigns=("decrypted",),
+    ),
+    Step("notification", "Teller", "notify", (1,), static=True),
+    Step("notification", "Teller", "decrypt", (1,), static=True),
+    Step("verification", "Voter", "generate_verification_comm"),
+    Step("coercion", "Teller", "individual_board_shuffle", (0,)),
+]
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def load_key(path=KEY_PATH):
+    """The HMAC key at path, created (owner-only) if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            key = f.read()
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        # Not os.urandom, which a seeded run replaces
+        with open("/dev/urandom", "rb") as f:
+            key = f.read(KEY_BYTES)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Created by a concurrent run
+            return load_key(path)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+    if len(key) != KEY_BYTES:
+        raise CheckpointError(f"Invalid checkpoint key: {path}")
+    return key
+
+
+def sign_record(key, data):
+    return hmac.new(key, data, hashlib.sha256).digest() + data
+
+
+def verify_record(key, signed):
+    """The codec data of a signed record, or None if its tag is wrong."""
+    tag, data = signed[:TAG_BYTES], signed[TAG_BYTES:]
+    expected = hmac.new(key, data, hashlib.sha256).digest()
+    return data if hmac.compare_digest(tag, expected) else None
+
+
+class _RecordingQueue:
+    """Forwards put() to a queue and keeps what was put."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.items = []
+
+    def put(self, item, *args, **kwargs):
+        self.items.append(codec.encode(item))
+        self.queue.put(item, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.queue, name)
+
+
+class CheckpointStore:
+    def __init__(self, directory, replay_from=None, key_path=KEY_PATH):
+        if replay_from is not None and replay_from not in PHASES:
+            raise CheckpointError(f"Unknown phase: {replay_from}")
+        self.directory = directory
+        self.replay_from = replay_from
+        self.hmac_key = load_key(key_path)
+        self.calls = {}
+        self.stats = {
+            "recorded": 0,
+            "replayed": 0,
+            "missed": 0,
+            "rejected": 0,
+        }
+        self.pid = os.getpid()
+
+    def replaying(self, phase):
+        return self.replay_from is not None and PHASES.index(
+            phase
+        ) < PHASES.index(self.replay_from)
+
+    def key(self, step, party, args):
+        h = hashlib.sha256(step.label.encode("UTF-8"))
+        h.update(codec.encode(_party_key(party)))
+        indices = range(len(args)) if step.key_args is None else step.key_args
+        for i in indices:
+            if i < len(args):
+                h.update(codec.encode(args[i]))
+        digest = h.hexdigest()
+        # Repeated identical calls (same party, same inputs) get their own
+        # record each.
+        count = self.calls.get(digest, 0)
+        self.calls[digest] = count + 1
+        return f"{digest[:40]}-{count}"
+
+    def _path(self, phase, key):
+        return os.path.join(self.directory, phase, f"{key}.bin")
+
+    def load(self, phase, key):
+        try:
+            with open(self._path(phase, key), "rb") as f:
+                data = verify_record(self.hmac_key, f.read())
+        except FileNotFoundError:
+            return None
+        if data is None:
+            self.stats["rejected"] += 1
+            return None
+        return codec.decode(data)
+
+    def save(self, phase, key, record):
+        path = self._path(phase, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(sign_record(self.hmac_key, codec.encode(record)))
+        os.replace(tmp_path, path)
+        self.stats["recorded"] += 1
+
+    def publish(self, data):
+        path = os.path.join(self.directory, PUBLIC_FILE)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(sign_record(self.hmac_key, codec.encode(data)))
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        mode = f"replay from {self.replay_from}" if self.replay_from else "record"
+        return (
+            f"[CHECKPOINT] {mode}: {self.stats['replayed']} replayed, "
+            f"{self.stats['recorded']} recorded, {self.stats['missed']} missed, "
+            f"{self.stats['rejected']} rejected ({self.directory})"
+        )
+
+
+STORE = None
+
+
+def _party_key(party):
+    if party is None:
+        return None
+    if hasattr(party, "id"):
+        return ["voter", party.id]
+    share = getattr(party, "secret_key_share", None)
+    return ["teller", getattr(share, "x", None)]
+
+
+def _encode_attrs(party, names):
+    attrs = {}
+    helpers = {name: getattr(parties, name) for name in _CURVE_HELPERS}
+    for name in names:
+        value = getattr(party, name)
+        helper = next(
+            (h for h, cls in helpers.items() if isinstance(value, cls)), None
+        )
+        attrs[name] = [_HELPER_MARK, helper] if helper else value
+    return attrs
+
+
+def _restore_attrs(party, attrs):
+    for name, value in attrs.items():
+        if isinstance(value, list) and value[:1] == [_HELPER_MARK]:
+            value = getattr(parties, value[1])(party.curve)
+        setattr(party, name, value)
+
+
+def _changed_attrs(party, before):
+    return [
+        name
+        for name, value in vars(party).items()
+        if name not in before or before[name] is not value
+    ]
+
+
+def _replay(step, party, args, record):
+    if party is not None:
+        _restore_attrs(party, record["attrs"])
+    for i, items in zip(step.queues, record["queues"]):
+        for item in items:
+            args[i].put(codec.decode(item))
+    for name, value in record["globals"].items():
+        setattr(parties, name, value)
+    return record["result"]
+
+
+def _wrap(step, method):
+    def wrapper(*args, **kwargs):
+        store = STORE
+        party = None if step.static else args[0]
+        call_args = list(args if step.static else args[1:])
+        key = store.key(step, party, call_args)
+        if store.replaying(step.phase):
+            record = store.load(step.phase, key)
+            if record is not None:
+                store.stats["replayed"] += 1
+                return _replay(step, party, call_args, record)
+            store.stats["missed"] += 1
+
+        before = dict(vars(party)) if party is not None else None
+        recorders = {}
+        for i in step.queues:
+            if i < len(call_args):
+                recorders[i] = call_args[i] = _RecordingQueue(call_args[i])
+        if party is not None:
+            result = method(party, *call_args, **kwargs)
+        else:
+            result = method(*call_args, **kwargs)
+
+        record = {
+            "step": step.label,
+            "party": _party_key(party),
+            "result": result,
+            "attrs": {},
+            "queues": [recorders[i].items for i in sorted(recorders)],
+            "globals": {
+                name: getattr(parties, name)
+                for name in step.assigns
+                if hasattr(parties, name)
+            },
+        }
+        if step.keep_args:
+            record["args"] = [
+                arg
+                for i, arg in enumerate(call_args)
+                if i not in step.queues
+            ]
+        if party is not None:
+            record["attrs"] = _encode_attrs(
+                party, _changed_attrs(party, before)
+            )
+        try:
+            store.save(step.phase, key, record)
+            if step.publish is not None:
+                store.publish(step.publish(result))
+        except Exception as e:
+            print(f"[CHECKPOINT] {step.label} not stored: {e}")
+        return result
+
+    return wrapper
+
+
+# Layers of instrument(), innermost first: hooks that answer a call from
+# earlier work in place of the method (setup cache, incremental tally),
+# hooks that precompute for its result (randomizer pool), the checkpoint
+# records of what a call returned, and observers of the phase a call
+# belongs to (memory accounting, profiler), which see the phase before any
+# other layer works on the call.
+CACHE, PRECOMPUTE, RECORD, OBSERVE = range(4)
+
+# (class, method name) -> the method, its [layer, step, hook] entries and
+# the wrapper installed for them
+_INSTRUMENTED = {}
+
+
+def instrument(steps, hook, layer):
+    """Wrap the parties method of every step with hook(step, method).
+
+    hook returns the wrapper of method, and may be called again whenever
+    another hook is added to the same method. The wrappers of a method
+    nest by layer, innermost first, and by installation order within a
+    layer, so installers need not be called in any particular order. A
+    method patched by other means after it was instrumented raises
+    RuntimeError, since its wrappers would be lost.
+    """
+    for step in steps:
+        cls = getattr(parties, step.owner)
+        entry = _INSTRUMENTED.get((cls, step.name))
+        if entry is not None and getattr(cls, step.name) is not (
+            entry["wrapper"]
+        ):
+            raise RuntimeError(
+                f"{step.label} was patched after it was instrumented"
+            )
+    for step in steps:
+        cls = getattr(parties, step.owner)
+        entry = _INSTRUMENTED.setdefault(
+            (cls, step.name),
+            {"method": getattr(cls, step.name), "hooks": [], "wrapper": None},
+        )
+        entry["hooks"].append([layer, step, hook])
+        wrapper = entry["method"]
+        for _, hook_step, step_hook in sorted(
+            entry["hooks"], key=lambda item: item[0]
+        ):
+            inner = wrapper
+            wrapper = step_hook(hook_step, inner)
+            wrapper.__name__ = inner.__name__
+            wrapper.__doc__ = inner.__doc__
+            wrapper.__wrapped__ = inner
+        entry["wrapper"] = wrapper
+        setattr(cls, step.name, wrapper)
+
+
+def track_phases(enter):
+    """Call enter(phase) on every call of a STEPS method, before any other
+    layer works on the call."""
+
+    def hook(step, method):
+        def wrapper(*args, **kwargs):
+            enter(step.phase)
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    instrument(STEPS, hook, OBSERVE)
+
+
+def install_checkpoints(directory, replay_from=None, key_path=KEY_PATH):
+    """Record every phase under directory; replay phases before replay_from."""
+    global STORE
+    if STORE is not None:
+        raise CheckpointError("checkpoints already installed")
+    STORE = CheckpointStore(directory, replay_from, key_path)
+    instrument(STEPS, _wrap, RECORD)
+    return STORE
+
+
+def checkpoint_info(directory):
+    """Number of stored records per phase."""
+    info = {}
+    for phase in PHASES:
+        path = os.path.join(directory, phase)
+        if os.path.isdir(path):
+            info[phase] = sum(
+                1 for name in os.listdir(path) if name.endswith(".bin")
+            )
+    return info
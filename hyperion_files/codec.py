@@ -0,0 +1,265 @@
+"""Compact binary encoding for values exchanged between Hyperion processes.
+
+Points are packed as 64 raw bytes (x || y), serialized point dicts as the
+same 64 bytes plus a tag, and integers as length-prefixed big-endian bytes.
+ECC keys are stored as their point and optional secret, objects with
+to_json/from_json (threshold_crypto keys) as their JSON. Anything else falls
+back to pickle, or to the instance __dict__ when pickle cannot handle it
+(e.g. objects holding EC points).
+
+Decoding a pickle or an object tag runs code chosen by the data (pickle,
+or importing and calling a class by name), so only data written by this
+process or its own forked workers may be decoded as trusted. Data from a
+connection or a file someone else can write goes through
+decode(data, trusted=False), which refuses those tags.
+"""
+import importlib
+import operator
+import pickle
+import struct
+
+from Crypto.PublicKey import ECC
+
+CURVE = "P-256"
+COORD_BYTES = 32
+
+_NONE = b"N"
+_TRUE = b"T"
+_FALSE = b"F"
+_INT = b"I"
+_NEG_INT = b"J"
+_BYTES = b"B"
+_STR = b"U"
+_LIST = b"L"
+_TUPLE = b"P"
+_DICT = b"D"
+_POINT = b"E"
+_POINT_DICT = b"S"
+_INFINITY = b"O"
+_PICKLE = b"K"
+_ECC_KEY = b"Y"
+_JSON_OBJECT = b"X"
+_OBJECT = b"C"
+_FLOAT = b"R"
+
+_LEN = struct.Struct(">I")
+_DOUBLE = struct.Struct(">d")
+
+# Tags that execute code chosen by the data when decoded
+_UNSAFE_TAGS = (_PICKLE, _JSON_OBJECT, _OBJECT)
+
+
+class UntrustedDataError(ValueError):
+    """Raised by decode(..., trusted=False) on a tag that would run code."""
+
+
+def pack_point(x, y):
+    return int(x).to_bytes(COORD_BYTES, "big") + int(y).to_bytes(
+        COORD_BYTES, "big"
+    )
+
+
+def unpack_point(data, offset=0):
+    x = int.from_bytes(data[offset : offset + COORD_BYTES], "big")
+    y = int.from_bytes(
+        data[offset + COORD_BYTES : offset + 2 * COORD_BYTES], "big"
+    )
+    return x, y
+
+
+def _is_point_dict(value):
+    return (
+        len(value) == 3
+        and value.get("curve") == CURVE
+        and "x" in value
+        and "y" in value
+    )
+
+
+def _qualified_name(value):
+    cls = type(value)
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _resolve(name):
+    module, qualname = name.split(":")
+    value = importlib.import_module(module)
+    for part in qualname.split("."):
+        value = getattr(value, part)
+    return value
+
+
+def _encode_bytes(tag, data, out):
+    out.append(tag)
+    out.append(_LEN.pack(len(data)))
+    out.append(data)
+
+
+def _encode_object(value, out):
+    if isinstance(value, ECC.EccKey):
+        out.append(_ECC_KEY)
+        _encode(int(value.d) if value.has_private() else None, out)
+        out.append(pack_point(value.pointQ.x, value.pointQ.y))
+        return
+    if hasattr(value, "to_json") and hasattr(type(value), "from_json"):
+        out.append(_JSON_OBJECT)
+        _encode(_qualified_name(value), out)
+        _encode(value.to_json(), out)
+        return
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (TypeError, AttributeError, pickle.PicklingError):
+        if not hasattr(value, "__dict__"):
+            raise
+        out.append(_OBJECT)
+        _encode(_qualified_name(value), out)
+        _encode(vars(value), out)
+        return
+    _encode_bytes(_PICKLE, data, out)
+
+
+def _encode(value, out):
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, ECC.EccPoint):
+        if value.is_point_at_infinity():
+            out.append(_INFINITY)
+        else:
+            out.append(_POINT)
+            out.append(pack_point(value.x, value.y))
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out.append(_DOUBLE.pack(value))
+    elif isinstance(value, bytes):
+        out.append(_BYTES)
+        out.append(_LEN.pack(len(value)))
+        out.append(value)
+    elif isinstance(value, str):
+        data = value.encode("UTF-8")
+        out.append(_STR)
+        out.append(_LEN.pack(len(data)))
+        out.append(data)
+    elif isinstance(value, list):
+        out.append(_LIST)
+        out.append(_LEN.pack(len(value)))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, tuple):
+        out.append(_TUPLE)
+        out.append(_LEN.pack(len(value)))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        if _is_point_dict(value):
+            out.append(_POINT_DICT)
+            out.append(pack_point(value["x"], value["y"]))
+            return
+        out.append(_DICT)
+        out.append(_LEN.pack(len(value)))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        number = _as_integer(value)
+        if number is not None:
+            tag = _INT if number >= 0 else _NEG_INT
+            number = abs(number)
+            data = number.to_bytes((number.bit_length() + 7) // 8, "big")
+            _encode_bytes(tag, data, out)
+            return
+        _encode_object(value, out)
+
+
+def _as_integer(value):
+    # int, gmpy2.mpz and Crypto.Math Integer all support __index__;
+    # floats do not, so they are never truncated silently.
+    try:
+        return operator.index(value)
+    except TypeError:
+        return None
+
+
+def encode(value):
+    out = []
+    _encode(value, out)
+    return b"".join(out)
+
+
+def _decode(data, pos, trusted):
+    tag = data[pos : pos + 1]
+    pos = pos + 1
+    if not trusted and tag in _UNSAFE_TAGS:
+        raise UntrustedDataError(
+            f"Refusing codec tag {bytes(tag)!r} in untrusted data"
+        )
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _POINT:
+        x, y = unpack_point(data, pos)
+        return ECC.EccPoint(x, y, CURVE), pos + 2 * COORD_BYTES
+    if tag == _INFINITY:
+        return ECC.EccPoint(0, 0, CURVE), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+    if tag == _POINT_DICT:
+        x, y = unpack_point(data, pos)
+        return {"x": x, "y": y, "curve": CURVE}, pos + 2 * COORD_BYTES
+    if tag == _ECC_KEY:
+        d, pos = _decode(data, pos, trusted)
+        x, y = unpack_point(data, pos)
+        fields = {"curve": CURVE, "point_x": x, "point_y": y}
+        if d is not None:
+            fields["d"] = d
+        return ECC.construct(**fields), pos + 2 * COORD_BYTES
+    if tag == _JSON_OBJECT:
+        name, pos = _decode(data, pos, trusted)
+        state, pos = _decode(data, pos, trusted)
+        return _resolve(name).from_json(state), pos
+    if tag == _OBJECT:
+        name, pos = _decode(data, pos, trusted)
+        state, pos = _decode(data, pos, trusted)
+        cls = _resolve(name)
+        value = cls.__new__(cls)
+        value.__dict__.update(state)
+        return value, pos
+    (length,) = _LEN.unpack_from(data, pos)
+    pos = pos + _LEN.size
+    if tag in (_INT, _NEG_INT):
+        number = int.from_bytes(data[pos : pos + length], "big")
+        return (number if tag == _INT else -number), pos + length
+    if tag == _BYTES:
+        return bytes(data[pos : pos + length]), pos + length
+    if tag == _STR:
+        return str(data[pos : pos + length], "UTF-8"), pos + length
+    if tag == _PICKLE:
+        return pickle.loads(data[pos : pos + length]), pos + length
+    if tag in (_LIST, _TUPLE):
+        items = []
+        for _ in range(length):
+            item, pos = _decode(data, pos, trusted)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), pos
+    if tag == _DICT:
+        result = {}
+        for _ in range(length):
+            key, pos = _decode(data, pos, trusted)
+            result[key], pos = _decode(data, pos, trusted)
+        return result, pos
+    raise ValueError(f"Unknown codec tag {tag!r} at offset {pos - 1}")
+
+
+def decode(data, trusted=True):
+    """Value of encode() output. With trusted=False, pickles and objects
+    resolved by class name are refused (UntrustedDataError)."""
+    value, pos = _decode(memoryview(data), 0, trusted)
+    if pos != len(data):
+        raise ValueError(f"{len(data) - pos} trailing bytes after value")
+    return value
@@ -0,0 +1,110 @@
+"""Seeded, reproducible Hyperion runs.
+
+install_seed(seed) replaces every source of randomness the protocol uses
+with a deterministic stream derived from the seed: the random module
+(vote choice, curve scalars), os.urandom and Crypto.Random (key
+generation, ECDSA nonces, threshold key shares, randomizer pools). Forked
+children get their own stream: processes started by main.py are numbered in
+fork order, and workers.ChunkRunner (and incremental batch) workers reseed
+from their label and chunk index, so the outcome does not depend on
+scheduling or retries. Those workers are not numbered, so a retried chunk
+or a filled randomizer pool does not shift the streams of main.py's later
+processes.
+
+Only for testing and comparing runs; a seeded election is not secure.
+"""
+import hashlib
+import os
+import random
+import sys
+
+import workers
+
+_STATE = {"seed": None, "forks": 0}
+
+
+class SeededBytes:
+    """os.urandom replacement producing SHAKE-256(seed || counter) blocks."""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.counter = 0
+        self.buffer = b""
+
+    def __call__(self, n):
+        while len(self.buffer) < n:
+            block = hashlib.shake_256(
+                self.seed + self.counter.to_bytes(8, "big")
+            ).digest(4096)
+            self.counter += 1
+            self.buffer += block
+        out, self.buffer = self.buffer[:n], self.buffer[n:]
+        return out
+
+
+def derive_seed(seed, *labels):
+    h = hashlib.sha256(str(seed).encode("UTF-8"))
+    for label in labels:
+        h.update(b"\0" + str(label).encode("UTF-8"))
+    return h.digest()
+
+
+_SOURCE = [None]
+_ORIGINAL_URANDOM = os.urandom
+
+
+def seeded_urandom(n):
+    return _SOURCE[0](n)
+
+
+def _rebind(old, new):
+    # Modules that did `from os import urandom` (random, Crypto.Random, ...)
+    # hold their own reference
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if not namespace:
+            continue
+        for name in ("urandom", "_urandom", "get_random_bytes"):
+            if namespace.get(name) is old:
+                setattr(module, name, new)
+
+
+def reseed(*labels):
+    """Switch this process to the stream for labels under the run seed."""
+    seed = derive_seed(_STATE["seed"], *labels)
+    _SOURCE[0] = SeededBytes(seed)
+    random.seed(seed)
+
+
+def _before_fork():
+    # Workers reseeded through FORK_HOOKS do not take a number
+    if not workers.in_hooked_start():
+        _STATE["forks"] += 1
+
+
+def _after_fork_in_child():
+    reseed("fork", _STATE["forks"])
+
+
+def _chunk_worker(label, index):
+    reseed("chunk", label, index)
+
+
+def install_seed(seed):
+    """Make this process (and every process it forks) deterministic."""
+    import Crypto.Random  # noqa: F401 - bound before it is rebound
+
+    if _STATE["seed"] is None:
+        _rebind(_ORIGINAL_URANDOM, seeded_urandom)
+        os.register_at_fork(
+            before=_before_fork, after_in_child=_after_fork_in_child
+        )
+        workers.FORK_HOOKS.append(_chunk_worker)
+    _STATE["seed"] = seed
+    _STATE["forks"] = 0
+    reseed("main")
+    print(f"[SEED] Deterministic run with seed {seed}")
+
+
+def seed():
+    return _STATE["seed"]
@@ -0,0 +1,83 @@
+"""Hash function of the election transcript.
+
+Ballot signatures hash the ballot with hash_to_mpz, and the decryption
+proofs hash their weights and challenges with the suite installed for the
+election (install_suite, --hash). ML-DSA key digests
+(pqc_primitives.key_digest, and so _PointWrapper.xy) use it too, through
+the suite the client sets on its key registry. Every
+suite gives DIGEST_BYTES bytes, so digests and the integers made from them
+keep their size whichever hash is chosen.
+
+With the default suite, hash_to_mpz is curve.hash_to_mpz, so ballots hash
+exactly as without this module.
+"""
+import hashlib
+
+import gmpy2
+
+DIGEST_BYTES = 32
+DEFAULT = "sha256"
+
+
+def _sha256(data):
+    return hashlib.sha256(data).digest()
+
+
+def _sha3_256(data):
+    return hashlib.sha3_256(data).digest()
+
+
+def _shake_256(data):
+    return hashlib.shake_256(data).digest(DIGEST_BYTES)
+
+
+def _blake2b(data):
+    return hashlib.blake2b(data, digest_size=DIGEST_BYTES).digest()
+
+
+SUITES = {
+    "sha256": _sha256,
+    "sha3-256": _sha3_256,
+    "shake-256": _shake_256,
+    "blake2b": _blake2b,
+}
+
+_STATE = {"name": DEFAULT}
+
+
+def available_suites():
+    return list(SUITES)
+
+
+def install_suite(name):
+    """Hash the transcript of this process (and its workers) with name."""
+    if name not in SUITES:
+        raise ValueError(f"Unknown hash suite: {name}")
+    _STATE["name"] = name
+    if name != DEFAULT:
+        print(f"[HASH] {name.upper()} for transcript hashing")
+
+
+def name():
+    return _STATE["name"]
+
+
+def digest(data, suite=None):
+    """DIGEST_BYTES-byte digest of data with suite (default: installed)."""
+    return SUITES[suite or _STATE["name"]](data)
+
+
+def hexdigest(text, suite=None):
+    return digest(text.encode("UTF-8"), suite).hex()
+
+
+def to_mpz(text, suite=None):
+    value = digest(text.encode("UTF-8"), suite)
+    return gmpy2.mpz(int.from_bytes(value, "big"))
+
+
+def hash_to_mpz(curve, message):
+    """The message hash signed in a ballot."""
+    if _STATE["name"] == DEFAULT:
+        return curve.hash_to_mpz(message)
+    return to_mpz(message)
@@ -0,0 +1,267 @@
+"""Online incremental tally: validation and raise-h while voting is open.
+
+install_incremental_tally(batch_size) submits every ballot returned by
+Voter.sign_ballot. Once batch_size ballots are pending they are handed to
+a forked worker, which validates them and runs raise-h for every teller,
+while the main process goes on with voting. At most `processes` batches
+run at a time; ballots cast meanwhile simply make the next batch larger.
+
+The results are kept as running state in the main process:
+- the validation output of every ballot;
+- the serialized h_r, proof and g^r_i of every (teller, ballot).
+Before the process forks for the tally (or when the tally methods are
+called in it), the batches still running are awaited. Teller.validate_ballot
+and Teller.raise_h_entries then answer ballots from that state and only
+compute the rest, i.e. the last partial batch and any ballot that changed
+after it was cast. A batch worker that fails costs nothing but the
+speedup: its ballots are computed during the tally as usual.
+"""
+import contextlib
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+
+import codec
+import workers
+
+DEFAULT_BATCH_SIZE = 32
+
+# Ballot fields Teller.validate_ballot reads
+_VALIDATED_FIELDS = ("id", "spk", "sig", "ev", "ptk", "pi_1", "pi_2")
+
+TALLY = None
+
+
+def ballot_digest(ballot):
+    """SHA-256 of the validated fields of a ballot."""
+    return hashlib.sha256(
+        codec.encode([ballot.get(name) for name in _VALIDATED_FIELDS])
+    ).hexdigest()
+
+
+def _teller_key(teller):
+    return getattr(teller.secret_key_share, "x", None)
+
+
+class IncrementalTally:
+    """Running validation and raise-h state of the ballots cast so far."""
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, processes=None):
+        self.batch_size = max(1, batch_size)
+        # One core stays with the voting loop
+        self.processes = processes or max(1, workers.available_cpus() - 1)
+        self.tellers = []
+        self.pending = []
+        self.running = []
+        self.validated = {}
+        self.raised = {}
+        self.batches = 0
+        self.ballots = 0
+        self.failed = 0
+        self.owner = os.getpid()
+        self.starting = False
+        self.ctx = multiprocessing.get_context("fork")
+
+    def add_teller(self, teller):
+        self.tellers.append(teller)
+
+    def submit(self, ballot):
+        """Queue a cast ballot; starts a batch when enough are pending."""
+        self.pending.append(ballot)
+        self.collect()
+        if len(self.pending) >= self.batch_size and self.tellers:
+            if len(self.running) < self.processes:
+                self._start(self.pending)
+                self.pending = []
+
+    def _start(self, ballots):
+        receive, send = self.ctx.Pipe(duplex=False)
+        process = self.ctx.Process(
+            target=_run_batch,
+            args=(self.tellers, self.batches, ballots, send),
+            daemon=True,
+        )
+        self.starting = True
+        try:
+            with workers.hooked_start():
+                process.start()
+        finally:
+            self.starting = False
+        send.close()
+        self.running.append((process, receive, len(ballots)))
+        self.batches += 1
+
+    def collect(self, wait=False):
+        """Merge the results of finished batches (of all, with wait)."""
+        still_running = []
+        for process, receive, count in self.running:
+            if not wait and not receive.poll():
+                still_running.append((process, receive, count))
+                continue
+            try:
+                result = codec.decode(receive.recv_bytes())
+            except (EOFError, OSError):
+                result = None
+            receive.close()
+            process.join()
+            if result is None:
+                self.failed += count
+                continue
+            self.validated.update(result["validated"])
+            for key, entries in result["raised"].items():
+                self.raised.setdefault(key, {}).update(entries)
+            self.ballots += count
+        self.running = still_running
+
+    def drain(self):
+        """Wait for every running batch; only in the process owning them."""
+        if os.getpid() == self.owner and self.running and not self.starting:
+            start = time.perf_counter()
+            self.collect(wait=True)
+            print(
+                f"[INCREMENTAL] {self.ballots} ballots processed during "
+                f"voting in {self.batches} batches, {len(self.pending)} "
+                f"left for the tally (waited "
+                f"{time.perf_counter() - start:.2f} s)"
+            )
+
+    def validation(self, ballot):
+        """Captured output of validate_ballot for ballot, or None."""
+        entry = self.validated.get(ballot.get("id"))
+        if entry is None or entry[0] != ballot_digest(ballot):
+            return None
+        return entry[1]
+
+    def raise_h_entry(self, teller, ballot, ptk):
+        """Stored raise_h_entry of (teller, ballot) if ballot still has
+        the public trapdoor key ptk (serialized), else None."""
+        entry = self.raised.get(_teller_key(teller), {}).get(ballot["id"])
+        if entry is None or entry[0] != ptk:
+            return None
+        return codec.decode(entry[1])
+
+
+def _run_batch(tellers, batch, ballots, send):
+    import jacobian
+
+    for hook in workers.FORK_HOOKS:
+        hook("incremental", batch)
+    try:
+        validated = {}
+        teller = tellers[0]
+        for ballot in ballots:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                _VALIDATE(teller.curve, teller.public_key, ballot)
+            validated[ballot["id"]] = [
+                ballot_digest(ballot),
+                output.getvalue(),
+            ]
+        ptks = jacobian.serialize_points(
+            [ballot["ptk"] for ballot in ballots]
+        )
+        raised = {}
+        for teller in tellers:
+            entries = _RAISE_H_ENTRIES(teller, ballots)
+            raised[_teller_key(teller)] = {
+                ballot["id"]: [ptk, codec.encode(entry)]
+                for ballot, ptk, entry in zip(ballots, ptks, entries)
+            }
+        send.send_bytes(
+            codec.encode({"validated": validated, "raised": raised})
+        )
+    finally:
+        send.close()
+
+
+_VALIDATE = None
+_RAISE_H_ENTRIES = None
+
+
+def _before_fork():
+    if TALLY is not None:
+        TALLY.drain()
+
+
+def install_incremental_tally(batch_size=DEFAULT_BATCH_SIZE, processes=None):
+    """Process ballots in batches of batch_size while voting is open."""
+    global TALLY
+    import checkpoint
+    import jacobian
+
+    if TALLY is not None:
+        raise RuntimeError("incremental tally already installed")
+    TALLY = IncrementalTally(batch_size, processes)
+
+    def teller_init(step, init):
+        def wrapper(self, *args, **kwargs):
+            init(self, *args, **kwargs)
+            TALLY.add_teller(self)
+
+        return wrapper
+
+    def voter_sign_ballot(step, sign_ballot):
+        def wrapper(self):
+            ballot = sign_ballot(self)
+            TALLY.submit(ballot)
+            return ballot
+
+        return wrapper
+
+    def validate_ballot(step, validate):
+        global _VALIDATE
+        _VALIDATE = validate
+
+        def wrapper(curve, teller_public_key, ballot):
+            TALLY.drain()
+            output = TALLY.validation(ballot)
+            if output is None:
+                return validate(curve, teller_public_key, ballot)
+            if output:
+                print(output, end="")
+
+        return wrapper
+
+    def raise_h_entries(step, compute):
+        global _RAISE_H_ENTRIES
+        _RAISE_H_ENTRIES = compute
+
+        def wrapper(self, ballots):
+            TALLY.drain()
+            ptks = jacobian.serialize_points(
+                [ballot["ptk"] for ballot in ballots]
+            )
+            results = [
+                TALLY.raise_h_entry(self, ballot, ptk)
+                for ballot, ptk in zip(ballots, ptks)
+            ]
+            missing = [
+                i for i, result in enumerate(results) if result is None
+            ]
+            if missing:
+                computed = compute(self, [ballots[i] for i in missing])
+                for i, result in zip(missing, computed):
+                    results[i] = result
+            return [tuple(result) for result in results]
+
+        return wrapper
+
+    # Innermost, so that checkpoint records hold what the tally returns
+    for step, hook in (
+        (checkpoint.Step("setup", "Teller", "__init__"), teller_init),
+        (checkpoint.Step("voting", "Voter", "sign_ballot"), voter_sign_ballot),
+        (
+            checkpoint.Step("mixing", "Teller", "validate_ballot"),
+            validate_ballot,
+        ),
+        (
+            checkpoint.Step("mixing", "Teller", "raise_h_entries"),
+            raise_h_entries,
+        ),
+    ):
+        checkpoint.instrument([step], hook, checkpoint.CACHE)
+    os.register_at_fork(before=_before_fork)
+    print(f"[INCREMENTAL] Tallying ballots in batches of {batch_size}")
+    return TALLY
@@ -0,0 +1,469 @@
+"""P-256 point arithmetic on gmpy2 in Jacobian coordinates.
+
+ECC.EccPoint allocates a native point (and validates it) for every
+construction and every non in-place operation, which dominates loops that
+deserialize points and sum scalar multiples of them. JacobianPoint keeps
+(X, Y, Z) as gmpy2 integers, with x = X / Z^2 and y = Y / Z^3; Z == 0 is the
+point at infinity. Additions and doublings need no inversion and work in
+place, so an accumulator is a single object. Convert with from_ecc /
+from_dict at the start of a loop and with to_ecc / to_dict at the end.
+"""
+import gmpy2
+from Crypto.PublicKey import ECC
+
+import codec
+
+CURVE = "P-256"
+
+P = gmpy2.mpz(2**256 - 2**224 + 2**192 + 2**96 - 1)
+B = gmpy2.mpz(
+    0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B
+)
+N = gmpy2.mpz(
+    0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
+)
+GX = gmpy2.mpz(
+    0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296
+)
+GY = gmpy2.mpz(
+    0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5
+)
+
+WINDOW_BITS = 4
+# Window of fixed_scalar_mul's signed digits
+WNAF_BITS = 5
+_WINDOW_MASK = (1 << WINDOW_BITS) - 1
+_ZERO = gmpy2.mpz(0)
+_ONE = gmpy2.mpz(1)
+
+
+class JacobianPoint:
+    """A P-256 point (X : Y : Z)."""
+
+    __slots__ = ("X", "Y", "Z")
+
+    def __init__(self, X, Y, Z=_ONE):
+        self.X = X
+        self.Y = Y
+        self.Z = Z
+
+    @classmethod
+    def identity(cls):
+        return cls(_ONE, _ONE, _ZERO)
+
+    @classmethod
+    def generator(cls):
+        return cls(GX, GY)
+
+    @classmethod
+    def from_affine(cls, x, y, check=True):
+        x = gmpy2.mpz(x)
+        y = gmpy2.mpz(y)
+        if not x and not y:
+            return cls.identity()
+        if check and (y * y - x * (x * x - 3) - B) % P:
+            raise ValueError("The EC point does not belong to the curve")
+        return cls(x, y)
+
+    @classmethod
+    def from_ecc(cls, point):
+        if point.is_point_at_infinity():
+            return cls.identity()
+        # EccPoints are valid by construction
+        x, y = point.xy
+        return cls.from_affine(int(x), int(y), check=False)
+
+    @classmethod
+    def from_dict(cls, point):
+        """From a serialized point ({"x", "y", "curve"})."""
+        return cls.from_affine(point["x"], point["y"])
+
+    def copy(self):
+        return JacobianPoint(self.X, self.Y, self.Z)
+
+    def is_identity(self):
+        return not self.Z
+
+    def affine(self):
+        """(x, y); (0, 0) for the point at infinity."""
+        if not self.Z:
+            return _ZERO, _ZERO
+        z_inv = gmpy2.invert(self.Z, P)
+        z_inv2 = z_inv * z_inv % P
+        return self.X * z_inv2 % P, self.Y * z_inv2 * z_inv % P
+
+    def to_ecc(self):
+        x, y = self.affine()
+        return ECC.EccPoint(int(x), int(y), CURVE)
+
+    def to_dict(self):
+        x, y = self.affine()
+        return {"x": int(x), "y": int(y), "curve": CURVE}
+
+    def double(self):
+        """Double in place (dbl-2001-b, a = -3)."""
+        X, Y, Z = self.X, self.Y, self.Z
+        if not Z or not Y:
+            self.Z = _ZERO
+            return self
+        delta = Z * Z % P
+        gamma = Y * Y % P
+        beta = X * gamma % P
+        alpha = 3 * (X - delta) * (X + delta) % P
+        X3 = (alpha * alpha - 8 * beta) % P
+        self.Z = ((Y + Z) * (Y + Z) - gamma - delta) % P
+        self.Y = (alpha * (4 * beta - X3) - 8 * gamma * gamma) % P
+        self.X = X3
+        return self
+
+    def __iadd__(self, other):
+        """Add other in place (add-2007-bl; mixed when other.Z == 1)."""
+        if not other.Z:
+            return self
+        if not self.Z:
+            self.X, self.Y, self.Z = other.X, other.Y, other.Z
+            return self
+        X1, Y1, Z1 = self.X, self.Y, self.Z
+        X2, Y2, Z2 = other.X, other.Y, other.Z
+        Z1Z1 = Z1 * Z1 % P
+        U2 = X2 * Z1Z1 % P
+        S2 = Y2 * Z1 * Z1Z1 % P
+        if Z2 == 1:
+            U1, S1 = X1, Y1
+        else:
+            Z2Z2 = Z2 * Z2 % P
+            U1 = X1 * Z2Z2 % P
+            S1 = Y1 * Z2 * Z2Z2 % P
+        H = (U2 - U1) % P
+        r = (S2 - S1) % P
+        if not H:
+            if not r:
+                return self.double()
+            self.Z = _ZERO
+            return self
+        HH = H * H % P
+        HHH = H * HH % P
+        V = U1 * HH % P
+        X3 = (r * r - HHH - 2 * V) % P
+        self.Y = (r * (V - X3) - S1 * HHH) % P
+        self.Z = Z1 * Z2 * H % P
+        self.X = X3
+        return self
+
+    def __add__(self, other):
+        return self.copy().__iadd__(other)
+
+    def __neg__(self):
+        return JacobianPoint(self.X, (-self.Y) % P, self.Z)
+
+    def __isub__(self, other):
+        return self.__iadd__(-other)
+
+    def __sub__(self, other):
+        return self.copy().__iadd__(-other)
+
+    def _window_table(self):
+        table = [None, self.copy()]
+        for _ in range(2, 1 << WINDOW_BITS):
+            table.append(table[-1] + self)
+        return table
+
+    def __mul__(self, k):
+        return linear_combination([self], [k])
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if isinstance(other, ECC.EccPoint):
+            other = JacobianPoint.from_ecc(other)
+        if not isinstance(other, JacobianPoint):
+            return NotImplemented
+        if not self.Z or not other.Z:
+            return not self.Z and not other.Z
+        Z1Z1 = self.Z * self.Z % P
+        Z2Z2 = other.Z * other.Z % P
+        return (self.X * Z2Z2 - other.X * Z1Z1) % P == 0 and (
+            self.Y * Z2Z2 * other.Z - other.Y * Z1Z1 * self.Z
+        ) % P == 0
+
+    __hash__ = None
+
+    def __repr__(self):
+        x, y = self.affine()
+        return f"JacobianPoint(x={int(x)}, y={int(y)})"
+
+
+def linear_combination(points, scalars):
+    """sum(k * point) with shared doublings (Straus, 4-bit windows).
+
+    The multiples tables of all points are normalized to affine with one
+    inversion, so the main loop only does mixed additions.
+    """
+    tables = []
+    bits = 0
+    for point, k in zip(points, scalars):
+        k = int(k) % N
+        if k and not point.is_identity():
+            tables.append((point._window_table()[1:], k))
+            bits = max(bits, k.bit_length())
+    acc = JacobianPoint.identity()
+    if not tables:
+        return acc
+    width = (1 << WINDOW_BITS) - 1
+    affine = batch_affine([p for table, _ in tables for p in table])
+    terms = []
+    for i, (_, k) in enumerate(tables):
+        row = affine[i * width : (i + 1) * width]
+        terms.append(([None] + [JacobianPoint(x, y) for x, y in row], k))
+    windows = -(-bits // WINDOW_BITS)
+    for i in range(windows - 1, -1, -1):
+        if not acc.is_identity():
+            for _ in range(WINDOW_BITS):
+                acc.double()
+        shift = i * WINDOW_BITS
+        for table, k in terms:
+            digit = (k >> shift) & _WINDOW_MASK
+            if digit:
+                acc += table[digit]
+    return acc
+
+
+def _wnaf(k, width):
+    """Signed digits of k, least significant first: every non-zero digit
+    is odd and below 2^(width - 1) in absolute value."""
+    digits = []
+    while k:
+        if k & 1:
+            digit = k & ((1 << width) - 1)
+            if digit >= 1 << (width - 1):
+                digit -= 1 << width
+            k -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        k >>= 1
+    return digits
+
+
+def fixed_scalar_mul(points, k):
+    """k * point for every point, for one scalar k shared by all of them.
+
+    k is recoded once (width-WNAF_BITS NAF) instead of per point, each
+    point only needs its odd multiples up to 2^(WNAF_BITS - 1) and the
+    tables of all points are made affine with a single inversion.
+    """
+    digits = _wnaf(int(k) % N, WNAF_BITS)
+    odd = 1 << (WNAF_BITS - 2)
+    finite = [point for point in points if not point.is_identity()]
+    tables = []
+    for point in finite:
+        table = [point.copy()]
+        twice = point.copy().double()
+        for _ in range(1, odd):
+            table.append(table[-1] + twice)
+        tables.extend(table)
+    affine = batch_affine(tables)
+    results = []
+    for i in range(len(finite)):
+        row = affine[i * odd : (i + 1) * odd]
+        positive = [JacobianPoint(x, y) for x, y in row]
+        negative = [JacobianPoint(x, (-y) % P) for x, y in row]
+        acc = JacobianPoint.identity()
+        for digit in reversed(digits):
+            acc.double()
+            if digit > 0:
+                acc += positive[digit >> 1]
+            elif digit < 0:
+                acc += negative[-digit >> 1]
+        results.append(acc)
+    results = iter(results)
+    return [
+        JacobianPoint.identity() if point.is_identity() else next(results)
+        for point in points
+    ]
+
+
+def batch_affine(points):
+    """Affine (x, y) of every point with a single inversion.
+
+    Montgomery's trick: invert the product of all Z and recover each 1/Z
+    from prefix products. The point at infinity maps to (0, 0).
+    """
+    prefix = []
+    acc = _ONE
+    for point in points:
+        prefix.append(acc)
+        if point.Z:
+            acc = acc * point.Z % P
+    inv = gmpy2.invert(acc, P)
+    out = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        point = points[i]
+        if not point.Z:
+            out[i] = (_ZERO, _ZERO)
+            continue
+        z_inv = inv * prefix[i] % P
+        inv = inv * point.Z % P
+        z_inv2 = z_inv * z_inv % P
+        out[i] = (point.X * z_inv2 % P, point.Y * z_inv2 * z_inv % P)
+    return out
+
+
+def _affine_coordinates(points):
+    """(x, y) of EccPoints and JacobianPoints, inverting once for all
+    JacobianPoints. An EccPoint is read with a single xy call (x and y
+    each normalize the native point again)."""
+    jacobian = [p for p in points if isinstance(p, JacobianPoint)]
+    normalized = iter(batch_affine(jacobian))
+    out = []
+    for point in points:
+        if isinstance(point, JacobianPoint):
+            out.append(next(normalized))
+        elif point.is_point_at_infinity():
+            out.append((_ZERO, _ZERO))
+        else:
+            out.append(point.xy)
+    return out
+
+
+def serialize_points(points):
+    """Serialized point dicts ({"x", "y", "curve"}) of a list of points.
+
+    The same dicts as tc.data._ecc_point_to_serializable, for a whole
+    vector of EccPoints and JacobianPoints at once.
+    """
+    return [
+        {"x": int(x), "y": int(y), "curve": CURVE}
+        for x, y in _affine_coordinates(points)
+    ]
+
+
+def serialize_point(point):
+    return serialize_points([point])[0]
+
+
+def pack_points(points):
+    """x || y of every point (64 bytes each, codec.pack_point layout)."""
+    return b"".join(
+        codec.pack_point(x, y) for x, y in _affine_coordinates(points)
+    )
+
+
+def unpack_points(data):
+    """JacobianPoints of pack_points output."""
+    size = 2 * codec.COORD_BYTES
+    return [
+        JacobianPoint.from_affine(*codec.unpack_point(data, offset))
+        for offset in range(0, len(data), size)
+    ]
+
+
+class FixedBase:
+    """Windowed multiples of a fixed point, stored affine.
+
+    rows[i][d - 1] = d * 2^(WINDOW_BITS * i) * base, so a multiplication is
+    at most one mixed addition per window and no doubling. rows are
+    computed from base unless given (see from_affine_rows).
+    """
+
+    def __init__(self, base, rows=None):
+        self.base = base
+        if rows is None:
+            rows = self._build(base)
+        self.rows = rows
+
+    @staticmethod
+    def _build(base):
+        points = []
+        step = base.copy()
+        for _ in range(-(-256 // WINDOW_BITS)):
+            acc = step.copy()
+            points.append(acc.copy())
+            for _ in range(2, 1 << WINDOW_BITS):
+                acc += step
+                points.append(acc.copy())
+            acc += step
+            step = acc
+        affine = batch_affine(points)
+        width = (1 << WINDOW_BITS) - 1
+        return [
+            [JacobianPoint(x, y) for x, y in affine[i : i + width]]
+            for i in range(0, len(affine), width)
+        ]
+
+    @classmethod
+    def from_affine_rows(cls, base, data):
+        """FixedBase of base from affine_rows output; every point is
+        checked to be on the curve."""
+        width = (1 << WINDOW_BITS) - 1
+        if len(data) != -(-256 // WINDOW_BITS) or any(
+            len(row) != width for row in data
+        ):
+            raise ValueError("fixed-base table has the wrong shape")
+        return cls(
+            base,
+            [[JacobianPoint.from_affine(x, y) for x, y in row] for row in data],
+        )
+
+    def affine_rows(self):
+        """[x, y] of every table point, row by row."""
+        return [[[int(p.X), int(p.Y)] for p in row] for row in self.rows]
+
+    def mul(self, k):
+        k = int(k) % N
+        acc = JacobianPoint.identity()
+        i = 0
+        while k:
+            digit = k & _WINDOW_MASK
+            if digit:
+                acc += self.rows[i][digit - 1]
+            k >>= WINDOW_BITS
+            i += 1
+        return acc
+
+
+# Tables fixed_base keeps: the generator, the election key and a few more.
+# Beyond that the least recently used table is dropped, so the tables of
+# earlier elections in the same process do not pile up.
+MAX_FIXED_BASES = 8
+_FIXED = {}
+
+
+def _fixed_key(point):
+    return tuple(int(c) for c in point.affine())
+
+
+def _keep_fixed(key, table):
+    _FIXED[key] = table
+    while len(_FIXED) > MAX_FIXED_BASES:
+        del _FIXED[next(iter(_FIXED))]
+
+
+def fixed_base(point):
+    """Cached FixedBase of an EccPoint or JacobianPoint."""
+    if isinstance(point, ECC.EccPoint):
+        point = JacobianPoint.from_ecc(point)
+    key = _fixed_key(point)
+    table = _FIXED.pop(key, None)
+    if table is None:
+        table = FixedBase(point)
+    _keep_fixed(key, table)
+    return table
+
+
+def register_fixed_base(table):
+    """Make fixed_base return table (e.g. one loaded with the election
+    setup) for its base."""
+    _keep_fixed(_fixed_key(table.base), table)
+
+
+def clear_fixed_bases():
+    _FIXED.clear()
+
+
+def sum_points(points):
+    """Sum of points as one JacobianPoint, accumulated in place."""
+    acc = JacobianPoint.identity()
+    for point in points:
+        acc += point
+    return acc
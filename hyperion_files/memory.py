@@ -0,0 +1,212 @@
+"""Per-phase memory accounting.
+
+install_memory_accounting() follows the protocol phases of checkpoint.STEPS:
+the first call of a phase's method in the main process ends the previous
+phase. For every phase it reports
+- the main process's peak RSS (VmHWM, reset at every phase start where
+  the kernel allows it, sampled otherwise),
+- the largest peak RSS of any worker process and the peak RSS of the
+  whole process tree, from a sampling thread and from the rusage of
+  reaped children,
+- the peak of Python allocations (tracemalloc) and the allocation sites
+  holding the most memory at the end of the phase.
+
+finish() prints the report as [MEMORY] lines; the runner calls it when
+the run ends, and run_hyperion parses them into result["memory"].
+"""
+import os
+import resource
+import threading
+import tracemalloc
+
+SAMPLE_INTERVAL = 0.05
+TOP_ALLOCATIONS = 5
+# tracemalloc frames kept per allocation
+TRACE_FRAMES = 1
+
+_MB = 1024 * 1024
+
+# Allocations of the accounting itself and of imports are not reported
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def _status_kb(pid, field):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _children(pid):
+    children = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            pass
+    return children
+
+
+def descendants(pid):
+    """pids of every process below pid."""
+    out = []
+    stack = _children(pid)
+    while stack:
+        child = stack.pop()
+        out.append(child)
+        stack.extend(_children(child))
+    return out
+
+
+def _reset_peak_rss():
+    # Writing 5 to clear_refs resets VmHWM (Linux 4.0+)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _children_maxrss_kb():
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+
+class PhaseMemory:
+    """Peaks (bytes) of one phase."""
+
+    def __init__(self, name):
+        self.name = name
+        self.parent = 0
+        self.workers = 0
+        self.total = 0
+        self.python = 0
+        self.top = []
+
+    def line(self):
+        return (
+            f"[MEMORY] {self.name}: parent {self.parent / _MB:.1f} MB, "
+            f"workers {self.workers / _MB:.1f} MB, "
+            f"total {self.total / _MB:.1f} MB, "
+            f"python {self.python / _MB:.1f} MB"
+        )
+
+
+class MemoryAccounting:
+    def __init__(self, phases, interval=SAMPLE_INTERVAL, top=TOP_ALLOCATIONS):
+        self.order = list(phases)
+        self.interval = interval
+        self.top = top
+        self.pid = os.getpid()
+        self.phases = []
+        self.current = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.hwm_reset = False
+        self.children_maxrss = 0
+
+    def start(self, phase):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        self._begin(phase)
+        thread = threading.Thread(
+            target=self._sample, name="memory-accounting", daemon=True
+        )
+        thread.start()
+
+    def _begin(self, phase):
+        self.current = PhaseMemory(phase)
+        self.phases.append(self.current)
+        self.hwm_reset = _reset_peak_rss()
+        self.children_maxrss = _children_maxrss_kb()
+        tracemalloc.reset_peak()
+
+    def _end(self):
+        phase = self.current
+        if self.hwm_reset:
+            peak = _status_kb("self", "VmHWM") * 1024
+            phase.parent = max(phase.parent, peak)
+        maxrss = _children_maxrss_kb()
+        if maxrss > self.children_maxrss:
+            # A child reaped during this phase set a new maximum
+            phase.workers = max(phase.workers, maxrss * 1024)
+        phase.python = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            _SNAPSHOT_FILTERS
+        )
+        statistics = snapshot.statistics("lineno")
+        phase.top = [
+            (str(stat.traceback[0]), stat.size, stat.count)
+            for stat in statistics[: self.top]
+        ]
+
+    def enter(self, phase):
+        """Called with the phase of every instrumented method call."""
+        if os.getpid() != self.pid:
+            return
+        # Phases only move forward; e.g. a voter's key generation during
+        # voting still counts as voting
+        if self.order.index(phase) <= self.order.index(self.current.name):
+            return
+        with self.lock:
+            self._end()
+            self._begin(phase)
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            parent = _status_kb(self.pid, "VmRSS") * 1024
+            workers = [
+                _status_kb(child, "VmRSS") * 1024
+                for child in descendants(self.pid)
+            ]
+            with self.lock:
+                phase = self.current
+                phase.parent = max(phase.parent, parent)
+                phase.workers = max([phase.workers] + workers)
+                phase.total = max(phase.total, parent + sum(workers))
+
+    def finish(self):
+        if os.getpid() != self.pid or self.stopped.is_set():
+            return
+        self.stopped.set()
+        with self.lock:
+            self._end()
+        for phase in self.phases:
+            phase.total = max(phase.total, phase.parent)
+            print(phase.line())
+            for location, size, count in phase.top:
+                print(
+                    f"[MEMORY] {phase.name} top: {location} "
+                    f"{size / _MB:.2f} MB ({count} blocks)"
+                )
+
+
+ACCOUNTING = None
+
+
+def install_memory_accounting(interval=SAMPLE_INTERVAL, top=TOP_ALLOCATIONS):
+    """Account memory per phase for the rest of this process's run."""
+    global ACCOUNTING
+    import checkpoint
+
+    if ACCOUNTING is not None:
+        raise RuntimeError("memory accounting already installed")
+    ACCOUNTING = MemoryAccounting(checkpoint.PHASES, interval, top)
+    checkpoint.track_phases(ACCOUNTING.enter)
+    ACCOUNTING.start(checkpoint.PHASES[0])
+    return ACCOUNTING
+
@@ -1,6 +1,7 @@
-import multiprocessing
-import hashlib
+import operator
 import random
+import secrets
+import warnings
 
 import threshold_crypto as tc
 import gmpy2
@@ -20,6 +21,180 @@ from exceptions import (
     InvalidWFNProofException,
 )
 from subroutines import Mixnet
+import pd_arena
+import precompute
+import workers
+import jacobian
+import auditor
+import hashsuite
+from range_proof import (
+    BinaryRangeProof,
+    is_range_proof,
+    or_proof_points,
+    range_proof_points,
+)
+
+# Well-formedness proof used by voters: "or_n" (one OR-branch per vote
+# value), "range" (binary decomposition, O(log vote_max)) or "auto" (the
+# smaller of the two for the election's vote_max).
+WELLFORMEDNESS_PROOF = "or_n"
+
+# The election's vote_max (-maxv). Ballots are verified against it, never
+# against a vote_max carried in the ballot.
+VOTE_MAX = None
+
+# Check every individual view (one batched check per view).
+VERIFY_INDIVIDUAL_VIEWS = False
+
+# Individual views shorter than this are mixed and checked in this
+# process; forking workers for them costs more than it saves.
+PARALLEL_MIX_MIN = 256
+
+# Teller worker processes: seconds one chunk may run before it is
+# terminated (None for no limit), and how often a failed chunk is retried.
+WORKER_TIMEOUT = None
+WORKER_RETRIES = 2
+
+
+class CommitmentCache:
+    """Verification commitments of this election's voters, by voter ID.
+
+    g_ri maps a voter ID to the term the voter was notified with and
+    commitments maps it to g_ri * secret trapdoor key, so a voter's
+    commitment is computed once however often it is checked. It holds one
+    entry per voter. Teller.generate_threshold_keys, the setup step every
+    election starts with, resets it, so it never outlives the election.
+    """
+
+    def __init__(self):
+        self.g_ri = {}
+        self.commitments = {}
+
+    def notify(self, voter_id, g_ri):
+        self.g_ri[voter_id] = g_ri
+        self.commitments.pop(voter_id, None)
+
+    def commitment(self, voter):
+        comm = self.commitments.get(voter.id)
+        if comm is None:
+            comm = self.g_ri[voter.id] * voter.secret_trapdoor_key
+            self.commitments[voter.id] = comm
+        return comm
+
+    def reset(self):
+        self.g_ri.clear()
+        self.commitments.clear()
+
+
+COMMITMENT_CACHE = CommitmentCache()
+
+
+class _Collector:
+    """Stands in for the result queue of an mp_* method run in a worker."""
+
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+
+def _print_progress(label):
+    """Progress callback printing every completed quarter of the chunks."""
+    reported = [0]
+
+    def progress(done, total):
+        quarter = done * 4 // total
+        if quarter > reported[0]:
+            reported[0] = quarter
+            print(f"[{label}] {done}/{total} items done")
+
+    return progress
+
+
+def _partition(items, chunk_size, processes):
+    if chunk_size is None:
+        return workers.Partitioner(items, processes)
+    return [
+        items[i : i + chunk_size] for i in range(0, len(items), chunk_size)
+    ]
+
+
+def _jacobian_point(point):
+    if isinstance(point, jacobian.JacobianPoint):
+        return point
+    if isinstance(point, dict):
+        return jacobian.JacobianPoint.from_dict(point)
+    return jacobian.JacobianPoint.from_ecc(point)
+
+
+def _points_like(items, points):
+    """JacobianPoints points as the kind of point items holds (EccPoints,
+    serialized dicts or JacobianPoints)."""
+    if items and isinstance(items[0], jacobian.JacobianPoint):
+        return points
+    serialized = jacobian.serialize_points(points)
+    if items and isinstance(items[0], dict):
+        return serialized
+    return [ECC.EccPoint(p["x"], p["y"], p["curve"]) for p in serialized]
+
+
+def _mix_sums(pairs):
+    """(sum r_j * output_j, sum r_j * input_j) of [input, output] pairs
+    for random weights r_j."""
+    weights = [secrets.randbits(auditor.BATCH_BITS) for _ in pairs]
+    return (
+        jacobian.linear_combination([out for _, out in pairs], weights),
+        jacobian.linear_combination([point for point, _ in pairs], weights),
+    )
+
+
+def _serialized_point(point):
+    if isinstance(point, dict):
+        return point
+    return jacobian.serialize_point(point)
+
+
+def _ballot_text(value):
+    """Text of signed ballot fields with every point as its coordinates.
+
+    str() of an EccPoint holds its memory address, so a ballot restored in
+    another process (a checkpoint replay, a worker) would no longer match
+    its signature; a point and its serialized dict give the same text.
+    """
+    if isinstance(value, ECC.EccPoint):
+        if value.is_point_at_infinity():
+            return "(0,0)"
+        return f"({int(value.x)},{int(value.y)})"
+    if isinstance(value, dict):
+        if "x" in value and "y" in value:
+            return f"({int(value['x'])},{int(value['y'])})"
+        return (
+            "{"
+            + ",".join(
+                f"{key}:{_ballot_text(item)}" for key, item in value.items()
+            )
+            + "}"
+        )
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_ballot_text(item) for item in value) + "]"
+    try:
+        return str(operator.index(value))
+    except TypeError:
+        return str(value)
+
+
+def ballot_message(ev, ptk, pi_1, pi_2):
+    """The message a voter signs for a ballot."""
+    return _ballot_text([ev, ptk, pi_1, pi_2])
+
+
+def wellformedness_mode(vote_max):
+    if WELLFORMEDNESS_PROOF == "auto":
+        if range_proof_points(vote_max) < or_proof_points(vote_max):
+            return "range"
+        return "or_n"
+    return WELLFORMEDNESS_PROOF
 
 
 class Voter:
@@ -48,9 +223,14 @@ class Voter:
 
     def encrypt_vote(self, teller_public_key):
         self.g_vote = self.curve.raise_p(int(self.vote))
-        self.encrypted_vote = self.ege.encrypt(
-            teller_public_key.Q, self.g_vote
-        )
+        if precompute.accelerated(teller_public_key.Q):
+            self.encrypted_vote = precompute.encrypt(
+                self.curve, teller_public_key.Q, self.g_vote
+            )
+        else:
+            self.encrypted_vote = self.ege.encrypt(
+                teller_public_key.Q, self.g_vote
+            )
 
     def generate_wellformedness_proof(self, teller_public_key):
         encrypted_vote = {
@@ -58,6 +238,16 @@ class Voter:
             "c2": self.encrypted_vote[1],
         }
         r = self.encrypted_vote[2]
+        if wellformedness_mode(self.vote_max) == "range":
+            self.wellformedness_proof = BinaryRangeProof(self.curve).prove(
+                encrypted_vote,
+                r,
+                teller_public_key.Q,
+                self.vote_max,
+                int(self.vote),
+                self.id,
+            )
+            return
         chmp = ChaumPedersenProof(self.curve)
         self.wellformedness_proof = chmp.prove_or_n(
             encrypted_vote,
@@ -70,11 +260,14 @@ class Voter:
 
     def sign_ballot(self):
         self.dsa = DSA(self.curve)
-        hash = self.curve.hash_to_mpz(
-            str(self.encrypted_vote)
-            + str(self.public_trapdoor_key)
-            + str(self.pok_trapdoor_key)
-            + str(self.wellformedness_proof)
+        hash = hashsuite.hash_to_mpz(
+            self.curve,
+            ballot_message(
+                self.encrypted_vote,
+                self.public_trapdoor_key,
+                self.pok_trapdoor_key,
+                self.wellformedness_proof,
+            ),
         )
         self.signature = self.dsa.sign(self.secret_key, hash)
         bb_data = {
@@ -92,10 +285,12 @@ class Voter:
 
     def notify(self, encrypted_term):
         self.g_ri = encrypted_term
+        COMMITMENT_CACHE.notify(self.id, encrypted_term)
 
     def generate_verification_comm(self):
-        g_ri_x = self.g_ri * self.secret_trapdoor_key
-        return g_ri_x
+        if COMMITMENT_CACHE.g_ri.get(self.id) is not self.g_ri:
+            COMMITMENT_CACHE.notify(self.id, self.g_ri)
+        return COMMITMENT_CACHE.commitment(self)
 
 
 class Teller:
@@ -104,33 +299,99 @@ class Teller:
         self.secret_key_share = secret_key_share
         self.public_key = public_key
         self.ege = ElGamalEncryption(self.curve)
-        self.core_count = multiprocessing.cpu_count()
+        # CPUs this process may use (affinity and cgroup quota), not the
+        # machine's total
+        self.core_count = workers.available_cpus()
 
     def generate_threshold_keys(k, num_tellers, tc_key_params):
+        COMMITMENT_CACHE.reset()
         thresh_params = tc.ThresholdParameters(k, num_tellers)
         pub_key, key_shares = tc.create_public_key_and_shares_centralized(
             tc_key_params, thresh_params
         )
         return pub_key, key_shares
 
+    def raise_h_entry(self, ballot):
+        """Raise-h for one ballot; returns serialized h_r, proof and g^r_i."""
+        return self.raise_h_entries([ballot])[0]
+
+    def raise_h_entries(self, ballots):
+        """raise_h_entry for every ballot, serialized in one batch.
+
+        g^r_i stays in Jacobian coordinates, and all points of all ballots
+        are normalized together (jacobian.serialize_points).
+        """
+        generator = jacobian.fixed_base(jacobian.JacobianPoint.generator())
+        entries = []
+        points = []
+        for ballot in ballots:
+            ciphertext, proof, r_i = self.raise_h(self.public_key, ballot)
+            entries.append((ciphertext, proof))
+            points.extend(
+                [
+                    ciphertext[0],
+                    ciphertext[1],
+                    proof["t_1"],
+                    proof["t_2"],
+                    generator.mul(r_i),
+                ]
+            )
+        serialized = iter(jacobian.serialize_points(points))
+        results = []
+        for ciphertext, proof in entries:
+            ciphertext[0] = next(serialized)
+            ciphertext[1] = next(serialized)
+            proof["t_1"] = next(serialized)
+            proof["t_2"] = next(serialized)
+            results.append((ciphertext, proof, next(serialized)))
+        return results
+
+    def serialize_ballot(self, ballot):
+        """Serialize the EC fields of a ballot in place."""
+        ballot["spk"] = _ecc_key_to_serializable(ballot["spk"])
+        # (container, key) of every point, serialized in one batch
+        slots = [
+            (ballot["ev"], 0),
+            (ballot["ev"], 1),
+            (ballot["pi_1"], "gr"),
+        ]
+        if not isinstance(ballot["ptk"], dict):
+            slots.append((ballot, "ptk"))
+        range_proof = is_range_proof(ballot["pi_2"])
+        if not range_proof:
+            # Serialize all elements in ul (pi_2[0]) and vl (pi_2[1])
+            # These lists have length equal to vote_max
+            for points in ballot["pi_2"][:2]:
+                slots.extend((points, j) for j in range(len(points)))
+        serialized = jacobian.serialize_points(
+            [container[key] for container, key in slots]
+        )
+        for (container, key), point in zip(slots, serialized):
+            container[key] = point
+        if range_proof:
+            BinaryRangeProof(self.curve).serialize(
+                ballot["pi_2"], jacobian.serialize_point
+            )
+        return ballot
+
     def mp_raise_h(self, list_in, q1, q2, q3):
         teller_proofs = []
         teller_registry = []
         list_out = []
+        entries = self.raise_h_entries([ballot for _, ballot in list_in])
+        ptks = jacobian.serialize_points(
+            [ballot["ptk"] for _, ballot in list_in]
+        )
         for i in range(0, len(list_in)):
             ballot = list_in[i][1]
             index = list_in[i][0]
-            ciphertext, proof, r_i = self.raise_h(self.public_key, ballot)
-            ciphertext[0] = tc.data._ecc_point_to_serializable(ciphertext[0])
-            ciphertext[1] = tc.data._ecc_point_to_serializable(ciphertext[1])
-
-            proof["t_1"] = tc.data._ecc_point_to_serializable(proof["t_1"])
-            proof["t_2"] = tc.data._ecc_point_to_serializable(proof["t_2"])
+            ciphertext, proof, g_r = entries[i]
+            ptk = ptks[i]
 
             teller_proof_record = {
                 "h_r": ciphertext,
                 "proof": proof,
-                "ptk": tc.data._ecc_point_to_serializable(ballot["ptk"]),
+                "ptk": ptk,
                 "id": ballot["id"],
             }
             teller_proofs.append(teller_proof_record)
@@ -139,36 +400,15 @@ class Teller:
             teller_registry.append(
                 {
                     "id": ballot["id"],
-                    "g_r": tc.data._ecc_point_to_serializable(
-                        self.curve.raise_p(r_i)
-                    ),
-                    "ptk": tc.data._ecc_point_to_serializable(ballot["ptk"]),
+                    "g_r": g_r,
+                    "ptk": ptk,
                 }
             )
             temp = []
             temp.append(index)
 
-            ballot["spk"] = _ecc_key_to_serializable(ballot["spk"])
-            temp_ev = ballot["ev"]
-            temp_ev[0] = tc.data._ecc_point_to_serializable(temp_ev[0])
-            temp_ev[1] = tc.data._ecc_point_to_serializable(temp_ev[1])
-            ballot["ev"] = temp_ev
-            ballot["ptk"] = tc.data._ecc_point_to_serializable(ballot["ptk"])
-            ballot["pi_1"]["gr"] = tc.data._ecc_point_to_serializable(
-                ballot["pi_1"]["gr"]
-            )
-            # Serialize all elements in ul (pi_2[0]) and vl (pi_2[1])
-            # These lists have length equal to vote_max, so we need to serialize all elements
-            for j in range(len(ballot["pi_2"][0])):
-                ballot["pi_2"][0][j] = tc.data._ecc_point_to_serializable(
-                    ballot["pi_2"][0][j]
-                )
-            for j in range(len(ballot["pi_2"][1])):
-                ballot["pi_2"][1][j] = tc.data._ecc_point_to_serializable(
-                    ballot["pi_2"][1][j]
-                )
-
-            temp.append(ballot)
+            ballot["ptk"] = ptk
+            temp.append(self.serialize_ballot(ballot))
             list_out.append(temp)
 
         q1.put(teller_proofs)
@@ -176,6 +416,7 @@ class Teller:
         q3.put(list_out)
 
     def ciphertext_list_split(self, list_0, n):
+        """n equal slices of list_0; see partition for load-balanced work."""
         k, m = divmod(len(list_0), n)
         split_list = [
             list_0[i * k + min(i, m) : (i + 1) * k + min(i + 1, m)]
@@ -197,104 +438,63 @@ class Teller:
 
     def verify_decryption_proof(
         self,
-        tau,
         p_1,
         p_2,
         w,
         public_key_share,
         ciphertexts,
         partial_decryptions,
+        component=1,
+        *,
+        tau=None,
     ):
-        prod_alpha = ECC.EccPoint(0, 0, "P-256")
-        prod_partial_decryptions = ECC.EccPoint(0, 0, "P-256")
-        alpha_terms = []
-        for ciphertext in ciphertexts:
-            index = ciphertext[0]
-            alpha_terms.append(ciphertext[1][0])
-            t = (
-                gmpy2.mpz(
-                    "0x"
-                    + hashlib.sha256(
-                        str(
-                            str(tau) + str(ciphertext[1][0]) + str(index)
-                        ).encode("UTF-8")
-                    ).hexdigest()
-                )
-                % self.curve.get_pars().order
-            )
+        """Check one component of an mp_partial_decrypt proof.
 
-            s_2 = ciphertexts[1][0] * t
-            prod_alpha = prod_alpha + s_2
-        for partial_decryption in partial_decryptions:
-            prod_partial_decryptions = (
-                prod_partial_decryptions + partial_decryption.v_y
-            )
-        u = (
-            gmpy2.mpz(
-                "0x"
-                + hashlib.sha256(
-                    str(
-                        str(p_1)
-                        + str(p_1)
-                        + str(self.curve.get_pars().P)
-                        + str(public_key_share)
-                        + str(alpha_terms)
-                        + str(partial_decryptions)
-                    ).encode("UTF-8")
-                ).hexdigest()
+        partial_decryptions are the [index, serialized_pd] rows of that
+        component, in the order of ciphertexts. See auditor for the
+        equations and for checking many proofs at once. tau is deprecated
+        and ignored: the weights are derived from the partial decryptions,
+        and proofs no longer carry a tau.
+        """
+        if tau is not None:
+            warnings.warn(
+                "verify_decryption_proof ignores tau; the weights are "
+                "derived from the partial decryptions",
+                DeprecationWarning,
+                stacklevel=2,
             )
-            % self.curve.get_pars().order
+        statement = auditor.Statement(
+            None,
+            component,
+            _serialized_point(public_key_share),
+            [ciphertext[component][0] for ciphertext in ciphertexts],
+            partial_decryptions,
+            _serialized_point(p_1),
+            _serialized_point(p_2),
+            w,
         )
-        v_1 = self.curve.raise_p(w) + (public_key_share * u)
-        v_2 = prod_alpha * w
-        v_2 = v_2 + (prod_partial_decryptions * u)
-        if (p_1 == v_1) and (p_2 == v_2):
+        if auditor.verify_statement(statement):
             return 1
         return 0
 
     def mp_partial_decrypt(self, ciphertexts_in, q1, q2, q3):
-        tau_1 = self.curve.get_random()
-        tau_2 = self.curve.get_random()
         r_1 = self.curve.get_random()
         r_2 = self.curve.get_random()
         p_1_1 = self.curve.raise_p(r_1)
         p_2_1 = self.curve.raise_p(r_2)
-        comm_tau_1 = hashlib.sha256(str(tau_1).encode("UTF-8")).hexdigest()
-        comm_tau_2 = hashlib.sha256(str(tau_2).encode("UTF-8")).hexdigest()
         output = []
         output2 = []
         proof = []
-        prod_alpha_1 = ECC.EccPoint(0, 0, "P-256")
-        prod_alpha_2 = ECC.EccPoint(0, 0, "P-256")
         alpha_terms_1 = []
         alpha_terms_2 = []
-        flag = 0
+        # prod(alpha^t) is accumulated in Jacobian coordinates: one
+        # multi-scalar multiplication instead of an EccPoint per term
+        alpha_points_1 = []
+        alpha_points_2 = []
         for ciphertext in ciphertexts_in:
             index = ciphertext[0]
             alpha_1 = ciphertext[1][0]
             alpha_2 = ciphertext[2][0]
-            t_1 = (
-                gmpy2.mpz(
-                    "0x"
-                    + hashlib.sha256(
-                        str(str(tau_1) + str(alpha_1) + str(index)).encode(
-                            "UTF-8"
-                        )
-                    ).hexdigest()
-                )
-                % self.curve.get_pars().order
-            )
-            t_2 = (
-                gmpy2.mpz(
-                    "0x"
-                    + hashlib.sha256(
-                        str(str(tau_2) + str(alpha_2) + str(index)).encode(
-                            "UTF-8"
-                        )
-                    ).hexdigest()
-                )
-                % self.curve.get_pars().order
-            )
 
             pd_1 = self.ege.partial_decrypt(
                 ECC.EccPoint(
@@ -312,17 +512,8 @@ class Teller:
                 ),
                 self.secret_key_share,
             )
-            if flag == 0:
-                flag = 1
-                prod_alpha_1 = deserialize_ep(alpha_1) * t_1
-
-                prod_alpha_2 = deserialize_ep(alpha_2) * t_2
-
-            else:
-                prod_alpha_1 = prod_alpha_1 + (deserialize_ep(alpha_1) * t_1)
-
-                prod_alpha_2 = prod_alpha_2 + (deserialize_ep(alpha_2) * t_2)
-
+            alpha_points_1.append(jacobian.JacobianPoint.from_dict(alpha_1))
+            alpha_points_2.append(jacobian.JacobianPoint.from_dict(alpha_2))
             alpha_terms_1.append(alpha_1)
             alpha_terms_2.append(alpha_2)
             temp = []
@@ -338,59 +529,67 @@ class Teller:
         q1.put(output)
         q2.put(output2)
 
-        p_1_2 = prod_alpha_1 * r_1
-        p_2_2 = prod_alpha_2 * r_2
-        u_1 = (
-            gmpy2.mpz(
-                "0x"
-                + hashlib.sha256(
-                    str(
-                        str(p_1_1)
-                        + str(p_1_2)
-                        + str(self.curve.get_pars().P.x)
-                        + str(self.curve.get_pars().P.y)
-                        + str(self.curve.raise_p(self.secret_key_share.y))
-                        + str(alpha_terms_1)
-                        + str(output)
-                    ).encode("UTF-8")
-                ).hexdigest()
-            )
-            % self.curve.get_pars().order
+        # The weights and challenges hash serialized points (str of an
+        # EccPoint holds its address), so that verifiers can recompute them.
+        # The weights hash the partial decryptions, so they only exist once
+        # every pd is fixed.
+        public_key_share = jacobian.serialize_point(
+            self.curve.raise_p(self.secret_key_share.y)
         )
-
-        u_2 = (
-            gmpy2.mpz(
-                "0x"
-                + hashlib.sha256(
-                    str(
-                        str(p_2_1)
-                        + str(p_2_2)
-                        + str(self.curve.get_pars().P.x)
-                        + str(self.curve.get_pars().P.y)
-                        + str(self.curve.raise_p(self.secret_key_share.y))
-                        + str(alpha_terms_2)
-                        + str(output2)
-                    ).encode("UTF-8")
-                ).hexdigest()
-            )
-            % self.curve.get_pars().order
+        seed_1 = auditor.weight_seed(public_key_share, alpha_terms_1, output)
+        seed_2 = auditor.weight_seed(public_key_share, alpha_terms_2, output2)
+        # (prod alpha^t)^r as a single sum of alpha^(t * r)
+        p_1_2_jac = jacobian.linear_combination(
+            alpha_points_1,
+            [auditor.weight(seed_1, index) * r_1 for index, _ in output],
+        )
+        p_2_2_jac = jacobian.linear_combination(
+            alpha_points_2,
+            [auditor.weight(seed_2, index) * r_2 for index, _ in output2],
+        )
+        p_1_1, p_1_2, p_2_1, p_2_2 = jacobian.serialize_points(
+            [p_1_1, p_1_2_jac, p_2_1, p_2_2_jac]
+        )
+        u_1 = auditor.challenge(
+            p_1_1, p_1_2, public_key_share, alpha_terms_1, output
+        )
+        u_2 = auditor.challenge(
+            p_2_1, p_2_2, public_key_share, alpha_terms_2, output2
         )
 
         w_1 = r_1 - (u_1 * self.secret_key_share.y)
         w_2 = r_2 - (u_2 * self.secret_key_share.y)
         q3.put(
             {
-                "p_1_1": tc.data._ecc_point_to_serializable(p_1_1),
-                "p_1_2": tc.data._ecc_point_to_serializable(p_1_2),
-                "p_2_1": tc.data._ecc_point_to_serializable(p_2_1),
-                "p_2_2": tc.data._ecc_point_to_serializable(p_2_2),
+                "p_1_1": p_1_1,
+                "p_1_2": p_1_2,
+                "p_2_1": p_2_1,
+                "p_2_2": p_2_2,
                 "w_1": w_1,
                 "w_2": w_2,
-                "tau_1": tau_1,
-                "tau_2": tau_2,
+                "public_key_share": public_key_share,
+                "hash": hashsuite.name(),
             }
         )
 
+    def partition(self, items, chunk_size=None):
+        """Chunks of items for worker_runner.
+
+        Fixed chunk_size slices if given, otherwise a workers.Partitioner
+        that hands out shrinking chunks as workers become free.
+        """
+        return _partition(items, chunk_size, self.core_count)
+
+    def worker_runner(self, target, label, progress=True):
+        return workers.ChunkRunner(
+            target,
+            processes=self.core_count,
+            timeout=WORKER_TIMEOUT,
+            retries=WORKER_RETRIES,
+            progress=_print_progress(label) if progress else None,
+            label=label,
+        )
+
     def multi_dim_index(self, list, key):
         for item in list:
             if item[0] == key:
@@ -398,7 +597,8 @@ class Teller:
         return None
 
     def mp_full_decrypt(self, pd1_in, ciphertexts, col, q1):
-        result = []
+        indices = []
+        messages = []
         for item in pd1_in:
             index = item[0]
             ct = self.multi_dim_index(ciphertexts, index)
@@ -406,48 +606,69 @@ class Teller:
                 deserialize_ep(ct[col][0]), deserialize_ep(ct[col][1]), ""
             )
 
-            result.append(
-                [
-                    index,
-                    tc.data._ecc_point_to_serializable(
-                        self.ege.threshold_decrypt(
-                            item[1],
-                            ciphertext,
-                            tc.ThresholdParameters(2, 3),
-                        )
-                    ),
-                ]
+            indices.append(index)
+            messages.append(
+                self.ege.threshold_decrypt(
+                    item[1],
+                    ciphertext,
+                    tc.ThresholdParameters(2, 3),
+                )
+            )
+        result = [
+            [index, message]
+            for index, message in zip(
+                indices, jacobian.serialize_points(messages)
             )
+        ]
         q1.put(result)
 
-    def full_decrypt(self, pd_in, q1):
+    def full_decrypt(self, pd_in, q1=None, ciphertexts=None, col=0):
+        """Combine partial decryptions on all cores.
+
+        Chunks run through workers.ChunkRunner, so a crashed or hung worker
+        is retried instead of blocking the election. Workers write their
+        results into a shared-memory pd_arena.DecryptionArena, one record
+        per row of pd_in, and only return their row range.
+
+        The old full_decrypt(pd_in, q1) call is still accepted positionally
+        (q1 is unused), but it never worked: mp_full_decrypt needs the
+        tagged ciphertexts and column, so every worker failed and q1.get()
+        blocked forever. Without ciphertexts this raises TypeError instead.
+        Only this method is protected; the mp_* methods main.py runs in its
+        own multiprocessing.Process still block on q.get() without a
+        timeout.
+        """
         global decrypted
-        split_ciphertexts = self.ciphertext_list_split(pd_in, self.core_count)
-        processes = [
-            multiprocessing.Process(
-                target=self.mp_full_decrypt, args=(ciph, q1)
+        if ciphertexts is None:
+            raise TypeError(
+                "full_decrypt(pd_in, q1) needs ciphertexts= (the tagged "
+                "ciphertexts) and col= to decrypt"
             )
-            for ciph in split_ciphertexts
-        ]
-        for p in processes:
-            p.daemon = True
-            p.start()
-        data = []
-        for p in processes:
-            data = data + q1.get()
-
-        for p in processes:
-            p.join()
-            # p.close()
-        decrypted = data
+
+        with pd_arena.DecryptionArena(len(pd_in)) as arena:
+
+            def decrypt_chunk(chunk):
+                start = chunk[0][0]
+                collector = _Collector()
+                self.mp_full_decrypt(
+                    [item for _, item in chunk], ciphertexts, col, collector
+                )
+                arena.write(start, collector.items[0])
+                return [start, len(chunk)]
+
+            runner = self.worker_runner(decrypt_chunk, "full_decrypt")
+            # A retried chunk writes the same rows again
+            for _ in runner.imap(self.partition(list(enumerate(pd_in)))):
+                pass
+            decrypted = arena.read()
 
     def validate_ballot(curve, teller_public_key, ballot):
         dsa = DSA(curve)
-        hash = curve.hash_to_mpz(
-            str(ballot["ev"])
-            + str(ballot["ptk"])
-            + str(ballot["pi_1"])
-            + str(ballot["pi_2"])
+        hash = hashsuite.hash_to_mpz(
+            curve,
+            ballot_message(
+                ballot["ev"], ballot["ptk"], ballot["pi_1"], ballot["pi_2"]
+            ),
         )
         nizk = NIZK(curve)
         chmp = ChaumPedersenProof(curve)
@@ -457,7 +678,27 @@ class Teller:
             if not nizk.verify(ballot["pi_1"], ballot["ptk"], ballot["id"]):
                 raise InvalidProofException(ballot["id"])
             ciphertext = {"c1": ballot["ev"][0], "c2": ballot["ev"][1]}
-            if not chmp.verify_or_n(
+            # Only the proof type the election uses is accepted
+            range_expected = (
+                WELLFORMEDNESS_PROOF != "or_n"
+                and VOTE_MAX is not None
+                and wellformedness_mode(VOTE_MAX) == "range"
+            )
+            if is_range_proof(ballot["pi_2"]) != range_expected:
+                raise InvalidWFNProofException(ballot["id"])
+            if range_expected:
+                if not BinaryRangeProof(curve).verify(
+                    ciphertext,
+                    teller_public_key.Q,
+                    ballot["pi_2"],
+                    VOTE_MAX,
+                    ballot["id"],
+                ):
+                    raise InvalidWFNProofException(ballot["id"])
+            elif VOTE_MAX is not None and len(ballot["pi_2"][0]) != VOTE_MAX:
+                # One OR-branch per vote value
+                raise InvalidWFNProofException(ballot["id"])
+            elif not chmp.verify_or_n(
                 ciphertext,
                 teller_public_key.Q,
                 ballot["pi_2"][0],
@@ -474,11 +715,19 @@ class Teller:
         r_i = self.curve.get_random()
         voter_public_key = ballot["ptk"]
 
-        ege = ElGamalEncryption(self.curve)
-
-        message = voter_public_key * r_i
-
-        ciphertext = ege.encrypt(teller_public_key.Q, message)
+        if precompute.accelerated(teller_public_key.Q):
+            message = voter_public_key * r_i
+            ciphertext = precompute.encrypt(
+                self.curve, teller_public_key.Q, message
+            )
+        else:
+            # (g^r, Q^r + ptk^r_i) in Jacobian coordinates; g and Q are
+            # fixed, so their multiples come from cached tables
+            r = self.curve.get_random()
+            c1 = jacobian.fixed_base(jacobian.JacobianPoint.generator())
+            c2 = jacobian.fixed_base(teller_public_key.Q).mul(r)
+            c2 += jacobian.JacobianPoint.from_ecc(voter_public_key) * r_i
+            ciphertext = [c1.mul(r).to_ecc(), c2.to_ecc(), r]
         nizk = NIZK(self.curve)
         proof = nizk.proof_2(
             ciphertext,
@@ -540,29 +789,78 @@ class Teller:
         ciphertext = ege.encrypt(registry_entry["ptk"], g_ri)
         return ciphertext
 
-    def individual_board_shuffle(self, list_0):
-        key = self.curve.get_random()
-        mx = Mixnet(self.curve)
-        proof = mx.exponentiation_mix(list_0, key)
+    def exponentiation_mix(self, list_0, key):
+        """key * element for every element of list_0, as JacobianPoints.
+
+        Every element is raised to the same key, so the key is recoded
+        once per chunk (jacobian.fixed_scalar_mul). Lists of at least
+        PARALLEL_MIX_MIN elements are cut into chunks on all cores.
         """
-        mx.verify_exponentiation_mix(
-            list_0,
-            proof[0],
-            proof[1],
-            proof[2],
-            proof[3],
-            proof[4],
-            proof[5],
-            proof[6],
-            proof[7],
-            proof[8],
-            proof[9],
-            proof[10],
-            proof[11],
-            proof[12],
-            proof[13],
-            proof[14],
-            proof[15],
+        points = [_jacobian_point(item) for item in list_0]
+        if len(points) < PARALLEL_MIX_MIN:
+            return jacobian.fixed_scalar_mul(points, key)
+
+        def raise_chunk(chunk):
+            return jacobian.pack_points(jacobian.fixed_scalar_mul(chunk, key))
+
+        runner = self.worker_runner(
+            raise_chunk, "exponentiation_mix", progress=False
         )
+        return [
+            point
+            for packed in runner.run(self.partition(points))
+            for point in jacobian.unpack_points(packed)
+        ]
+
+    def verify_exponentiation_mix(self, list_0, output, key, permutation):
+        """Check output[j] == key * list_0[permutation[j]] for every j.
+
+        One random linear combination over the whole view instead of one
+        check per element: sum(r_j * output[j]) must equal key *
+        sum(r_j * list_0[permutation[j]]) for random weights r_j. Long
+        views sum their chunks on all cores.
         """
-        return proof[0], key
+        if len(output) != len(list_0) or sorted(permutation) != list(
+            range(len(list_0))
+        ):
+            return False
+        pairs = [
+            [_jacobian_point(list_0[i]), _jacobian_point(point)]
+            for i, point in zip(permutation, output)
+        ]
+        if len(pairs) < PARALLEL_MIX_MIN:
+            sum_out, sum_in = _mix_sums(pairs)
+        else:
+            runner = self.worker_runner(
+                lambda chunk: jacobian.pack_points(_mix_sums(chunk)),
+                "verify_exponentiation_mix",
+                progress=False,
+            )
+            sums = [
+                jacobian.unpack_points(packed)
+                for packed in runner.run(self.partition(pairs))
+            ]
+            sum_out = jacobian.sum_points(out for out, _ in sums)
+            sum_in = jacobian.sum_points(point for _, point in sums)
+        return sum_out == sum_in * key
+
+    def individual_board_shuffle(self, list_0, verify=None):
+        """One individual view: every element of list_0 raised to a fresh
+        key, in shuffled order; returns (view, key).
+
+        The view holds the same kind of points as list_0. With verify
+        (default VERIFY_INDIVIDUAL_VIEWS) it is checked with
+        verify_exponentiation_mix before it is returned.
+        """
+        if verify is None:
+            verify = VERIFY_INDIVIDUAL_VIEWS
+        key = self.curve.get_random()
+        raised = self.exponentiation_mix(list_0, key)
+        permutation = list(range(len(raised)))
+        random.shuffle(permutation)
+        output = [raised[i] for i in permutation]
+        if verify and not self.verify_exponentiation_mix(
+            list_0, output, key, permutation
+        ):
+            raise InvalidProofException("individual_board_shuffle")
+        return _points_like(list_0, output), key
@@ -0,0 +1,77 @@
+"""Shared-memory arena for the results of full decryption.
+
+Teller.full_decrypt combines partial decryptions on forked workers. The
+inputs reach the workers through fork without being copied, but every
+result row ([index, serialized message point]) used to be codec-encoded,
+sent through the result pipe and decoded again. A DecryptionArena is a
+multiprocessing.shared_memory block with one fixed-width record per input
+row: the ciphertext index and the x || y of the point (codec.pack_point
+layout). A worker writes the records of its rows in place and only returns
+the row range; the parent reads all rows back in input order.
+"""
+import struct
+from multiprocessing import shared_memory
+
+import codec
+
+_INDEX = struct.Struct(">I")
+POINT_BYTES = 2 * codec.COORD_BYTES
+RECORD_BYTES = _INDEX.size + POINT_BYTES
+
+
+class DecryptionArena:
+    """rows [index, serialized point] records in shared memory.
+
+    Created in the parent before the workers are forked, which share the
+    mapping; use as a context manager so the block is unlinked.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.memory = shared_memory.SharedMemory(
+            create=True, size=max(1, rows * RECORD_BYTES)
+        )
+
+    def _offset(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError(f"record {row} out of range")
+        return row * RECORD_BYTES
+
+    def write(self, start, records):
+        """Store [index, serialized point] records from row start on."""
+        buffer = self.memory.buf
+        for row, (index, point) in enumerate(records, start):
+            offset = self._offset(row)
+            try:
+                _INDEX.pack_into(buffer, offset, index)
+                data = codec.pack_point(point["x"], point["y"])
+            except (struct.error, OverflowError) as e:
+                raise ValueError(
+                    f"record {row} does not fit {RECORD_BYTES} bytes: {e}"
+                )
+            buffer[offset + _INDEX.size : offset + RECORD_BYTES] = data
+
+    def read(self, start=0, stop=None):
+        """[index, serialized point] records of rows start..stop."""
+        if stop is None:
+            stop = self.rows
+        buffer = self.memory.buf
+        records = []
+        for row in range(start, stop):
+            offset = self._offset(row)
+            (index,) = _INDEX.unpack_from(buffer, offset)
+            x, y = codec.unpack_point(buffer, offset + _INDEX.size)
+            records.append(
+                [index, {"x": int(x), "y": int(y), "curve": codec.CURVE}]
+            )
+        return records
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
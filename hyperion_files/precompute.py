@@ -0,0 +1,239 @@
+import os
+import secrets
+import time
+
+from Crypto.PublicKey import ECC
+
+import codec
+import jacobian
+import workers
+
+SCALAR_BITS = 256
+
+_TABLES = {}
+_POOLS = {}
+
+
+class FixedBaseTable:
+    """jacobian.FixedBase of an EccPoint base, multiplying to EccPoints.
+
+    The table keeps the EccPoint it was made for, so that encrypt finds it
+    by identity. rows, if given, are the [x, y] rows of to_serializable
+    (a table stored with the election setup).
+    """
+
+    def __init__(self, base, rows=None, curve="P-256"):
+        self.base = base
+        self.curve = curve
+        point = jacobian.JacobianPoint.from_ecc(base)
+        if rows is None:
+            self.fixed = jacobian.FixedBase(point)
+        else:
+            self.fixed = jacobian.FixedBase.from_affine_rows(point, rows)
+
+    def mul(self, k):
+        return self.fixed.mul(k).to_ecc()
+
+    def to_serializable(self):
+        return self.fixed.affine_rows()
+
+    def from_serializable(base, data, curve="P-256"):
+        return FixedBaseTable(base, data, curve)
+
+
+def point_key(point):
+    return (int(point.x), int(point.y))
+
+
+def register_table(table):
+    """Use table for its base here and in jacobian.fixed_base."""
+    _TABLES[point_key(table.base)] = table
+    jacobian.register_fixed_base(table.fixed)
+
+
+def clear_tables():
+    _TABLES.clear()
+    jacobian.clear_fixed_bases()
+
+
+def get_table(point):
+    if not _TABLES:
+        return None
+    # Tables are registered with the election's own key objects, so an
+    # identity match avoids the affine conversion behind point.x/point.y.
+    for table in _TABLES.values():
+        if table.base is point:
+            return table
+    return _TABLES.get(point_key(point))
+
+
+def mul(point, k):
+    table = get_table(point)
+    if table is None:
+        return point * k
+    return table.mul(k)
+
+
+def encrypt(curve, public_key, message):
+    """EC-ElGamal encryption that uses a registered table or pool for
+    public_key.
+
+    With a non-empty randomizer pool the encryption is a single point
+    addition. Returns [c1, c2, r] in the same layout as
+    ElGamalEncryption.encrypt.
+    """
+    pool = get_pool(public_key)
+    if pool is not None and len(pool):
+        r, c1, r_q = pool.take()
+        r_q += message
+        return [c1, r_q, r]
+    r = curve.get_random()
+    c1 = curve.raise_p(r)
+    c2 = mul(public_key, r)
+    c2 += message
+    return [c1, c2, r]
+
+
+def accelerated(public_key):
+    """Whether encrypt has a table or randomizer pool for public_key."""
+    if get_table(public_key) is not None:
+        return True
+    pool = get_pool(public_key)
+    return pool is not None and len(pool) > 0
+
+
+_SCALAR_BYTES = SCALAR_BITS // 8
+_POINT_BYTES = 2 * codec.COORD_BYTES
+_TRIPLE_BYTES = _SCALAR_BYTES + 2 * _POINT_BYTES
+
+
+def _generator(curve):
+    params = ECC._curves[curve]
+    return ECC.EccPoint(params.Gx, params.Gy, curve)
+
+
+def _make_triples(public_key, count, curve):
+    """count packed (r, r*G, r*Q) records; r comes from the OS CSPRNG, so
+    forked workers never share randomizers."""
+    order = int(ECC._curves[curve].order)
+    generator = _generator(curve)
+    out = bytearray()
+    for _ in range(count):
+        r = secrets.randbelow(order - 1) + 1
+        r_g = mul(generator, r)
+        r_q = mul(public_key, r)
+        out += r.to_bytes(_SCALAR_BYTES, "big")
+        out += codec.pack_point(r_g.x, r_g.y)
+        out += codec.pack_point(r_q.x, r_q.y)
+    return bytes(out)
+
+
+class RandomizerPool:
+    """Precomputed ElGamal randomizers (r, r*G, r*Q) for one public key Q.
+
+    Triples are packed back to back in a bytearray (32-byte r, then both
+    points as 64-byte x || y) and taken from the end; every triple is used
+    once. Fill it offline, e.g. right after key generation, so that online
+    encryptions skip both scalar multiplications.
+
+    Only the process that created the pool draws from it. A forked child
+    gets a copy of the buffer, and siblings taking from their copies would
+    encrypt under the same r, so in any other process the pool is empty
+    and encrypt falls back to scalar multiplication.
+    """
+
+    def __init__(self, public_key, curve="P-256"):
+        self.public_key = public_key
+        self.curve = curve
+        self.buffer = bytearray()
+        self.owner = os.getpid()
+
+    def __len__(self):
+        """Triples this process may take (none outside the owner)."""
+        if os.getpid() != self.owner:
+            return 0
+        return len(self.buffer) // _TRIPLE_BYTES
+
+    def fill(self, count, processes=1):
+        """Add count triples, computed on processes forked workers."""
+        if count <= 0:
+            return
+        if processes == 1:
+            self.buffer += _make_triples(self.public_key, count, self.curve)
+            return
+        share, extra = divmod(count, processes)
+        sizes = [share + (i < extra) for i in range(processes)]
+        runner = workers.ChunkRunner(
+            lambda chunk: _make_triples(self.public_key, chunk[0], self.curve),
+            processes=processes,
+            label="randomizer_pool",
+        )
+        for data in runner.run([size] for size in sizes if size):
+            self.buffer += data
+
+    def take(self):
+        """Remove and return one (r, r*G, r*Q) triple."""
+        if os.getpid() != self.owner:
+            raise RuntimeError(
+                "randomizer pool used outside the process that owns it"
+            )
+        if not self.buffer:
+            raise IndexError("randomizer pool is empty")
+        record = self.buffer[-_TRIPLE_BYTES:]
+        del self.buffer[-_TRIPLE_BYTES:]
+        r = int.from_bytes(record[:_SCALAR_BYTES], "big")
+        r_g = ECC.EccPoint(
+            *codec.unpack_point(record, _SCALAR_BYTES), self.curve
+        )
+        r_q = ECC.EccPoint(
+            *codec.unpack_point(record, _SCALAR_BYTES + _POINT_BYTES),
+            self.curve,
+        )
+        return r, r_g, r_q
+
+
+def register_pool(pool):
+    _POOLS[point_key(pool.public_key)] = pool
+
+
+def clear_pools():
+    _POOLS.clear()
+
+
+def get_pool(point):
+    if not _POOLS:
+        return None
+    for pool in _POOLS.values():
+        if pool.public_key is point:
+            return pool
+    return _POOLS.get(point_key(point))
+
+
+def install_randomizer_pool(size, processes=None):
+    """Fill a pool of size randomizers for the election key during setup.
+
+    Wraps Teller.generate_threshold_keys outside any setup cache, so the
+    pool is built for whatever key the run ends up with.
+    """
+    import checkpoint
+
+    def hook(step, generate):
+        def generate_threshold_keys(k, num_tellers, tc_key_params):
+            pub_key, key_shares = generate(k, num_tellers, tc_key_params)
+            start = time.perf_counter()
+            pool = RandomizerPool(pub_key.Q)
+            pool.fill(size, processes or workers.available_cpus())
+            register_pool(pool)
+            print(
+                f"[PRECOMPUTE] {len(pool)} randomizers in "
+                f"{time.perf_counter() - start:.3f} s"
+            )
+            return pub_key, key_shares
+
+        return generate_threshold_keys
+
+    checkpoint.instrument(
+        [checkpoint.Step("setup", "Teller", "generate_threshold_keys")],
+        hook,
+        checkpoint.PRECOMPUTE,
+    )
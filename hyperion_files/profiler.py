@@ -0,0 +1,207 @@
+"""Sampling profiler with per-phase flamegraphs.
+
+install_profiler(directory) samples the Python stack of the main process
+and of every process forked from it every SAMPLE_INTERVAL seconds of CPU
+time (ITIMER_PROF / SIGPROF, so idle waiting costs nothing and is not
+sampled). Samples are attributed to the protocol phase of checkpoint.STEPS
+the process is in: a worker inherits the phase it was forked in and
+follows the step methods it runs itself.
+
+Every worker appends its samples to directory/raw/<pid>.folded when it
+exits (through multiprocessing's exit finalizers). finish(), called by the
+runner when the run ends, does the same for the main process and merges
+the samples of all processes per phase into
+- directory/<phase>.folded: collapsed stacks for flamegraph.pl or
+  inferno, rooted at "main" or "worker";
+- directory/profile.speedscope.json: one profile per phase for
+  https://www.speedscope.app.
+
+A signal is handled between bytecodes, so time in a long native call
+(gmpy2, the ECC library) is charged to the Python frame making it. Workers
+killed by a timeout or a signal lose their samples.
+"""
+import json
+import multiprocessing.util
+import os
+import signal
+
+SAMPLE_INTERVAL = 0.01
+
+RAW_DIR = "raw"
+SPEEDSCOPE_FILE = "profile.speedscope.json"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class Profiler:
+    def __init__(self, directory, phases, interval=SAMPLE_INTERVAL):
+        self.directory = directory
+        self.order = list(phases)
+        self.interval = interval
+        self.owner = os.getpid()
+        self.role = "main"
+        self.phase = self.order[0]
+        self.samples = {}
+        self.labels = {}
+
+    def start(self):
+        raw = os.path.join(self.directory, RAW_DIR)
+        os.makedirs(raw, exist_ok=True)
+        # Output of an earlier run in the same directory
+        for directory in (raw, self.directory):
+            for name in os.listdir(directory):
+                if name.endswith(".folded") or name == SPEEDSCOPE_FILE:
+                    os.remove(os.path.join(directory, name))
+        signal.signal(signal.SIGPROF, self._sample)
+        self._arm()
+
+    def _arm(self):
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def _disarm(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+
+    def enter(self, phase):
+        """Called with the phase of every instrumented method call."""
+        if self.order.index(phase) > self.order.index(self.phase):
+            self.phase = phase
+
+    def _label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            label = self.labels[code] = (
+                f"{code.co_name} "
+                f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+        return label
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.append(self.role)
+        key = (self.phase, tuple(reversed(stack)))
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    def after_fork_in_child(self):
+        # Interval timers are not inherited across fork
+        self.role = "worker"
+        self.samples = {}
+        self._arm()
+
+    def arm_flush(self):
+        """In a multiprocessing child: flush when its run() returns."""
+        multiprocessing.util.Finalize(None, self.flush, exitpriority=0)
+
+    def flush(self):
+        """Write this process's samples to raw/<pid>.folded."""
+        self._disarm()
+        samples, self.samples = self.samples, {}
+        if not samples:
+            return
+        path = os.path.join(
+            self.directory, RAW_DIR, f"{os.getpid()}.folded"
+        )
+        with open(path, "a") as f:
+            for (phase, stack), count in samples.items():
+                f.write(f"{phase};{';'.join(stack)} {count}\n")
+
+    def finish(self):
+        if os.getpid() != self.owner:
+            return
+        self.flush()
+        phases = self.merge()
+        for phase in self.order:
+            if phase not in phases:
+                continue
+            stacks, processes = phases[phase]
+            path = os.path.join(self.directory, f"{phase}.folded")
+            with open(path, "w") as f:
+                for stack, count in sorted(stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            print(
+                f"[PROFILE] {phase}: {sum(stacks.values())} samples from "
+                f"{len(processes)} processes -> {path}"
+            )
+        if phases:
+            path = os.path.join(self.directory, SPEEDSCOPE_FILE)
+            with open(path, "w") as f:
+                json.dump(self.speedscope(phases), f)
+            print(f"[PROFILE] speedscope: {path}")
+
+    def merge(self):
+        """phase -> ({collapsed stack: samples}, {pid}) of all processes;
+        removes the raw files."""
+        phases = {}
+        raw = os.path.join(self.directory, RAW_DIR)
+        for name in sorted(os.listdir(raw)):
+            path = os.path.join(raw, name)
+            with open(path) as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    phase, _, stack = stack.partition(";")
+                    stacks, processes = phases.setdefault(phase, ({}, set()))
+                    stacks[stack] = stacks.get(stack, 0) + int(count)
+                    processes.add(name)
+            os.remove(path)
+        os.rmdir(raw)
+        return phases
+
+    def speedscope(self, phases):
+        frames = []
+        index = {}
+        profiles = []
+        for phase in self.order:
+            if phase not in phases:
+                continue
+            samples = []
+            weights = []
+            for stack, count in sorted(phases[phase][0].items()):
+                ids = []
+                for name in stack.split(";"):
+                    if name not in index:
+                        index[name] = len(frames)
+                        frames.append({"name": name})
+                    ids.append(index[name])
+                samples.append(ids)
+                weights.append(count * self.interval)
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": phase,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            )
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": "Hyperion",
+            "exporter": "hyperion profiler",
+        }
+
+
+PROFILER = None
+
+
+def install_profiler(directory, interval=SAMPLE_INTERVAL):
+    """Profile this process and its workers into directory."""
+    global PROFILER
+    import checkpoint
+
+    if PROFILER is not None:
+        raise RuntimeError("profiler already installed")
+    PROFILER = Profiler(directory, checkpoint.PHASES, interval)
+    checkpoint.track_phases(PROFILER.enter)
+    os.register_at_fork(after_in_child=PROFILER.after_fork_in_child)
+    multiprocessing.util.register_after_fork(PROFILER, Profiler.arm_flush)
+    PROFILER.start()
+    print(
+        f"[PROFILE] Sampling every {interval * 1000:.0f} ms into {directory}"
+    )
+    return PROFILER
+
@@ -0,0 +1,160 @@
+"""Well-formedness proof by binary decomposition.
+
+The vote ciphertext (R*G, R*Q + v*G) is split into L = bitlen(vote_max - 1)
+bit ciphertexts (r_j*G, r_j*Q + b_j*G) with sum(2^j * r_j) = R, and each bit
+gets a two-branch ChaumPedersenProof.prove_or_n. The verifier recombines the
+bits with Horner's rule (L doublings and additions, shared by all bits) and
+checks the sum equals the ballot ciphertext. If vote_max is not a power of
+two, the same is done for (vote_max - 1 - v) to bound the vote from above.
+
+Proof size is O(log vote_max) instead of the O(vote_max) of the OR-proof.
+"""
+import gmpy2
+from Crypto.PublicKey import ECC
+
+from primitives import ChaumPedersenProof
+from util import deserialize_ep
+
+PROOF_TYPE = "range"
+
+# Points and scalars per proof, used to pick the smaller proof in "auto".
+_OR_POINTS_PER_VALUE = 2
+_BIT_POINTS = 2 + 2 * _OR_POINTS_PER_VALUE
+
+
+def bit_length(vote_max):
+    return max(1, (vote_max - 1).bit_length())
+
+
+def needs_upper_bound(vote_max):
+    return vote_max != 1 << bit_length(vote_max)
+
+
+def or_proof_points(vote_max):
+    return _OR_POINTS_PER_VALUE * vote_max
+
+
+def range_proof_points(vote_max):
+    decompositions = 2 if needs_upper_bound(vote_max) else 1
+    return decompositions * bit_length(vote_max) * _BIT_POINTS
+
+
+def is_range_proof(proof):
+    return isinstance(proof, dict) and proof.get("type") == PROOF_TYPE
+
+
+def _point(value):
+    if isinstance(value, dict):
+        return deserialize_ep(value)
+    return value
+
+
+def _horner(points):
+    """sum(2^j * points[j]) with one doubling and addition per element."""
+    acc = ECC.EccPoint(0, 0, "P-256")
+    for point in reversed(points):
+        acc.double()
+        acc += point
+    return acc
+
+
+class BinaryRangeProof:
+    def __init__(self, curve):
+        self.curve = curve
+        self.order = gmpy2.mpz(curve.get_pars().order)
+        self.chmp = ChaumPedersenProof(curve)
+
+    def _split_randomness(self, r, bits):
+        r_bits = [self.curve.get_random() for _ in range(bits - 1)]
+        partial = sum((r_j << j) for j, r_j in enumerate(r_bits))
+        top = (gmpy2.mpz(r) - partial) * gmpy2.invert(
+            gmpy2.mpz(2) ** (bits - 1), self.order
+        )
+        r_bits.append(top % self.order)
+        return r_bits
+
+    def _decompose(self, value, r, public_key, bits, id):
+        proofs = []
+        for j, r_j in enumerate(self._split_randomness(r, bits)):
+            bit = (value >> j) & 1
+            c1 = self.curve.raise_p(r_j)
+            c2 = public_key * r_j
+            if bit:
+                c2 += self.curve.raise_p(1)
+            ciphertext = {"c1": c1, "c2": c2}
+            proof = self.chmp.prove_or_n(ciphertext, r_j, public_key, 2, bit, id)
+            proofs.append([c1, c2, proof])
+        return proofs
+
+    def _upper_ciphertext(self, ciphertext, vote_max):
+        """Encryption of (vote_max - 1 - v) under randomness -R."""
+        c1 = -_point(ciphertext["c1"])
+        c2 = self.curve.raise_p(vote_max - 1)
+        c2 += -_point(ciphertext["c2"])
+        return {"c1": c1, "c2": c2}
+
+    def prove(self, ciphertext, r, public_key, vote_max, vote, id):
+        bits = bit_length(vote_max)
+        proof = {
+            "type": PROOF_TYPE,
+            "vote_max": vote_max,
+            "bits": self._decompose(vote, r, public_key, bits, id),
+            "upper": [],
+        }
+        if needs_upper_bound(vote_max):
+            proof["upper"] = self._decompose(
+                vote_max - 1 - vote, -gmpy2.mpz(r) % self.order, public_key,
+                bits, id,
+            )
+        return proof
+
+    def _verify_decomposition(self, ciphertext, public_key, entries, id):
+        c1_terms = []
+        c2_terms = []
+        for c1, c2, proof in entries:
+            c1 = _point(c1)
+            c2 = _point(c2)
+            if not self.chmp.verify_or_n(
+                {"c1": c1, "c2": c2},
+                public_key,
+                proof[0],
+                proof[1],
+                proof[2],
+                proof[3],
+                id,
+            ):
+                return False
+            c1_terms.append(c1)
+            c2_terms.append(c2)
+        return _horner(c1_terms) == _point(ciphertext["c1"]) and _horner(
+            c2_terms
+        ) == _point(ciphertext["c2"])
+
+    def verify(self, ciphertext, public_key, proof, vote_max, id):
+        bits = bit_length(vote_max)
+        if proof.get("vote_max") != vote_max or len(proof["bits"]) != bits:
+            return False
+        if not self._verify_decomposition(
+            ciphertext, public_key, proof["bits"], id
+        ):
+            return False
+        if needs_upper_bound(vote_max):
+            if len(proof["upper"]) != bits:
+                return False
+            upper = self._upper_ciphertext(ciphertext, vote_max)
+            return self._verify_decomposition(
+                upper, public_key, proof["upper"], id
+            )
+        return True
+
+    def serialize(self, proof, serialize_point):
+        """Serialize the EC points of proof in place."""
+        for entries in (proof["bits"], proof["upper"]):
+            for entry in entries:
+                entry[0] = serialize_point(entry[0])
+                entry[1] = serialize_point(entry[1])
+                for j in range(len(entry[2][0])):
+                    entry[2][0][j] = serialize_point(entry[2][0][j])
+                for j in range(len(entry[2][1])):
+                    entry[2][1][j] = serialize_point(entry[2][1][j])
+        return proof
@@ -0,0 +1,312 @@
+"""Teller nodes: each Teller runs in its own process behind a connection.
+
+A TellerCoordinator starts one TellerNode per teller and drives raise-h and
+partial decryption over local pipes (or sockets, when an address is given).
+Messages are framed with codec, so only compact binary data crosses the
+process boundary. Nodes are started with the 'fork' start method and
+inherit their Teller (curve, key share, public key) from the coordinator.
+
+A node holds a secret key share, so both ends decode frames with
+codec.decode(..., trusted=False): a frame can carry data, never code. A
+socket node only accepts connections that know the coordinator's authkey,
+AUTHKEY_BYTES random bytes made per coordinator and handed to the node over
+its fork pipe.
+"""
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import Client, Listener
+
+import codec
+import jacobian
+
+DEFAULT_SHARD_SIZE = 256
+CONNECT_TIMEOUT = 10.0
+AUTHKEY_BYTES = 32
+
+OP_RAISE_H = "raise_h"
+OP_PARTIAL_DECRYPT = "partial_decrypt"
+OP_PING = "ping"
+OP_STOP = "stop"
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+class NodeError(Exception):
+    """Raised on the coordinator when a teller node reports a failure."""
+
+
+class _Collector:
+    """Stand-in for a multiprocessing.Queue inside a node."""
+
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+    def get(self):
+        return self.items.pop(0)
+
+
+def _node_raise_h(teller, payload):
+    entries = teller.raise_h_entries(
+        [{"id": ballot_id, "ptk": ptk} for _, ballot_id, ptk in payload]
+    )
+    return [
+        [index, ciphertext, proof, g_r]
+        for (index, _, _), (ciphertext, proof, g_r) in zip(payload, entries)
+    ]
+
+
+def _node_partial_decrypt(teller, payload):
+    q1, q2, q3 = _Collector(), _Collector(), _Collector()
+    teller.mp_partial_decrypt(payload, q1, q2, q3)
+    return [q1.get(), q2.get(), q3.get()]
+
+
+_HANDLERS = {
+    OP_RAISE_H: _node_raise_h,
+    OP_PARTIAL_DECRYPT: _node_partial_decrypt,
+    OP_PING: lambda teller, payload: payload,
+}
+
+
+def serve(conn, teller):
+    """Answer coordinator requests on conn until told to stop."""
+    while True:
+        try:
+            message = conn.recv_bytes()
+        except EOFError:
+            break
+        start = time.perf_counter()
+        try:
+            op, payload = codec.decode(message, trusted=False)
+            if op == OP_STOP:
+                break
+            reply = [STATUS_OK, _HANDLERS[op](teller, payload)]
+        except Exception as e:
+            reply = [STATUS_ERROR, f"{type(e).__name__}: {e}"]
+        reply.append(time.perf_counter() - start)
+        conn.send_bytes(codec.encode(reply))
+    conn.close()
+
+
+def _node_main(conn, teller, address):
+    if address is not None:
+        authkey = conn.recv_bytes()
+        with Listener(address, authkey=authkey) as listener:
+            conn.send(listener.address)
+            conn.close()
+            conn = listener.accept()
+    serve(conn, teller)
+
+
+class NodeStats:
+    def __init__(self):
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.codec_time = 0.0
+        self.compute_time = 0.0
+        self.wall_time = 0.0
+
+    @property
+    def overhead(self):
+        """Time not spent computing on the node: codec, transfer, waiting."""
+        return self.wall_time - self.compute_time
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "codec_time": self.codec_time,
+            "compute_time": self.compute_time,
+            "wall_time": self.wall_time,
+            "overhead": self.overhead,
+        }
+
+
+class TellerNode:
+    """A Teller running in a separate process.
+
+    With address=None the node talks over a multiprocessing Pipe; otherwise
+    it listens on address (e.g. ("127.0.0.1", 0) or a Unix socket path)
+    and accepts only clients that know authkey (random if not given).
+    """
+
+    def __init__(self, teller, address=None, authkey=None):
+        self.teller = teller
+        self.address = address
+        self.authkey = authkey or os.urandom(AUTHKEY_BYTES)
+        self.process = None
+        self.conn = None
+        self.stats = NodeStats()
+        self._sent_at = None
+
+    def start(self):
+        ctx = multiprocessing.get_context("fork")
+        parent_conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_node_main,
+            args=(child_conn, self.teller, self.address),
+        )
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        if self.address is None:
+            self.conn = parent_conn
+        else:
+            parent_conn.send_bytes(self.authkey)
+            if not parent_conn.poll(CONNECT_TIMEOUT):
+                raise NodeError("teller node did not start listening")
+            self.address = parent_conn.recv()
+            parent_conn.close()
+            self.conn = Client(self.address, authkey=self.authkey)
+        return self
+
+    def send(self, op, payload):
+        start = time.perf_counter()
+        message = codec.encode([op, payload])
+        self.send_encoded(message, time.perf_counter() - start)
+
+    def send_encoded(self, message, codec_time=0.0):
+        self.stats.codec_time += codec_time
+        self._sent_at = time.perf_counter() - codec_time
+        self.conn.send_bytes(message)
+        self.stats.bytes_sent += len(message)
+        self.stats.requests += 1
+
+    def receive(self):
+        message = self.conn.recv_bytes()
+        start = time.perf_counter()
+        status, result, compute_time = codec.decode(message, trusted=False)
+        end = time.perf_counter()
+        self.stats.codec_time += end - start
+        self.stats.bytes_received += len(message)
+        self.stats.compute_time += compute_time
+        self.stats.wall_time += end - self._sent_at
+        if status != STATUS_OK:
+            raise NodeError(result)
+        return result
+
+    def request(self, op, payload):
+        self.send(op, payload)
+        return self.receive()
+
+    def stop(self):
+        if self.conn is not None:
+            try:
+                self.conn.send_bytes(codec.encode([OP_STOP, None]))
+            except (OSError, EOFError):
+                pass
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+
+
+class TellerCoordinator:
+    """Runs raise-h and partial decryption on one TellerNode per teller.
+
+    Inputs are cut into shards of at most shard_size ballots; each shard is
+    sent to every node at once, so the tellers work in parallel while the
+    size of any single message stays bounded.
+    """
+
+    def __init__(self, tellers, shard_size=DEFAULT_SHARD_SIZE, addresses=None):
+        self.tellers = tellers
+        self.shard_size = shard_size
+        addresses = addresses or [None] * len(tellers)
+        self.authkey = os.urandom(AUTHKEY_BYTES)
+        self.nodes = [
+            TellerNode(teller, address, self.authkey)
+            for teller, address in zip(tellers, addresses)
+        ]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        for node in self.nodes:
+            node.start()
+        return self
+
+    def stop(self):
+        for node in self.nodes:
+            node.stop()
+
+    def _shards(self, items):
+        for i in range(0, len(items), self.shard_size):
+            yield items[i : i + self.shard_size]
+
+    def _broadcast(self, op, payload):
+        start = time.perf_counter()
+        message = codec.encode([op, payload])
+        codec_time = (time.perf_counter() - start) / len(self.nodes)
+        for node in self.nodes:
+            node.send_encoded(message, codec_time)
+        return [node.receive() for node in self.nodes]
+
+    def raise_h(self, list_in):
+        """Sharded equivalent of Teller.mp_raise_h for every teller.
+
+        list_in holds [index, ballot] pairs as passed to mp_raise_h. Returns
+        one (teller_proofs, teller_registry, list_out) tuple per teller.
+        """
+        per_teller = [([], [], []) for _ in self.nodes]
+        for shard in self._shards(list_in):
+            payload = [
+                [index, ballot["id"], ballot["ptk"]] for index, ballot in shard
+            ]
+            replies = self._broadcast(OP_RAISE_H, payload)
+            ballots = {}
+            for index, ballot in shard:
+                ballot["ptk"] = jacobian.serialize_point(ballot["ptk"])
+                ballots[index] = self.tellers[0].serialize_ballot(ballot)
+            for (proofs, registry, list_out), reply in zip(per_teller, replies):
+                for index, ciphertext, proof, g_r in reply:
+                    ballot = ballots[index]
+                    proofs.append(
+                        {
+                            "h_r": ciphertext,
+                            "proof": proof,
+                            "ptk": ballot["ptk"],
+                            "id": ballot["id"],
+                        }
+                    )
+                    registry.append(
+                        {"id": ballot["id"], "g_r": g_r, "ptk": ballot["ptk"]}
+                    )
+                    list_out.append(
+                        [index, dict(ballot, h_r=ciphertext, proof_h_r=proof)]
+                    )
+        return per_teller
+
+    def partial_decrypt(self, ciphertexts_in):
+        """Sharded equivalent of Teller.mp_partial_decrypt for every teller.
+
+        Returns, per teller, a list of (output, output2, proof) per shard;
+        each shard carries its own decryption proof, like the per-process
+        chunks of the in-process path.
+        """
+        per_teller = [[] for _ in self.nodes]
+        for shard in self._shards(ciphertexts_in):
+            replies = self._broadcast(OP_PARTIAL_DECRYPT, shard)
+            for results, reply in zip(per_teller, replies):
+                results.append(tuple(reply))
+        return per_teller
+
+    def ping(self, payload=None):
+        return self._broadcast(OP_PING, payload)
+
+    def stats(self):
+        return [node.stats.as_dict() for node in self.nodes]
@@ -0,0 +1,358 @@
+"""Fault-tolerant parallel execution of chunked work on forked processes.
+
+ChunkRunner runs target(chunk) for every chunk in its own forked worker
+(so workers share the caller's state without pickling it) and collects the
+codec-encoded results. A worker that dies without reporting (crash, OOM
+kill, unpicklable result) or exceeds the per-chunk timeout is terminated
+and its chunk is retried on a new worker; only when a chunk has failed
+retries + 1 times does the run stop with WorkerFailure, which reports how
+much of the work did complete.
+
+Chunks can be a plain list or a Partitioner, which cuts the items into
+shrinking chunks as workers become free (guided self-scheduling): early
+chunks are large, the last ones small, so no worker is left with a long
+tail while the others idle. Chunk sizes are also capped so that one
+encoded result stays below a message size bound.
+"""
+import collections
+import contextlib
+import math
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+
+import codec
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+# Upper bound (bytes) for one encoded chunk result.
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+
+# Called as hook(label, chunk index) in every worker before its chunk runs
+# (e.g. determinism reseeds the worker's randomness).
+FORK_HOOKS = []
+
+_HOOKED_STARTS = [0]
+
+
+@contextlib.contextmanager
+def hooked_start():
+    """Around starting a worker that calls FORK_HOOKS itself, so at-fork
+    handlers can leave that fork to the hooks."""
+    _HOOKED_STARTS[0] += 1
+    try:
+        yield
+    finally:
+        _HOOKED_STARTS[0] -= 1
+
+
+def in_hooked_start():
+    return _HOOKED_STARTS[0] > 0
+
+_CGROUP_V2_MAX = "/sys/fs/cgroup/cpu.max"
+_CGROUP_V1_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+_CGROUP_V1_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+
+def _read_first_line(path):
+    try:
+        with open(path) as f:
+            return f.readline().split()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit():
+    """CPUs allowed by the cgroup CPU quota, or None without a quota."""
+    fields = _read_first_line(_CGROUP_V2_MAX)
+    if fields and fields[0] != "max":
+        quota, period = int(fields[0]), int(fields[1])
+    else:
+        quota = _read_first_line(_CGROUP_V1_QUOTA)
+        period = _read_first_line(_CGROUP_V1_PERIOD)
+        if not quota or not period or int(quota[0]) <= 0:
+            return None
+        quota, period = int(quota[0]), int(period[0])
+    return max(1, math.ceil(quota / period))
+
+
+def available_cpus():
+    """CPUs this process may actually run on.
+
+    multiprocessing.cpu_count() reports every CPU of the machine; this
+    takes the process's CPU affinity and the cgroup CPU quota (containers)
+    into account.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = multiprocessing.cpu_count()
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        count = min(count, limit)
+    return max(1, count)
+
+
+class Partitioner:
+    """Chunks of items, sized when they are handed out.
+
+    Every chunk takes remaining / (factor * workers) items, at least
+    min_chunk (by default 1/8 of an even share, so the tail does not
+    degrade into one worker start per item). Once results have been
+    observed, chunks are also capped to max_message_bytes worth of encoded
+    result.
+    """
+
+    def __init__(
+        self,
+        items,
+        workers=None,
+        min_chunk=None,
+        factor=2,
+        max_message_bytes=MAX_MESSAGE_BYTES,
+    ):
+        self.items = items
+        self.workers = workers or available_cpus()
+        if min_chunk is None:
+            min_chunk = len(items) // (self.workers * 8)
+        self.min_chunk = max(1, min_chunk)
+        self.factor = factor
+        self.max_message_bytes = max_message_bytes
+        self.position = 0
+        self.observed_items = 0
+        self.observed_bytes = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        remaining = len(self.items) - self.position
+        if remaining <= 0:
+            raise StopIteration
+        size = max(
+            self.min_chunk, -(-remaining // (self.factor * self.workers))
+        )
+        if self.observed_bytes:
+            per_item = self.observed_bytes / self.observed_items
+            size = min(size, max(1, int(self.max_message_bytes // per_item)))
+        chunk = self.items[self.position : self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+    def observe(self, items, size):
+        """Record that a chunk of items produced size bytes of result."""
+        self.observed_items += items
+        self.observed_bytes += size
+
+
+class WorkerFailure(Exception):
+    """A chunk failed on every attempt."""
+
+    def __init__(self, chunk, reason, completed, total):
+        super().__init__(
+            f"chunk {chunk} failed: {reason} "
+            f"({completed}/{total} items completed)"
+        )
+        self.chunk = chunk
+        self.reason = reason
+        self.completed = completed
+        self.total = total
+
+
+def _worker(target, label, index, attempt, chunk, results):
+    try:
+        for hook in FORK_HOOKS:
+            hook(label, index)
+        reply = (index, attempt, STATUS_OK, codec.encode(target(chunk)))
+    except Exception as e:
+        reply = (
+            index,
+            attempt,
+            STATUS_ERROR,
+            f"{type(e).__name__}: {e}\n{traceback.format_exc()}",
+        )
+    results.put(reply)
+    results.close()
+    results.join_thread()
+
+
+class ChunkRunner:
+    """Runs target over chunks on at most processes workers at a time.
+
+    timeout is the wall time (seconds) one chunk may take, None for no
+    limit. progress, if given, is called as progress(done, total) in items
+    after every completed chunk.
+    """
+
+    def __init__(
+        self,
+        target,
+        processes=None,
+        timeout=None,
+        retries=2,
+        poll_interval=0.2,
+        progress=None,
+        label="workers",
+    ):
+        self.target = target
+        self.processes = processes or available_cpus()
+        self.timeout = timeout
+        self.retries = retries
+        self.poll_interval = poll_interval
+        self.progress = progress
+        self.label = label
+        self.ctx = multiprocessing.get_context("fork")
+
+    def run(self, chunks):
+        """Results of target(chunk), in chunk order."""
+        completed = dict(self.imap(chunks))
+        return [completed[i] for i in range(len(completed))]
+
+    def imap(self, chunks):
+        """Yield (chunk index, result) as each chunk completes.
+
+        chunks is only advanced when a worker is free, so a Partitioner
+        sizes every chunk at the time it is handed out.
+        """
+        if isinstance(chunks, Partitioner):
+            total = len(chunks.items)
+        else:
+            chunks = list(chunks)
+            total = sum(len(chunk) for chunk in chunks)
+        source = iter(chunks)
+        observe = getattr(chunks, "observe", None)
+        exhausted = False
+        results = self.ctx.Queue()
+        pending = collections.deque()
+        issued = {}
+        attempts = {}
+        running = {}
+        completed = set()
+        progress = [0]
+        last_check = time.monotonic()
+        try:
+            while not exhausted or pending or running:
+                while len(running) < self.processes:
+                    if pending:
+                        index = pending.popleft()
+                    elif not exhausted:
+                        try:
+                            chunk = next(source)
+                        except StopIteration:
+                            exhausted = True
+                            continue
+                        index = len(attempts)
+                        issued[index] = chunk
+                        attempts[index] = 0
+                    else:
+                        break
+                    attempts[index] += 1
+                    running[index] = self._start(
+                        index, attempts[index], issued[index], results
+                    )
+                if not running:
+                    continue
+                try:
+                    index, attempt, status, payload = results.get(
+                        timeout=self.poll_interval
+                    )
+                except queue.Empty:
+                    self._check(running, pending, attempts, progress, total)
+                    last_check = time.monotonic()
+                    continue
+                if time.monotonic() - last_check > self.poll_interval:
+                    # Results keep arriving; still enforce the timeout
+                    self._check(
+                        running, pending, attempts, progress, total,
+                        timeouts_only=True,
+                    )
+                    last_check = time.monotonic()
+                if index in completed:
+                    continue
+                if status == STATUS_OK:
+                    # Possibly from an attempt that was already given up
+                    # on; the result is just as good.
+                    completed.add(index)
+                    if index in pending:
+                        pending.remove(index)
+                    if index in running:
+                        self._stop(running.pop(index)["process"])
+                    size = len(issued.pop(index))
+                    if observe is not None:
+                        observe(size, len(payload))
+                    progress[0] += size
+                    if self.progress is not None:
+                        self.progress(progress[0], total)
+                    yield index, codec.decode(payload)
+                elif index in running and running[index]["attempt"] == attempt:
+                    running.pop(index)["process"].join()
+                    self._retry(
+                        index, payload, pending, attempts, progress, total
+                    )
+        finally:
+            for worker in running.values():
+                worker["process"].terminate()
+                worker["process"].join()
+            results.close()
+
+    def _start(self, index, attempt, chunk, results):
+        process = self.ctx.Process(
+            target=_worker,
+            args=(self.target, self.label, index, attempt, chunk, results),
+        )
+        process.daemon = True
+        with hooked_start():
+            process.start()
+        return {
+            "process": process,
+            "attempt": attempt,
+            "started": time.monotonic(),
+            "dead": False,
+        }
+
+    def _stop(self, process):
+        process.join(timeout=self.poll_interval)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    def _check(
+        self, running, pending, attempts, progress, total, timeouts_only=False
+    ):
+        now = time.monotonic()
+        for index, worker in list(running.items()):
+            process = worker["process"]
+            if not timeouts_only and not process.is_alive():
+                # A worker flushes its result before exiting, but it may
+                # have died right after the last poll; only count the chunk
+                # as lost if it is still missing after one more poll.
+                if not worker["dead"]:
+                    worker["dead"] = True
+                    continue
+                running.pop(index)
+                process.join()
+                reason = f"worker exited with code {process.exitcode}"
+            elif (
+                self.timeout is not None
+                and now - worker["started"] > self.timeout
+            ):
+                running.pop(index)
+                process.terminate()
+                process.join()
+                reason = f"timed out after {self.timeout} s"
+            else:
+                continue
+            self._retry(index, reason, pending, attempts, progress, total)
+
+    def _retry(self, index, reason, pending, attempts, progress, total):
+        if attempts[index] > self.retries:
+            raise WorkerFailure(index, reason, progress[0], total)
+        print(
+            f"[{self.label}] chunk {index} failed ({reason.splitlines()[0]}); "
+            f"retrying, attempt {attempts[index] + 1} of {self.retries + 1}"
+        )
+        pending.append(index)
+
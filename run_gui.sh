@@ -7,4 +7,4 @@ source "$MY_PROJECT_DIR/.venv/bin/activate"
 export PYTHONPATH="$HYPERION_DIR:$MY_PROJECT_DIR:$PYTHONPATH"
 
 echo "[*] Starting Hyperion GUI..."
-python -m client.GUI
+python -m client.GUI "$@"
@@ -57,7 +57,7 @@ fi
 
 export PYTHONPATH="$HYPERION_DIR:$PYTHONPATH"
 
-cp "$MY_PROJECT_DIR/hyperion_files/parties.py" "$HYPERION_DIR/parties.py"
+cp "$MY_PROJECT_DIR"/hyperion_files/*.py "$HYPERION_DIR/"
 
 echo
 echo "[INFO] Setup complete."